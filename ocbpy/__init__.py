@@ -12,6 +12,8 @@ Open-Closed field line Boundary (OCB) magnetic gridding
 Functions
 ---------------------------------------------------------------------------
 match_data_ocb      Matches data and OCB records
+match_data_ocb_array
+                    Matches all data and OCB records at once
 normal_evar         Normalise a variable proportional to the electric field
 normal_curl_evar    Normalise a variable proportional to the curl of the
                     electric field
@@ -21,6 +23,8 @@ Classes
 ---------------------------------------------------------------------------
 OCBoundary    OCB data for different times
 VectorData    Vector data point
+VectorDataArray
+              Vector data points stored as arrays
 ---------------------------------------------------------------------------
 
 Modules
@@ -39,7 +43,8 @@ __default_file__ = "boundaries/si13_north_circle"
 
 try:
     from ocbpy import (ocboundary, ocb_scaling, ocb_time)
-    from ocbpy.ocboundary import (OCBoundary, match_data_ocb)
+    from ocbpy.ocboundary import (OCBoundary, match_data_ocb,
+                                  match_data_ocb_array)
 except ImportError as err:
     logging.exception('problem importing ocboundary: ' + str(err))
 
@@ -3,16 +3,44 @@
 
 Functions
 -------------------------------------------------------------------------------
-test_file(filename)
+test_file(filename, max_size=2.0e9)
     Test to see whether file exists and is small enough to load
 load_ascii_data(filename, hlines, kwargs)
     Load time-sorted ascii data file
+iter_ascii_data(filename, hlines, chunk_size=100000, kwargs)
+    Load time-sorted ascii data file in chunks of lines
+iter_line_chunks(filename, hlines=0, chunk_size=100000)
+    Read a text file in chunks of lines
+format_output_lines(line_fmt, columns)
+    Format columns of data as a single block of output lines
+write_output_blocks(fout, blocks)
+    Write blocks of formatted output lines in order
+write_output_file(outfile, header, blocks)
+    Write a header line and blocks of formatted output lines to a file
+write_binary_output(outdir, blocks, keys, attrs=dict())
+    Write blocks of output columns to a directory of .npy files
+load_binary_output(outdir, mmap_mode='r')
+    Load converted data written by write_binary_output
+column_cache_path(filename, kwargs)
+    Get the name of the binary column cache for a data file
+write_column_cache(cache_path, data)
+    Write a dict of numpy arrays to a binary column cache
+load_column_cache(cache_path, mmap_mode='r')
+    Load a binary column cache
+clear_column_cache(filename, cache_dir=None)
+    Remove all binary column caches for a data file
 """
 import numpy as np
 import logbook as logging
 import datetime as dt
 
-def test_file(filename):
+# Increment when the layout of the binary column cache changes
+_cache_version = 1
+
+# Increment when the layout of the binary converter output changes
+_output_version = 1
+
+def test_file(filename, max_size=2.0e9):
     """Test to ensure the file is small enough to read in.  Python can only
     allocate 2GB of data without crashing
 
@@ -20,6 +48,9 @@ def test_file(filename):
     ------------
     filename : (str)
         Filename to test
+    max_size : (float or NoneType)
+        Maximum file size in bytes, or None for routines that read the file
+        in chunks and have no size limit (default=2.0e9)
 
     Returns
     ---------
@@ -34,8 +65,10 @@ def test_file(filename):
     
     fsize = path.getsize(filename)
 
-    if(fsize > 2.0e9):
-        logging.warning("File size [{:.2f} GB > 2 GB]".format(fsize*1e-9))
+    if(max_size is not None and fsize > max_size):
+        estr = "File size [{:.2f} GB > {:.2f} GB]".format(fsize * 1.0e-9,
+                                                         max_size * 1.0e-9)
+        logging.warning(estr)
         return False
     elif(fsize == 0):
         logging.warning("empty file [{:s}]".format(filename))
@@ -100,16 +133,134 @@ def load_ascii_data(filename, hlines, miss=None, fill=np.nan, hsplit=None,
 
     Notes
     -------
-    Data is assumed to be float unless otherwise stated.
+    Data is assumed to be float unless otherwise stated.  Times built from the
+    datetime_cols are stored as datetime64[us].
     """
-    import ocbpy.ocb_time as ocbt
-
     #-----------------------------------------------------------------------
     # Test to ensure the file is small enough to read in.  Python can only
     # allocate 2GB of data.  If you load something larger, python will crash
     if not test_file(filename):
         return header, dict()
 
+    header, ascii_fmt = _ascii_data_format(filename, hlines, miss, fill,
+                                           hsplit, inline_comment,
+                                           datetime_cols, datetime_fmt,
+                                           int_cols, str_cols, max_str_length,
+                                           header)
+
+    if ascii_fmt is None:
+        return header, dict()
+
+    #-------------------------------------------
+    # Open the datafile and read the data rows
+    out = _load_ascii_lines(filename, hlines, ascii_fmt, filename)
+
+    return header, out
+
+def iter_ascii_data(filename, hlines, chunk_size=100000, miss=None,
+                    fill=np.nan, hsplit=None, inline_comment=None,
+                    invalid_raise=False, datetime_cols=[], datetime_fmt=None,
+                    int_cols=[], str_cols=[], max_str_length=50,
+                    header=list()):
+    """ Load an ascii data file in chunks of lines, yielding a dict of numpy
+    arrays for each chunk.  Files of any size may be read.
+
+    Parameters
+    ------------
+    filename : (str)
+        data file name
+    hlines : (int)
+        number of lines in header.  If zero, must include header.
+    chunk_size : (int)
+        Maximum number of data lines in each chunk (default=100000)
+    (others) :
+        See load_ascii_data
+
+    Yields
+    ----------
+    header : (list of strings)
+        Contains all specified header lines
+    out : (dict of numpy.arrays)
+        The dict keys are specified by the header data line, the data
+        for each key in this chunk are stored in the numpy array
+
+    Notes
+    -------
+    Memory use is limited by the chunk size, rather than the file size.
+    """
+
+    if not test_file(filename, max_size=None):
+        return
+
+    header, ascii_fmt = _ascii_data_format(filename, hlines, miss, fill,
+                                           hsplit, inline_comment,
+                                           datetime_cols, datetime_fmt,
+                                           int_cols, str_cols, max_str_length,
+                                           header)
+
+    if ascii_fmt is None:
+        return
+
+    for lines in iter_line_chunks(filename, hlines=hlines,
+                                  chunk_size=chunk_size):
+        out = _load_ascii_lines(lines, 0, ascii_fmt, filename)
+
+        if len(out.keys()) == 0:
+            return
+
+        yield header, out
+
+def iter_line_chunks(filename, hlines=0, chunk_size=100000):
+    """ Read a text file in chunks of lines
+
+    Parameters
+    ------------
+    filename : (str)
+        File name
+    hlines : (int)
+        Number of header lines to skip (default=0)
+    chunk_size : (int)
+        Maximum number of lines in each chunk (default=100000)
+
+    Yields
+    ----------
+    lines : (list of str)
+        List of up to chunk_size lines from the file
+    """
+    import itertools
+
+    with open(filename, "r") as fin:
+        for h in range(hlines):
+            fin.readline()
+
+        lines = list(itertools.islice(fin, chunk_size))
+        while len(lines) > 0:
+            yield lines
+            lines = list(itertools.islice(fin, chunk_size))
+
+def _ascii_data_format(filename, hlines, miss, fill, hsplit, inline_comment,
+                       datetime_cols, datetime_fmt, int_cols, str_cols,
+                       max_str_length, header):
+    """ Read the header of an ascii data file and determine how to load the
+    data rows
+
+    Parameters
+    ------------
+    (all) :
+        See load_ascii_data
+
+    Returns
+    ----------
+    header : (list of strings)
+        Contains all specified header lines
+    ascii_fmt : (dict or NoneType)
+        Data keys, column types, and datetime conversion information, or None
+        if the header could not be read
+    """
+    # Copy the input lists, so that the defaults are not altered
+    header = list(header)
+    int_cols = list(int_cols)
+
     #--------------------------------------------------
     # Initialize the convert_time input dictionary
     dfmt_parts = list() if datetime_fmt is None else datetime_fmt.split(" ")
@@ -156,7 +307,7 @@ def load_ascii_data(filename, hlines, miss=None, fill=np.nan, hsplit=None,
     
     if not f:
         logging.error("unable to open input file [{:s}]".format(filename))
-        return header, dict()
+        return header, None
 
     for h in range(hlines):
         header.append(f.readline())
@@ -166,7 +317,7 @@ def load_ascii_data(filename, hlines, miss=None, fill=np.nan, hsplit=None,
     # Create the output dictionary keylist
     if len(header) == 0:
         logging.error("unable to find header of [{:d}] lines".format(hlines))
-        return header, dict()
+        return header, None
 
     keyheader = in_header if in_header is not None else header[-1]
 
@@ -208,63 +359,649 @@ def load_ascii_data(filename, hlines, miss=None, fill=np.nan, hsplit=None,
     else:
         idt = len(dt_keys)
 
+    ascii_fmt = {"keylist":keylist, "nhead":nhead, "ldtype":ldtype,
+                 "miss":miss, "fill":fill, "inline_comment":inline_comment,
+                 "dt_keys":dt_keys, "idt":idt, "datetime_cols":datetime_cols,
+                 "dfmt_parts":dfmt_parts, "time_formats":time_formats,
+                 "convert_time_input":convert_time_input}
+
+    return header, ascii_fmt
+
+def _load_ascii_lines(fdata, hlines, ascii_fmt, filename):
+    """ Load the data rows of an ascii data file into a dict of numpy arrays
+
+    Parameters
+    ------------
+    fdata : (str or list of str)
+        Data file name or list of data lines
+    hlines : (int)
+        Number of header lines in fdata
+    ascii_fmt : (dict)
+        Data keys, column types, and datetime conversion information from
+        _ascii_data_format
+    filename : (str)
+        Data file name, used for logging
+
+    Returns
+    ----------
+    out : (dict of numpy.arrays)
+        The dict keys are specified by the header data line, the data
+        for each key are stored in the numpy array
+    """
+    keylist = ascii_fmt["keylist"]
+    nhead = ascii_fmt["nhead"]
+    dt_keys = ascii_fmt["dt_keys"]
+    idt = ascii_fmt["idt"]
+    out = {k:list() for k in keylist}
+
     #-------------------------------------------
     # Open the datafile and read the data rows
     try:
-        temp = np.genfromtxt(filename, skip_header=hlines, missing_values=miss,
-                             filling_values=fill, comments=inline_comment,
-                             invalid_raise=False, dtype=ldtype)
+        temp = np.genfromtxt(fdata, skip_header=hlines,
+                             missing_values=ascii_fmt["miss"],
+                             filling_values=ascii_fmt["fill"],
+                             comments=ascii_fmt["inline_comment"],
+                             invalid_raise=False, dtype=ascii_fmt["ldtype"])
+        temp = np.atleast_1d(temp)
     except:
         logging.error("unable to read data in file [{:s}]".format(filename))
-        return header, out
+        return out
 
     if len(temp) > 0:
+        # When dtype is specified, output comes as a structured array with
+        # one field per data column
+        names = temp.dtype.names
+        if names is None or len(names) != nhead:
+            estr = "unknown genfromtxt output for [{:s}]".format(filename)
+            logging.error(estr)
+            return dict()
+
         noff = 0
-        # When dtype is specified, output comes as a np.array of np.void objects
-        for line in temp:
-            if len(line) == nhead:
-                for num,name in enumerate(keylist):
-                    if len(name) > 0:
-                        if idt < len(dt_keys) and name == dt_keys[idt]:
-                            # Build the convert_time input
-                            for icol,dcol in enumerate(datetime_cols):
-                                if dfmt_parts[dcol].find("%") == 0:
-                                    if dfmt_parts[dcol][1] in time_formats:
-                                        ckey = "tod"
-                                    else:
-                                        ckey = "date"
-                                else:
-                                    ckey = dfmt_parts[dcol].lower()
-                                    if ckey in ['year', 'soy']:
-                                        line[dcol] = int(line[dcol])
-                                    elif ckey == 'sod':
-                                        line[dcol] = float(line[dcol])
-                                        
-                                convert_time_input[ckey] = line[dcol]
-                                
-                            # Convert the string into a datetime object
-                            try:
-                                ftime = ocbt.convert_time(**convert_time_input)
-                            except ValueError as v:
-                                raise v
-
-                            # Save the output data
-                            out[dt_keys[idt]].append(ftime)
-                        else:
-                            out[name].append(line[num-noff])
-                    else:
-                        noff += 1
+        for num,name in enumerate(keylist):
+            if len(name) > 0:
+                if idt < len(dt_keys) and name == dt_keys[idt]:
+                    out[name] = _ascii_datetime_column(temp, ascii_fmt)
+                else:
+                    out[name] = _ascii_data_column(temp[names[num-noff]])
             else:
-                estr = "unknown genfromtxt output for [{:s}]".format(filename)
-                logging.error(estr)
-                return header, dict()
+                noff += 1
 
     del temp
-    # Cast all lists and numpy arrays
-    for k in out.keys():
+
+    return out
+
+def _ascii_data_column(col):
+    """ Cast a column of genfromtxt output as the output data type
+
+    Parameters
+    ------------
+    col : (numpy.ndarray)
+        Field of the structured array returned by genfromtxt
+
+    Returns
+    ----------
+    col : (numpy.ndarray)
+        Numpy array of floats, integers, or strings no longer than the longest
+        value in the column
+    """
+    if col.dtype.kind == "U":
+        max_len = np.char.str_len(col).max()
+        col = col.astype("U{:d}".format(max(max_len, 1)))
+    else:
+        col = np.array(col)
+
+    return col
+
+def _ascii_datetime_column(temp, ascii_fmt):
+    """ Build the times for all rows of genfromtxt output
+
+    Parameters
+    ------------
+    temp : (numpy.ndarray)
+        Structured array returned by genfromtxt
+    ascii_fmt : (dict)
+        Data keys, column types, and datetime conversion information from
+        _ascii_data_format
+
+    Returns
+    ----------
+    dtimes : (numpy.ndarray)
+        Numpy array of datetime64[us] times
+    """
+    import ocbpy.ocb_time as ocbt
+
+    names = temp.dtype.names
+    dfmt_parts = ascii_fmt["dfmt_parts"]
+    time_formats = ascii_fmt["time_formats"]
+    convert_time_input = dict(ascii_fmt["convert_time_input"])
+
+    # Build the convert_time input
+    for dcol in ascii_fmt["datetime_cols"]:
+        if dfmt_parts[dcol].find("%") == 0:
+            if dfmt_parts[dcol][1] in time_formats:
+                ckey = "tod"
+            else:
+                ckey = "date"
+            convert_time_input[ckey] = temp[names[dcol]]
+        else:
+            ckey = dfmt_parts[dcol].lower()
+            if ckey in ['year', 'soy']:
+                convert_time_input[ckey] = temp[names[dcol]].astype(int)
+            elif ckey == 'sod':
+                convert_time_input[ckey] = temp[names[dcol]].astype(float)
+            else:
+                convert_time_input[ckey] = temp[names[dcol]]
+
+    # Convert all of the times at once
+    dtimes = ocbt.convert_time_array(**convert_time_input)
+
+    return dtimes
+
+def format_output_lines(line_fmt, columns):
+    """ Format columns of data as a single block of output lines
+
+    Parameters
+    ------------
+    line_fmt : (str)
+        Format string for one output line, including the line ending, with one
+        replacement field for each column
+    columns : (list of array-like)
+        Columns of data, all with the same length
+
+    Returns
+    ---------
+    block : (str)
+        Formatted output lines, joined into one string
+
+    Notes
+    -------
+    Columns are converted to lists of Python objects before formatting, so
+    datetime64 columns are formatted as datetime objects.
+    """
+    columns = [np.asarray(col).tolist() for col in columns]
+
+    return "".join(map(line_fmt.format, *columns))
+
+def write_output_blocks(fout, blocks):
+    """ Write blocks of formatted output lines in order
+
+    Parameters
+    ------------
+    fout : (file)
+        Open output file handle
+    blocks : (iterable)
+        Iterable of strings, each holding one or more formatted output lines.
+        None indicates a block that could not be made, and stops the output.
+
+    Returns
+    ---------
+    write_ok : (bool)
+        True if all blocks were written, False if an error occurred
+    """
+    for block in blocks:
+        if block is None:
+            return False
+
         try:
-            out[k] = np.array(out[k], dtype=type(out[k][0]))
-        except:
-            pass
+            fout.write(block)
+        except Exception as e:
+            estr = "unable to write [{:s}] ".format(block[:block.find("\n")])
+            estr = "{:s}because of error [{:}]".format(estr, e)
+            logging.error(estr)
+            return False
 
-    return header, out
+    return True
+
+def write_output_file(outfile, header, blocks):
+    """ Write a header line and blocks of formatted output lines to a file
+
+    Parameters
+    ------------
+    outfile : (str)
+        Output file name
+    header : (str)
+        Header line, including the line ending
+    blocks : (iterable)
+        Iterable of strings, each holding one or more formatted output lines.
+        None indicates a block that could not be made, and stops the output.
+
+    Returns
+    ---------
+    write_ok : (bool)
+        True if the file was written, False if an error occurred
+
+    Notes
+    -------
+    The file is always closed, and a partly written file is removed.
+    """
+    import os
+
+    try:
+        fout = open(outfile, 'w')
+    except:
+        logging.error("unable to create output file [{:}]".format(outfile))
+        return False
+
+    with fout:
+        try:
+            fout.write(header)
+        except Exception as e:
+            estr = "unable to write [{:s}] because of error ".format(header)
+            estr = "{:s}[{:}]".format(estr, e)
+            logging.error(estr)
+            write_ok = False
+        else:
+            write_ok = write_output_blocks(fout, blocks)
+
+    if not write_ok:
+        os.remove(outfile)
+
+    return write_ok
+
+def write_binary_output(outdir, blocks, keys, attrs=dict()):
+    """ Write blocks of output columns to a directory of .npy files
+
+    Parameters
+    ------------
+    outdir : (str)
+        Output directory name.  A directory written by an earlier call is
+        replaced, any other existing file or directory is left alone.
+    blocks : (iterable)
+        Iterable of dicts of numpy arrays, with one array for each key.  None
+        indicates a block that could not be made, and stops the output.
+    keys : (list)
+        Column names, in output order
+    attrs : (dict)
+        Additional values to save in the schema, must be JSON serialisable
+        (default=dict())
+
+    Returns
+    ---------
+    write_ok : (bool)
+        True if the output was written, False if an error occurred
+
+    Notes
+    -------
+    Each column is saved at full precision as a .npy file that may be
+    memory-mapped, and 'schema.json' holds the column names and data types,
+    the number of records, and attrs.  Blocks are streamed to disk as they are
+    made.  The output is written to a temporary directory and renamed, so
+    readers never see partial output.  Columns with no data are saved as
+    floats.
+    """
+    import os
+    import json
+    import shutil
+    import tempfile
+
+    outdir = os.path.abspath(outdir)
+    if(os.path.exists(outdir) and
+       not os.path.isfile(os.path.join(outdir, "schema.json"))):
+        logging.error("unable to create output file [{:}]".format(outdir))
+        return False
+
+    out_dir, out_name = os.path.split(outdir)
+    try:
+        temp_dir = tempfile.mkdtemp(prefix=".{:s}".format(out_name),
+                                    dir=out_dir)
+    except (IOError, OSError) as err:
+        logging.error("unable to create output file [{:}]".format(err))
+        return False
+
+    # Stream the raw column data to disk, keeping the type and size of
+    # each block
+    nrec = 0
+    block_info = {k:list() for k in keys}
+    raw_files = dict()
+    write_ok = True
+    try:
+        for k in keys:
+            raw_files[k] = open(os.path.join(temp_dir,
+                                             "{:s}.raw".format(k)), "wb")
+
+        for block in blocks:
+            if block is None:
+                write_ok = False
+                break
+
+            nblock = len(block[keys[0]])
+            for k in keys:
+                col = np.ascontiguousarray(block[k]).reshape(-1)
+                if col.dtype.hasobject or col.shape[0] != nblock:
+                    estr = "bad data for output column [{:}]".format(k)
+                    raise ValueError(estr)
+                col.tofile(raw_files[k])
+                block_info[k].append((col.dtype, nblock))
+            nrec += nblock
+
+        for k in keys:
+            raw_files[k].close()
+
+        if write_ok:
+            schema = {"version":_output_version, "records":nrec,
+                      "columns":[_finish_binary_column(temp_dir, k,
+                                                       block_info[k], nrec)
+                                 for k in keys],
+                      "attrs":attrs}
+
+            with open(os.path.join(temp_dir, "schema.json"), "w") as fschema:
+                json.dump(schema, fschema, indent=1)
+
+            if os.path.isdir(outdir):
+                shutil.rmtree(outdir)
+            os.chmod(temp_dir, 0o755)
+            os.rename(temp_dir, outdir)
+    except (IOError, OSError, ValueError, TypeError) as err:
+        logging.error("unable to write binary output [{:}]".format(err))
+        write_ok = False
+    finally:
+        for k in raw_files.keys():
+            raw_files[k].close()
+
+        if not write_ok:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return write_ok
+
+def _finish_binary_column(temp_dir, key, block_info, nrec):
+    """ Build a .npy file from the raw data blocks of an output column
+
+    Parameters
+    ------------
+    temp_dir : (str)
+        Directory holding the raw column data
+    key : (str)
+        Column name
+    block_info : (list)
+        List of tuples with the data type and number of records of each block
+    nrec : (int)
+        Total number of records
+
+    Returns
+    ---------
+    col_info : (dict)
+        Column name and data type, as saved in the schema
+    """
+    import os
+    from numpy.lib import format as npformat
+
+    raw_path = os.path.join(temp_dir, "{:s}.raw".format(key))
+    col_path = os.path.join(temp_dir, "{:s}.npy".format(key))
+
+    # Blocks of strings may have different widths, so use a type that holds
+    # all of them
+    if len(block_info) == 0:
+        dtype = np.dtype(float)
+    else:
+        dtype = np.result_type(*[binfo[0] for binfo in block_info])
+
+    if nrec == 0:
+        np.save(col_path, np.zeros(shape=(0,), dtype=dtype),
+                allow_pickle=False)
+    else:
+        col = npformat.open_memmap(col_path, mode="w+", dtype=dtype,
+                                   shape=(nrec,))
+        irec = 0
+        offset = 0
+        for bdtype, nblock in block_info:
+            col[irec:irec+nblock] = np.fromfile(raw_path, dtype=bdtype,
+                                                count=nblock, offset=offset)
+            irec += nblock
+            offset += nblock * bdtype.itemsize
+
+        col.flush()
+        del col
+
+    os.remove(raw_path)
+
+    return {"name":key, "dtype":dtype.str}
+
+def load_binary_output(outdir, mmap_mode="r"):
+    """ Load converted data written by write_binary_output
+
+    Parameters
+    ------------
+    outdir : (str)
+        Binary output directory name
+    mmap_mode : (str or NoneType)
+        Memory-map mode passed to numpy.load, or None to read the columns into
+        memory (default='r')
+
+    Returns
+    ---------
+    schema : (dict)
+        Schema with the column names and data types, number of records, and
+        additional attributes, empty if the output could not be loaded
+    data : (dict of numpy.arrays)
+        Data columns, read-only views of the files unless mmap_mode is None
+    """
+    import os
+    import json
+
+    schema_file = os.path.join(outdir, "schema.json")
+    if not os.path.isfile(schema_file):
+        logging.error("no binary output found in [{:}]".format(outdir))
+        return dict(), dict()
+
+    try:
+        with open(schema_file, "r") as fschema:
+            schema = json.load(fschema)
+
+        if schema["version"] != _output_version:
+            raise ValueError("unknown output version [{:}]".format(
+                schema["version"]))
+
+        data = dict()
+        for col_info in schema["columns"]:
+            k = col_info["name"]
+            data[k] = np.load(os.path.join(outdir, "{:s}.npy".format(k)),
+                              mmap_mode=mmap_mode, allow_pickle=False)
+            if(data[k].dtype != np.dtype(col_info["dtype"]) or
+               data[k].shape != (schema["records"],)):
+                estr = "column [{:s}] does not match schema".format(k)
+                raise ValueError(estr)
+    except (IOError, OSError, ValueError, KeyError) as err:
+        logging.error("unable to load binary output [{:}]".format(err))
+        return dict(), dict()
+
+    return schema, data
+
+def column_cache_path(filename, cache_dir=None, key_args=list()):
+    """ Get the name of the binary column cache for a data file
+
+    Parameters
+    ------------
+    filename : (str)
+        Data file name
+    cache_dir : (str or NoneType)
+        Directory that holds the cache, or None to place the cache alongside
+        the data file (default=None)
+    key_args : (list)
+        Additional values that change the cached data, such as the column names
+        or time format (default=list())
+
+    Returns
+    ---------
+    cache_path : (str)
+        Cache directory name, which depends on the absolute data file path,
+        size, modification time, and key_args
+
+    Notes
+    -------
+    Cache names start with the data file name, a hash of the data file path,
+    and a hash of the data file size and modification time.  This allows all
+    caches for a file, and those made from older versions of it, to be found.
+    """
+    from os import path
+    import hashlib
+
+    filename = path.abspath(filename)
+    if cache_dir is None:
+        cache_dir = path.dirname(filename)
+
+    fstat = "{:d} {:d}".format(path.getsize(filename),
+                               int(path.getmtime(filename) * 1.0e6))
+    fkey = " ".join(["{:d}".format(_cache_version)] +
+                    ["{:}".format(kk) for kk in key_args])
+
+    path_hash = hashlib.md5(filename.encode("utf-8")).hexdigest()[:12]
+    stat_hash = hashlib.md5(fstat.encode("utf-8")).hexdigest()[:12]
+    key_hash = hashlib.md5(fkey.encode("utf-8")).hexdigest()[:12]
+    cache_name = ".{:s}.{:s}.{:s}.{:s}.npc".format(path.basename(filename),
+                                                   path_hash, stat_hash,
+                                                   key_hash)
+
+    return path.join(cache_dir, cache_name)
+
+def write_column_cache(cache_path, data):
+    """ Write a dict of numpy arrays to a binary column cache
+
+    Parameters
+    ------------
+    cache_path : (str)
+        Cache directory name, from column_cache_path
+    data : (dict of numpy.arrays)
+        Columns to cache.  Object arrays cannot be cached.
+
+    Returns
+    ---------
+    good_flag : (bool)
+        True if the cache was written or already exists, False otherwise
+
+    Notes
+    -------
+    Each column is saved as a .npy file.  The cache is written to a temporary
+    directory and renamed, so readers never see a partial cache.  Older caches
+    for the same data file are removed.
+    """
+    import os
+    import json
+    import shutil
+    import tempfile
+
+    if os.path.isdir(cache_path):
+        return True
+
+    cache_dir, cache_name = os.path.split(cache_path)
+    try:
+        temp_dir = tempfile.mkdtemp(prefix=cache_name, dir=cache_dir)
+    except (IOError, OSError) as err:
+        logging.warning("unable to create cache [{:}]".format(err))
+        return False
+
+    try:
+        for k in data.keys():
+            np.save(os.path.join(temp_dir, "{:s}.npy".format(k)), data[k],
+                    allow_pickle=False)
+
+        with open(os.path.join(temp_dir, "columns.json"), "w") as fcol:
+            json.dump(list(data.keys()), fcol)
+
+        os.chmod(temp_dir, 0o755)
+        os.rename(temp_dir, cache_path)
+    except (IOError, OSError, ValueError) as err:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+        # Another process may have written the same cache
+        if os.path.isdir(cache_path):
+            return True
+
+        logging.warning("unable to write cache [{:}]".format(err))
+        return False
+
+    # Remove caches made from older versions of this data file
+    file_prefix, stat_prefix = _cache_prefixes(cache_name)
+    for old_name in os.listdir(cache_dir):
+        if(old_name.startswith(file_prefix) and old_name.endswith(".npc") and
+           not old_name.startswith(stat_prefix)):
+            shutil.rmtree(os.path.join(cache_dir, old_name), ignore_errors=True)
+
+    return True
+
+def load_column_cache(cache_path, mmap_mode="r"):
+    """ Load a binary column cache
+
+    Parameters
+    ------------
+    cache_path : (str)
+        Cache directory name, from column_cache_path
+    mmap_mode : (str or NoneType)
+        Memory-map mode passed to numpy.load, or None to read the columns into
+        memory (default='r')
+
+    Returns
+    ---------
+    data : (dict of numpy.arrays or NoneType)
+        Cached columns, or None if there is no valid cache
+    """
+    import os
+    import json
+
+    col_file = os.path.join(cache_path, "columns.json")
+    if not os.path.isfile(col_file):
+        return None
+
+    try:
+        with open(col_file, "r") as fcol:
+            keys = json.load(fcol)
+
+        data = {k:np.load(os.path.join(cache_path, "{:s}.npy".format(k)),
+                          mmap_mode=mmap_mode, allow_pickle=False)
+                for k in keys}
+    except (IOError, OSError, ValueError) as err:
+        logging.warning("unable to load cache [{:}]".format(err))
+        return None
+
+    return data
+
+def clear_column_cache(filename, cache_dir=None):
+    """ Remove all binary column caches for a data file
+
+    Parameters
+    ------------
+    filename : (str)
+        Data file name
+    cache_dir : (str or NoneType)
+        Directory that holds the cache, or None if the cache is alongside
+        the data file (default=None)
+
+    Returns
+    ---------
+    num_removed : (int)
+        Number of caches removed
+    """
+    import os
+    import shutil
+
+    cache_path = column_cache_path(filename, cache_dir=cache_dir)
+    cache_dir, cache_name = os.path.split(cache_path)
+    file_prefix, stat_prefix = _cache_prefixes(cache_name)
+
+    num_removed = 0
+    for old_name in os.listdir(cache_dir):
+        if old_name.startswith(file_prefix) and old_name.endswith(".npc"):
+            shutil.rmtree(os.path.join(cache_dir, old_name), ignore_errors=True)
+            num_removed += 1
+
+    return num_removed
+
+def _cache_prefixes(cache_name):
+    """ Get the prefixes shared by the caches of a data file
+
+    Parameters
+    ------------
+    cache_name : (str)
+        Base name of a cache directory
+
+    Returns
+    ---------
+    file_prefix : (str)
+        Prefix shared by all caches for the data file
+    stat_prefix : (str)
+        Prefix shared by all caches for this version of the data file
+    """
+    name_parts = cache_name[:-4].rsplit(".", 3)
+    file_prefix = "{:s}.".format(".".join(name_parts[:2]))
+    stat_prefix = "{:s}.".format(".".join(name_parts[:3]))
+
+    return file_prefix, stat_prefix
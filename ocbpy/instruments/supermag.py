@@ -10,6 +10,8 @@ supermag2ascii_ocb(smagfile, outfile, kwargs)
      data point
 load_supermag_ascii_data(filename)
      Load SuperMAG ASCII data files
+iter_supermag_ascii_data(filename, batch_size=100000)
+     Read SuperMAG ASCII data files in batches of whole records
 
 Data
 ----------------------------------------------------------------------------
@@ -18,9 +20,19 @@ SuperMAG data available at: http://supermag.jhuapl.edu/
 import logbook as logging
 import numpy as np
 
+# Minimum number of station lines in each batch of streamed SuperMAG data
+_batch_rows = 100000
+
+# SuperMAG data fill value
+_fill_val = 999999
+
+# OCBoundary object shared by the conversion processes
+_worker_ocb = None
+
 def supermag2ascii_ocb(smagfile, outfile, ocb=None, ocbfile=None,
                        max_sdiff=600, min_sectors=7, rcent_dev=8.0, max_r=23.0,
-                       min_r=10.0, min_j=0.15):
+                       min_r=10.0, min_j=0.15, workers=1,
+                       output_format="ascii", batch_size=_batch_rows):
     """ Coverts the location of SuperMAG data into a frame that is relative to
     the open-closed field-line boundary (OCB) as determined  from a circle fit
     to the poleward boundary of the auroral oval
@@ -52,35 +64,58 @@ def supermag2ascii_ocb(smagfile, outfile, ocb=None, ocbfile=None,
         (default=10.0).
     min_j : (float)
         Minimum unitless current magnitude scale difference (default=0.15)
+    workers : (int)
+        Number of processes used to convert the data.  If greater than one,
+        the matched data are split into time shards that are converted in a
+        process pool and written in order (default=1)
+    output_format : (str)
+        'ascii' to write a whitespace-delimited text file, or 'npy' to write a
+        directory of full-precision binary columns that may be loaded with
+        ocbpy.instruments.general.load_binary_output (default='ascii')
+    batch_size : (int)
+        Minimum number of station lines in each batch of SuperMAG data read
+        from the file (default=100000)
+
+    Notes
+    ------
+    The SuperMAG file is read in batches of whole records, so memory use does
+    not grow with the file size and there is no limit on the file size.
+    If an error occurs while writing, the partly written output is removed.
 
     Returns
     ---------
     Void
     """
     import ocbpy
-    import ocbpy.ocb_scaling as ocbscal
     import datetime as dt
+    import itertools
 
-    assert ocbpy.instruments.test_file(smagfile), \
+    assert ocbpy.instruments.test_file(smagfile, max_size=None), \
     logging.error("supermag file cannot be opened [{:s}]".format(smagfile))
     assert isinstance(outfile, str), \
         logging.error("output filename is not a string [{:}]".format(outfile))
 
-    # Read the superMAG data and calculate the magnetic field magnitude
-    header, mdata = load_supermag_ascii_data(smagfile)
+    if output_format not in ["ascii", "npy"]:
+        logging.error("unknown output format [{:}]".format(output_format))
+        return
 
-    # Remove the data with NaNs
-    igood = [i for i, mlt in enumerate(mdata['MLT']) if not np.isnan(mlt)
-             and not np.isnan(mdata['MLAT'][i]) and not np.isnan(mdata['BE'][i])
-             and not np.isnan(mdata['BN'][i]) and not np.isnan(mdata['BZ'][i])]
+    # Read the first batch of superMAG data
+    batches = iter_supermag_ascii_data(smagfile, batch_size=batch_size)
+    mdata = next(batches, None)
 
-    for k in mdata.keys():
-        mdata[k] = mdata[k][igood]
+    if mdata is None:
+        logging.error("unable to load data from [{:s}]".format(smagfile))
+        return
+
+    batches = itertools.chain([mdata], batches)
 
-    # Load the OCB data for the SuperMAG data period
+    # Load the OCB data for the SuperMAG data period.  The last record time is
+    # found by reading the end of the SuperMAG file.
     if ocb is None or not isinstance(ocb, ocbpy.ocboundary.OCBoundary):
         mstart = mdata['DATETIME'][0] - dt.timedelta(seconds=max_sdiff+1)
-        mend = mdata['DATETIME'][-1] + dt.timedelta(seconds=max_sdiff+1)
+        mend = _last_supermag_time(smagfile)
+        if mend is not None:
+            mend = mend + dt.timedelta(seconds=max_sdiff+1)
         ocb = ocbpy.OCBoundary(ocbfile, stime=mstart, etime=mend)
 
     # Test the OCB data
@@ -91,86 +126,232 @@ def supermag2ascii_ocb(smagfile, outfile, ocb=None, ocbfile=None,
             logging.error("bad OCB file specified")
         return
 
-    # Open and test the file to ensure it can be written
+    # Set the output columns
+    optional_keys = [okey for okey in ["SML", "SMU", "SZA"]
+                     if okey in mdata.keys()]
+    out_keys = ["DATETIME", "NST", "STID"] + optional_keys
+    out_keys.extend(["MLAT", "MLT", "BMAG", "BN", "BE", "BZ", "OCB_MLAT",
+                     "OCB_MLT", "OCB_BMAG", "OCB_BN", "OCB_BE", "OCB_BZ"])
+
+    # Match and convert the data one shard at a time
+    match_kwargs = {"max_tol":max_sdiff, "min_sectors":min_sectors,
+                    "rcent_dev":rcent_dev, "max_r":max_r, "min_r":min_r,
+                    "min_j":min_j}
+    shard_out = _convert_supermag_batches(batches, ocb, optional_keys,
+                                          output_format, workers, match_kwargs)
+
     try:
-        fout = open(outfile, 'w')
-    except:
-        logging.error("unable to create output file [{:}]".format(outfile))
+        if output_format == "npy":
+            attrs = {"instrument":"supermag", "ocbfile":ocb.filename,
+                     "boundary_lat":ocb.boundary_lat, "max_sdiff":max_sdiff}
+            ocbpy.instruments.general.write_binary_output(outfile, shard_out,
+                                                          out_keys, attrs)
+            return
+
+        # Write the header line, then the converted data
+        outline = "#DATE TIME {:s}\n".format(" ".join(out_keys[1:]))
+        ocbpy.instruments.general.write_output_file(outfile, outline,
+                                                    shard_out)
+    finally:
+        shard_out.close()
+
+    return
+
+def _convert_supermag_batches(batches, ocb, optional_keys, output_format,
+                              workers, match_kwargs):
+    """ Match and convert batches of SuperMAG data, one time shard at a time
+
+    Parameters
+    ------------
+    batches : (iterable)
+        Iterable of dicts of numpy arrays with the SuperMAG data
+    ocb : (OCBoundary)
+        OCBoundary object with data loaded from an OC boundary data file
+    optional_keys : (list)
+        List of the optional data keys
+    output_format : (str)
+        Output format, 'ascii' or 'npy'
+    workers : (int)
+        Number of processes used to convert the data
+    match_kwargs : (dict)
+        Keyword arguments for ocbpy.match_data_ocb_array
+
+    Yields
+    ----------
+    shard_out : (str or dict)
+        Formatted output lines or dict of output columns for each shard, in
+        time order
+
+    Notes
+    -------
+    When converting in a process pool, the shards of up to two batches are in
+    flight at once, so the next batch is read and matched while the current
+    batch is converted
+    """
+    import collections
+
+    shards = _supermag_shards(batches, ocb, optional_keys, output_format,
+                              workers, match_kwargs)
+
+    if workers <= 1:
+        for shard in shards:
+            yield _supermag_shard_output(ocb, *shard)
         return
 
-    # Write the output line
-    outline = "#DATE TIME NST STID "
-    optional_keys = ["SML", "SMU", "SZA"]
-    for okey in optional_keys:
-        if okey in mdata.keys():
-            outline = "{:s}{:s} ".format(outline, okey)
+    # Start the conversion processes, giving each a copy of the OCB data
+    import multiprocessing as mp
+
+    pool = mp.Pool(processes=workers, initializer=_set_worker_ocb,
+                   initargs=(ocb,))
 
-    outline = "{:s}MLAT MLT BMAG BN BE BZ OCB_MLAT OCB_MLT ".format(outline)
-    outline = "{:s}OCB_BMAG OCB_BN OCB_BE OCB_BZ\n".format(outline)
     try:
-        fout.write(outline)
-    except:
-        estr = "unable to write [{:s}] because of error ".format(outline)
-        estr = "{:s}[{:}]".format(estr, e)
-        logging.error(estr)
-        return
-    
-    # Initialise the ocb and SuperMAG indices
-    imag = 0
-    nmag = mdata['DATETIME'].shape[0]
-    
-    # Cycle through the data, matching SuperMAG and OCB records
-    while imag < nmag and ocb.rec_ind < ocb.records:
-        imag = ocbpy.match_data_ocb(ocb, mdata['DATETIME'], idat=imag,
-                                    max_tol=max_sdiff, min_sectors=min_sectors,
-                                    rcent_dev=rcent_dev, max_r=max_r,
-                                    min_r=min_r, min_j=min_j)
-        
-        if imag < nmag and ocb.rec_ind < ocb.records:
-            # Set this value's AACGM vector values
-            vdata = ocbscal.VectorData(imag, ocb.rec_ind, mdata['MLAT'][imag],
-                                       mdata['MLT'][imag],
-                                       aacgm_n=mdata['BN'][imag],
-                                       aacgm_e=mdata['BE'][imag],
-                                       aacgm_z=mdata['BZ'][imag],
-                                       scale_func=ocbscal.normal_curl_evar)
-            
-            vdata.set_ocb(ocb)
-
-            # Format the output line
-            #    DATE TIME NST [SML SMU] STID [SZA] MLAT MLT BMAG BN BE BZ
-            #    OCB_MLAT OCB_MLT OCB_BMAG OCB_BN OCB_BE OCB_BZ
-            outline = "{:} {:d} {:s} ".format(mdata['DATETIME'][imag],
-                                              mdata['NST'][imag],
-                                              mdata['STID'][imag])
-
-            for okey in optional_keys:
-                if okey == "SZA":
-                    outline = "{:s}{:.2f} ".format(outline, mdata[okey][imag])
-                else:
-                    outline = "{:s}{:d} ".format(outline, mdata[okey][imag])
-            
-            outline = "{:s}{:.2f} {:.2f} {:.2f} {:.2f} ".format(outline, \
-            vdata.aacgm_lat, vdata.aacgm_mlt, vdata.aacgm_mag, vdata.aacgm_n)
-            outline = "{:s}{:.2f} {:.2f} {:.2f} {:.2f} ".format(outline, \
-                    vdata.aacgm_e, vdata.aacgm_z, vdata.ocb_lat, vdata.ocb_mlt)
-            outline = "{:s}{:.2f} {:.2f} {:.2f} {:.2f}\n".format(outline, \
-                    vdata.ocb_mag, vdata.ocb_n, vdata.ocb_e, vdata.ocb_z)
-            try:
-                fout.write(outline)
-            except e:
-                estr = "unable to write [{:s}] ".format(outline)
-                estr = "{:s}because of error [{:}]".format(estr, e)
-                logging.error(estr)
-                return
-            
-            # Move to next line
-            imag += 1
-
-    # Close output file
-    fout.close()
-        
-    return
+        pending = collections.deque()
+        for shard in shards:
+            pending.append(pool.apply_async(_supermag_worker_output, (shard,)))
+
+            while len(pending) > 2 * workers:
+                yield pending.popleft().get()
+
+        while len(pending) > 0:
+            yield pending.popleft().get()
+    finally:
+        pool.terminate()
+
+def _supermag_shards(batches, ocb, optional_keys, output_format, nshards,
+                     match_kwargs):
+    """ Match batches of SuperMAG data and split them into time shards
+
+    Parameters
+    ------------
+    batches : (iterable)
+        Iterable of dicts of numpy arrays with the SuperMAG data
+    ocb : (OCBoundary)
+        OCBoundary object with data loaded from an OC boundary data file
+    optional_keys : (list)
+        List of the optional data keys
+    output_format : (str)
+        Output format, 'ascii' or 'npy'
+    nshards : (int)
+        Number of shards made from each batch
+    match_kwargs : (dict)
+        Keyword arguments for ocbpy.match_data_ocb_array
+
+    Yields
+    ----------
+    shard : (tuple)
+        Tuple containing a dict of numpy arrays with the matched SuperMAG data,
+        the matched OCB record indices, a list of the optional data keys, and
+        the output format
+    """
+    import ocbpy
+
+    cols = ["DATETIME", "NST", "STID", "MLAT", "MLT", "BN", "BE", "BZ"]
+    cols.extend(optional_keys)
+
+    for mdata in batches:
+        # Remove the data with NaNs
+        igood = np.ones(shape=mdata['MLT'].shape, dtype=bool)
+        for k in ['MLT', 'MLAT', 'BE', 'BN', 'BZ']:
+            igood &= ~np.isnan(mdata[k])
+
+        # Match the SuperMAG and OCB records
+        imatch, iocb, _ = ocbpy.match_data_ocb_array(
+            ocb, mdata['DATETIME'][igood], **match_kwargs)
+        imatch = np.where(igood)[0][imatch]
+
+        # Split the matched data into time shards
+        for ishard in np.array_split(np.arange(len(imatch)), max(1, nshards)):
+            if len(ishard) > 0:
+                yield ({k:mdata[k][imatch[ishard]] for k in cols},
+                       iocb[ishard], optional_keys, output_format)
+
+def _set_worker_ocb(ocb):
+    """ Set the OCBoundary object used by a conversion process
+
+    Parameters
+    ------------
+    ocb : (OCBoundary)
+        OCBoundary object with data loaded from an OC boundary data file
+    """
+    global _worker_ocb
+
+    _worker_ocb = ocb
+
+def _supermag_worker_output(shard):
+    """ Convert a shard of matched SuperMAG data in a conversion process
+
+    Parameters
+    ------------
+    shard : (tuple)
+        Tuple containing a dict of numpy arrays with the matched SuperMAG data,
+        the matched OCB record indices, a list of the optional data keys, and
+        the output format
+
+    Returns
+    ----------
+    shard_out : (str or dict)
+        Formatted output lines or dict of output columns
+    """
+    return _supermag_shard_output(_worker_ocb, *shard)
+
+def _supermag_shard_output(ocb, sdata, iocb, optional_keys, output_format):
+    """ Convert a shard of matched SuperMAG data for output
+
+    Parameters
+    ------------
+    ocb : (OCBoundary)
+        OCBoundary object with data loaded from an OC boundary data file
+    sdata : (dict)
+        Dict of numpy arrays with the matched SuperMAG data
+    iocb : (numpy.ndarray)
+        Matched OCB record indices
+    optional_keys : (list)
+        List of the optional data keys
+    output_format : (str)
+        Output format, 'ascii' or 'npy'
+
+    Returns
+    ----------
+    shard_out : (str or dict)
+        Formatted output lines, joined into one block, for ASCII output or
+        dict of output columns for binary output
+    """
+    import ocbpy
+    import ocbpy.ocb_scaling as ocbscal
+
+    # Set the AACGM vector values for the matched data and convert them
+    vdata = ocbscal.VectorDataArray(np.arange(len(iocb)), iocb, sdata['MLAT'],
+                                    sdata['MLT'], aacgm_n=sdata['BN'],
+                                    aacgm_e=sdata['BE'], aacgm_z=sdata['BZ'],
+                                    scale_func=ocbscal.normal_curl_evar)
+    vdata.set_ocb(ocb)
+
+    #    DATE TIME NST [SML SMU] STID [SZA] MLAT MLT BMAG BN BE BZ
+    #    OCB_MLAT OCB_MLT OCB_BMAG OCB_BN OCB_BE OCB_BZ
+    out_keys = ["DATETIME", "NST", "STID"] + optional_keys
+    out_keys.extend(["MLAT", "MLT", "BMAG", "BN", "BE", "BZ", "OCB_MLAT",
+                     "OCB_MLT", "OCB_BMAG", "OCB_BN", "OCB_BE", "OCB_BZ"])
+    out = {k:sdata[k] for k in out_keys[:3] + optional_keys}
+    out.update({"MLAT":vdata.aacgm_lat, "MLT":vdata.aacgm_mlt,
+                "BMAG":vdata.aacgm_mag, "BN":vdata.aacgm_n,
+                "BE":vdata.aacgm_e, "BZ":vdata.aacgm_z,
+                "OCB_MLAT":vdata.ocb_lat, "OCB_MLT":vdata.ocb_mlt,
+                "OCB_BMAG":vdata.ocb_mag, "OCB_BN":vdata.ocb_n,
+                "OCB_BE":vdata.ocb_e, "OCB_BZ":vdata.ocb_z})
+
+    if output_format == "npy":
+        return out
+
+    # Format all of the output lines at once
+    line_fmt = "{:} {:d} {:s} "
+    for okey in optional_keys:
+        line_fmt += "{:.2f} " if okey == "SZA" else "{:d} "
+
+    line_fmt += "{:.2f} " * 11 + "{:.2f}\n"
+    lines = ocbpy.instruments.general.format_output_lines(
+        line_fmt, [out[k] for k in out_keys])
+
+    return lines
 
 #---------------------------------------------------------------------------
 # load_supermag_ascii_data: A routine to open a supermag ascii file
@@ -187,19 +368,13 @@ def load_supermag_ascii_data(filename):
     ----------
     out : (dict of numpy.arrays)
         The dict keys are specified by the header data line, the data
-        for each key are stored in the numpy array
+        for each key are stored in the numpy array.  The record times are
+        stored under 'DATETIME' as datetime64[us].
     """
     from ocbpy.instruments import test_file
-    import datetime as dt
-    
-    fill_val = 999999
+
     header = list()
-    ind = {"SMU":fill_val, "SML":fill_val}
-    out = {"YEAR":list(), "MONTH":list(), "DAY":list(), "HOUR":list(),
-           "MIN":list(), "SEC":list(), "DATETIME":list(), "NST":list(),
-           "SML":list(), "SMU":list(), "STID":list(), "BN":list(), "BE":list(),
-           "BZ":list(), "MLT":list(), "MLAT":list(), "DEC":list(), "SZA":list()}
-    
+
     if not test_file(filename):
         return header, dict()
     
@@ -211,71 +386,246 @@ def load_supermag_ascii_data(filename):
         logging.error("unable to open input file [{:s}]".format(filename))
         return header, dict()
 
-    hflag = True
-    n = -1
-    for line in f.readlines():
-        if hflag:
-            # Fill the header list
-            header.append(line)
-            if line.find("=========================================") >= 0:
-                hflag = False
-                dflag = True
-        else:
-            # Fill the output dictionary
-            if n < 0:
-                # This is a date line
-                n = 0
-                lsplit = np.array(line.split(), dtype=int)
-                dtime = dt.datetime(lsplit[0], lsplit[1], lsplit[2], lsplit[3],
-                                    lsplit[4], lsplit[5])
-                snum = lsplit[-1]
-            else:
-                lsplit = line.split()
-
-                if len(lsplit) == 2:
-                    # This is an index line
-                    ind[lsplit[0]] = int(lsplit[1])
-                else:
-                    # This is a station data line
-                    out['YEAR'].append(dtime.year)
-                    out['MONTH'].append(dtime.month)
-                    out['DAY'].append(dtime.day)
-                    out['HOUR'].append(dtime.hour)
-                    out['MIN'].append(dtime.minute)
-                    out['SEC'].append(dtime.second)
-                    out['DATETIME'].append(dtime)
-                    out['NST'].append(snum)
-
-                    for k in ind.keys():
-                        out[k].append(ind[k])
-                        
-                    out['STID'].append(lsplit[0])
-                    out['BN'].append(float(lsplit[1]))
-                    out['BE'].append(float(lsplit[2]))
-                    out['BZ'].append(float(lsplit[3]))
-                    out['MLT'].append(float(lsplit[4]))
-                    out['MLAT'].append(float(lsplit[5]))
-                    out['DEC'].append(float(lsplit[6]))
-                    out['SZA'].append(float(lsplit[7]))
-
-                    n += 1
-
-                    if n == snum:
-                        n = -1
-                        ind = {"SMU":fill_val, "SML":fill_val}
+    header = _read_supermag_header(f)
+    batches = list(_read_supermag_batches(f))
 
     f.close()
 
-    # Recast data as numpy arrays and replace fill value with np.nan
-    for k in out:
-        if k == "STID":
-            out[k] = np.array(out[k], dtype=str)
-        else:
-            out[k] = np.array(out[k])
+    # Combine the data batches
+    if len(batches) == 0:
+        batches = [_supermag_batch(list(), list(), list(), list(), list())]
+
+    out = {k:np.concatenate([bb[k] for bb in batches]) for k in batches[0]}
 
-            if k in ['BE', 'BN', 'DEC', 'SZA', 'MLT', 'BZ']:
-                out[k][out[k] == fill_val] = np.nan
-    
     return header, out
 
+def iter_supermag_ascii_data(filename, batch_size=_batch_rows):
+    """Read a SuperMAG ASCII data file in batches of whole records
+
+    Parameters
+    ------------
+    filename : (str)
+        SuperMAG ASCI data file name
+    batch_size : (int)
+        Minimum number of station lines in each batch, only the last batch may
+        be smaller (default=100000)
+
+    Yields
+    ----------
+    out : (dict of numpy.arrays)
+        The data for each batch, with the same keys as the data returned by
+        load_supermag_ascii_data
+    """
+    from ocbpy.instruments import test_file
+
+    # The file is streamed, so there is no limit on its size
+    if not test_file(filename, max_size=None):
+        return
+
+    try:
+        f = open(filename, "r")
+    except:
+        logging.error("unable to open input file [{:s}]".format(filename))
+        return
+
+    try:
+        _read_supermag_header(f)
+
+        for out in _read_supermag_batches(f, batch_size=batch_size):
+            yield out
+    finally:
+        f.close()
+
+def _last_supermag_time(filename, block_size=65536):
+    """Find the time of the last record in a SuperMAG ASCII data file
+
+    Parameters
+    ------------
+    filename : (str)
+        SuperMAG ASCII data file name
+    block_size : (int)
+        Number of bytes read at a time, working back from the end of the file
+        (default=65536)
+
+    Returns
+    ----------
+    dtime : (datetime or NoneType)
+        Time of the last date line, or None if no date line is found
+
+    Notes
+    -------
+    Date lines are the only lines with seven integer columns
+    """
+    import os
+    import datetime as dt
+
+    with open(filename, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        carry = b""
+
+        while pos > 0:
+            start = max(0, pos - block_size)
+            f.seek(start)
+            lines = (f.read(pos - start) + carry).split(b"\n")
+            pos = start
+
+            # The first line may be incomplete until the previous block is read
+            carry = lines.pop(0) if pos > 0 else b""
+
+            for line in reversed(lines):
+                lsplit = line.split()
+                if len(lsplit) == 7 and all([ll.isdigit() for ll in lsplit]):
+                    lsplit = [int(ll) for ll in lsplit]
+                    return dt.datetime(lsplit[0], lsplit[1], lsplit[2],
+                                       lsplit[3], lsplit[4], lsplit[5])
+
+    return None
+
+def _read_supermag_header(f):
+    """Read the header lines from an open SuperMAG ASCII data file
+
+    Parameters
+    ------------
+    f : (file)
+        SuperMAG ASCII data file handle, positioned at the start of the file
+
+    Returns
+    ----------
+    header : (list)
+        List of header lines, the file is left positioned after the header
+    """
+    header = list()
+
+    line = f.readline()
+    while len(line) > 0:
+        header.append(line)
+        if line.find("=========================================") >= 0:
+            break
+        line = f.readline()
+
+    return header
+
+def _read_supermag_batches(f, batch_size=_batch_rows):
+    """Read the data records from an open SuperMAG ASCII data file
+
+    Parameters
+    ------------
+    f : (file)
+        SuperMAG ASCII data file handle, positioned after the header
+    batch_size : (int)
+        Minimum number of station lines in each batch, only the last batch may
+        be smaller (default=100000)
+
+    Yields
+    ----------
+    out : (dict of numpy.arrays)
+        The data for a batch of whole records
+
+    Notes
+    -------
+    Only the date and index lines are split as they are read.  The station
+    lines of each record are read as a block, using the number of stations in
+    the date line, and are converted for the whole batch at once.
+    """
+    import datetime as dt
+    import itertools
+
+    dtimes = list()
+    nst = list()
+    indices = list()
+    nlines = list()
+    stations = list()
+
+    for line in f:
+        # This is a date line
+        lsplit = [int(ll) for ll in line.split()]
+        dtimes.append(dt.datetime(lsplit[0], lsplit[1], lsplit[2], lsplit[3],
+                                  lsplit[4], lsplit[5]))
+        nst.append(lsplit[-1])
+        indices.append({"SMU":_fill_val, "SML":_fill_val})
+        nlines.append(0)
+
+        # Read the index lines, then all of the station lines for this record
+        while nlines[-1] < nst[-1]:
+            line = next(f, "")
+            if len(line) == 0:
+                break
+
+            lsplit = line.split()
+            if len(lsplit) == 2:
+                # This is an index line
+                indices[-1][lsplit[0]] = int(lsplit[1])
+            else:
+                # These are the station data lines
+                nprev = len(stations)
+                stations.append(line)
+                stations.extend(itertools.islice(f, nst[-1] - 1))
+                nlines[-1] = len(stations) - nprev
+
+        # Release the finished records once the batch is full
+        if len(stations) >= batch_size:
+            yield _supermag_batch(dtimes, nst, indices, nlines, stations)
+            dtimes = list()
+            nst = list()
+            indices = list()
+            nlines = list()
+            stations = list()
+
+    if len(stations) > 0:
+        yield _supermag_batch(dtimes, nst, indices, nlines, stations)
+
+def _supermag_batch(dtimes, nst, indices, nlines, stations):
+    """Build a dictionary of nparrays from a batch of SuperMAG records
+
+    Parameters
+    ------------
+    dtimes : (list)
+        Datetime of each record
+    nst : (list)
+        Number of stations given in the date line of each record
+    indices : (list)
+        Dict of the SML and SMU index values for each record
+    nlines : (list)
+        Number of station lines read for each record
+    stations : (list)
+        Station data lines for all records
+
+    Returns
+    ----------
+    out : (dict of numpy.arrays)
+        The data for each station line
+    """
+    # Expand the record values to the station lines
+    nlines = np.array(nlines, dtype=int)
+    out = {"DATETIME":np.repeat(np.array(dtimes, dtype="datetime64[us]"),
+                                nlines)}
+    for k, attr in [("YEAR", "year"), ("MONTH", "month"), ("DAY", "day"),
+                    ("HOUR", "hour"), ("MIN", "minute"), ("SEC", "second")]:
+        out[k] = np.repeat(np.array([getattr(dtime, attr) for dtime in dtimes],
+                                    dtype=int), nlines)
+
+    out["NST"] = np.repeat(np.array(nst, dtype=int), nlines)
+    for k in ["SML", "SMU"]:
+        out[k] = np.repeat(np.array([ind[k] for ind in indices], dtype=int),
+                           nlines)
+
+    # Split all of the station lines at once.  Lines with extra columns need
+    # to be split individually.
+    words = "".join(stations).split()
+    if len(words) != 8 * len(stations):
+        words = [ww for line in stations for ww in line.split()[:8]]
+
+    # Cast the station data as numpy arrays and replace fill value with np.nan
+    out["STID"] = np.array(words[0::8], dtype=str)
+    del words[0::8]
+    vals = np.array(words, dtype=float).reshape((len(stations), 7))
+    ifill = (vals == _fill_val)
+    ifill[:,4] = False
+    vals[ifill] = np.nan
+    for i, k in enumerate(["BN", "BE", "BZ", "MLT", "MLAT", "DEC", "SZA"]):
+        out[k] = vals[:,i]
+
+    return out
+
 # End load_supermag_ascii_data
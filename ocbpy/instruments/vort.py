@@ -21,7 +21,7 @@ import numpy as np
 
 def vort2ascii_ocb(vortfile, outfile, ocb=None, ocbfile=None, max_sdiff=600,
                    save_all=False, min_sectors=7, rcent_dev=8.0, max_r=23.0,
-                   min_r=10.0, min_j=0.15):
+                   min_r=10.0, min_j=0.15, workers=1, output_format="ascii"):
     """ Coverts the location of vorticity data in AACGM coordinates into a frame
     that is relative to the open-closed field-line boundary (OCB) as determined
     from a circle fit to the poleward boundary of the auroral oval
@@ -55,6 +55,15 @@ def vort2ascii_ocb(vortfile, outfile, ocb=None, ocbfile=None, max_sdiff=600,
         (default=10.0)
     min_j : (float)
         Minimum unitless current magnitude scale difference (default=0.15)
+    workers : (int)
+        Number of processes used to load and convert the data.  If greater
+        than one, the vorticity file is split into chunks of whole date blocks
+        that are loaded and converted in a process pool and written in order
+        (default=1)
+    output_format : (str)
+        'ascii' to write a whitespace-delimited text file, or 'npy' to write a
+        directory of full-precision binary columns that may be loaded with
+        ocbpy.instruments.general.load_binary_output (default='ascii')
 
     Returns
     ---------
@@ -63,9 +72,9 @@ def vort2ascii_ocb(vortfile, outfile, ocb=None, ocbfile=None, max_sdiff=600,
     Notes
     --------
     Input header or col_names must include the names in the default string.
+    If an error occurs while writing, the partly written output is removed.
     """
     import ocbpy
-    import ocbpy.ocb_scaling as ocbscal
     import datetime as dt
 
     assert ocbpy.instruments.test_file(vortfile), \
@@ -73,19 +82,33 @@ def vort2ascii_ocb(vortfile, outfile, ocb=None, ocbfile=None, max_sdiff=600,
     assert isinstance(outfile, str), \
         logging.error("output filename is not a string [{:}]".format(outfile))
 
-    # Read the vorticity data
-    vdata = load_vorticity_ascii_data(vortfile, save_all=save_all)
-    need_keys = ["VORTICITY", "CENTRE_MLAT", "DATETIME", "MLT"]
-    
-    if vdata is None or not all([kk in vdata.keys() for kk in need_keys]):
-        estr = "unable to load necessary data from [{:s}]".format(vortfile)
-        logging.error(estr)
+    if output_format not in ["ascii", "npy"]:
+        logging.error("unknown output format [{:}]".format(output_format))
         return
 
+    # Find the date blocks that will be read by each process
+    chunks = None
+    if workers > 1:
+        chunks, vstart, vend = _vorticity_chunks(vortfile, workers)
+
+    if chunks is None or len(chunks) < 2:
+        # Read the vorticity data
+        chunks = None
+        vdata = load_vorticity_ascii_data(vortfile, save_all=save_all)
+        need_keys = ["VORTICITY", "CENTRE_MLAT", "DATETIME", "MLT"]
+    
+        if vdata is None or not all([kk in vdata.keys() for kk in need_keys]):
+            estr = "unable to load necessary data from [{:s}]".format(vortfile)
+            logging.error(estr)
+            return
+
+        vstart = vdata['DATETIME'][0]
+        vend = vdata['DATETIME'][-1]
+
     # Load the OCB data
     if ocb is None or not isinstance(ocb, ocbpy.ocboundary.OCBoundary):
-        vstart = vdata['DATETIME'][0] - dt.timedelta(seconds=max_sdiff+1)
-        vend = vdata['DATETIME'][-1] + dt.timedelta(seconds=max_sdiff+1)
+        vstart = vstart - dt.timedelta(seconds=max_sdiff+1)
+        vend = vend + dt.timedelta(seconds=max_sdiff+1)
         ocb = ocbpy.ocboundary.OCBoundary(ocbfile, stime=vstart, etime=vend)
 
     if ocb.filename is None or ocb.records == 0:
@@ -95,79 +118,291 @@ def vort2ascii_ocb(vortfile, outfile, ocb=None, ocbfile=None, max_sdiff=600,
             logging.error("bad OCB file specified")
         return
 
+    # Set the output columns
+    vkeys = list()
+    if save_all:
+        vkeys = _vorticity_keys(save_all)
+        vkeys.pop(vkeys.index("DATETIME"))
+
+    out_keys = ["DATETIME"] + vkeys + ["OCB_LAT", "OCB_MLT", "NORM_VORT"]
+
+    # Load, match, and convert the vorticity data, writing the output in order
+    match_kwargs = {"max_tol":max_sdiff, "min_sectors":min_sectors,
+                    "rcent_dev":rcent_dev, "max_r":max_r, "min_r":min_r,
+                    "min_j":min_j}
+
+    pool = None
+    if chunks is None:
+        chunk_out = (_vorticity_output(vd, ocb, vkeys, match_kwargs,
+                                       output_format) for vd in [vdata])
+    else:
+        import multiprocessing as mp
+
+        pool = mp.Pool(processes=len(chunks))
+        chunk_out = pool.imap(_vorticity_chunk_output,
+                              [(vortfile, cstart, cend, save_all, ocb, vkeys,
+                                match_kwargs, output_format)
+                               for cstart, cend in chunks])
+
+    try:
+        chunk_out = _checked_chunks(chunk_out, vortfile)
+        if output_format == "npy":
+            attrs = {"instrument":"vort", "ocbfile":ocb.filename,
+                     "boundary_lat":ocb.boundary_lat, "max_sdiff":max_sdiff}
+            ocbpy.instruments.general.write_binary_output(outfile, chunk_out,
+                                                          out_keys, attrs)
+            return
+
+        # Write the header line, then the converted data
+        outline = "#DATE TIME {:s}\n".format(" ".join(out_keys[1:]))
+        ocbpy.instruments.general.write_output_file(outfile, outline,
+                                                    chunk_out)
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    return
+
+def _vorticity_output(vdata, ocb, vkeys, match_kwargs, output_format):
+    """ Match and convert vorticity data for output
+
+    Parameters
+    -----------
+    vdata : (dict)
+        Dictionary of numpy arrays
+    ocb : (ocbpy.ocboundary.OCBoundary)
+        Object containing open closed boundary data
+    vkeys : (list)
+        List of additional data keys to include in the output
+    match_kwargs : (dict)
+        Keyword arguments for ocbpy.match_data_ocb_array
+    output_format : (str)
+        Output format, 'ascii' or 'npy'
+
+    Returns
+    ---------
+    vort_out : (str or dict)
+        Formatted output lines, joined into one block, for ASCII output or
+        dict of output columns for binary output
+    """
+    import ocbpy
+    import ocbpy.ocb_scaling as ocbscal
+
     # Set the reference radius
     ref_r = 90.0 - abs(ocb.boundary_lat)
 
-    # Open and test the file to ensure it can be written
+    # Match the vorticity and OCB records
+    imatch, iocb, _ = ocbpy.match_data_ocb_array(ocb, vdata['DATETIME'],
+                                                 **match_kwargs)
+
+    # Use the matched OCBs to convert the AACGM grid coordinates to ones
+    # related to the OCB
+    out = {k:vdata[k][imatch] for k in ["DATETIME"] + vkeys}
+    out["OCB_LAT"], out["OCB_MLT"] = ocb.normal_coord(
+        vdata['CENTRE_MLAT'][imatch], vdata['MLT'][imatch], ocb_ind=iocb)
+    out["NORM_VORT"] = ocbscal.normal_curl_evar(vdata['VORTICITY'][imatch],
+                                                ocb.r[iocb], ref_r)
+
+    if output_format == "npy":
+        return out
+
+    # Format all of the output lines at once
+    #    DATE TIME (SAVE_ALL) OCB_LAT OCB_MLT NORM_VORT
+    line_fmt = "{:} " * (len(vkeys) + 1) + "{:.2f} {:.6f} {:.6f}\n"
+    out_keys = ["DATETIME"] + vkeys + ["OCB_LAT", "OCB_MLT", "NORM_VORT"]
+    lines = ocbpy.instruments.general.format_output_lines(
+        line_fmt, [out[k] for k in out_keys])
+
+    return lines
+
+def _vorticity_chunk_output(chunk_args):
+    """ Load a chunk of a vorticity file, then match and convert the data
+
+    Parameters
+    -----------
+    chunk_args : (tuple)
+        Tuple containing the vorticity file name, the first and last byte
+        offsets of the chunk, the save_all flag, the OCBoundary object, the
+        list of additional output keys, the matching keyword arguments, and
+        the output format
+
+    Returns
+    ---------
+    vort_out : (str, dict, or NoneType)
+        Formatted output lines or dict of output columns, or None if the chunk
+        could not be loaded
+    """
+    import io
+
+    (vortfile, cstart, cend, save_all, ocb, vkeys, match_kwargs,
+     output_format) = chunk_args
+
+    with open(vortfile, "rb") as fvort:
+        fvort.seek(cstart)
+        ctext = fvort.read(cend - cstart).decode()
+
+    vdata = _read_vorticity_blocks(io.StringIO(ctext), save_all=save_all)
+
+    if vdata is None:
+        return None
+
+    return _vorticity_output(vdata, ocb, vkeys, match_kwargs, output_format)
+
+def _checked_chunks(chunk_out, vortfile):
+    """ Pass on the converted chunks in order, logging chunks that could not
+    be loaded
+
+    Parameters
+    -----------
+    chunk_out : (iterable)
+        Iterable of converted chunks.  None indicates a chunk that could not
+        be loaded.
+    vortfile : (str)
+        SuperDARN vorticity file name
+
+    Yields
+    ---------
+    vort_out : (str, dict, or NoneType)
+        Converted chunk
+    """
+    for vort_out in chunk_out:
+        if vort_out is None:
+            estr = "unable to load necessary data from [{:s}]".format(vortfile)
+            logging.error(estr)
+
+        yield vort_out
+
+def _vorticity_chunks(vortfile, nchunks):
+    """ Split a vorticity file into chunks of whole date blocks
+
+    Parameters
+    -----------
+    vortfile : (str)
+        SuperDARN vorticity file in block format
+    nchunks : (int)
+        Desired number of chunks
+
+    Returns
+    ---------
+    chunks : (list or NoneType)
+        List of tuples with the first and last byte offsets of each chunk, or
+        None if the file cannot be split
+    stime : (datetime or NoneType)
+        Time of the first date block
+    etime : (datetime or NoneType)
+        Time of the last date block
+
+    Notes
+    ------
+    Only the date and number of entries lines are interpreted, the data lines
+    are checked by the processes that load each chunk
+    """
+    from ocbpy.instruments import test_file
+
+    if not test_file(vortfile):
+        return None, None, None
+
+    # Find the byte offset of each date block
+    block_start = list()
+    block_times = list()
     try:
-        fout = open(outfile, 'w')
+        with open(vortfile, "rb") as fvort:
+            offset = 0
+            vline = fvort.readline()
+            while len(vline) > 0:
+                if len(vline.split()) == 0:
+                    # Blank lines are only expected between blocks
+                    return None, None, None
+
+                block_start.append(offset)
+                block_times.append(_vorticity_block_time(
+                    vline.decode().split())[-1])
+                offset += len(vline)
+
+                # The number of entries line gives the block length, which
+                # includes the line that follows the last entry
+                vline = fvort.readline()
+                offset += len(vline)
+                for i in range(3 * int(vline) + 1):
+                    offset += len(fvort.readline())
+
+                vline = fvort.readline()
     except:
-        logging.error("unable to create output file [{:}]".format(outfile))
-        return
+        return None, None, None
+
+    if len(block_start) == 0:
+        return None, None, None
+
+    # Group the blocks into chunks of similar size
+    block_start = np.array(block_start)
+    ibreak = np.unique(np.searchsorted(block_start, np.linspace(
+        0, offset, nchunks + 1)[1:-1]))
+    ibreak = ibreak[(ibreak > 0) & (ibreak < block_start.shape[0])]
+    chunk_start = np.append(block_start[0], block_start[ibreak])
+    chunk_start = np.unique(chunk_start)
+    chunk_end = np.append(chunk_start[1:], offset)
+    chunks = [(int(cs), int(ce)) for cs, ce in zip(chunk_start, chunk_end)]
 
-    # Write header line
-    outline = "#DATE TIME "
+    return chunks, block_times[0], block_times[-1]
 
+def _vorticity_keys(save_all=False):
+    """ List the vorticity data keys
+
+    Parameters
+    -----------
+    save_all : (bool)
+        Include all data keys (True), or only those needed to calculate the OCB
+        coordinates and normalised vorticity (False). (default=False)
+
+    Returns
+    ---------
+    vkeys : (list)
+        List of data keys
+    """
+    vkeys = ["YEAR", "MONTH", "DAY", "UTH", "VORTICITY", "MLT", "CENTRE_MLAT",
+             "DATETIME"]
     if save_all:
-        vkeys = vdata.keys()
-        vkeys.pop(vkeys.index("DATETIME"))
-        outline = "{:s}{:s} ".format(outline, " ".join(vkeys))
+        vkeys.extend(["R1BM1", "R1BM2", "R2BM1", "R2BM2", "AREA", "CENTRE_GLAT",
+                      "CENTRE_GLON", "C1_GLAT", "C1_GLON", "C2_GLAT", "C2_GLON",
+                      "C3_GLAT", "C3_GLON", "C4_GLAT", "C4_GLON", "CENTRE_MLON",
+                      "C1_MLAT", "C1_MLON", "C2_MLAT", "C2_MLON", "C3_MLAT",
+                      "C3_MLON", "C4_MLAT", "C4_MLON"])
 
-    outline = "{:s}OCB_LAT OCB_MLT NORM_VORT\n".format(outline)
-    
-    try:
-        fout.write(outline)
-    except:
-        estr = "unable to write [{:s}] because of error ".format(outline)
-        estr = "{:s}[{:}]".format(estr, e)
-        logging.error(estr)
-        return
+    return vkeys
 
-    # Initialise the ocb and vorticity indices
-    ivort = 0
-    num_vort = vdata['DATETIME'].shape[0]
-
-    # Cycle through the data, matching vorticity and OCB records
-    while ivort < num_vort and ocb.rec_ind < ocb.records:
-        ivort = ocbpy.match_data_ocb(ocb, vdata['DATETIME'], idat=ivort,
-                                     max_tol=max_sdiff, min_sectors=min_sectors,
-                                     rcent_dev=rcent_dev, max_r=max_r,
-                                     min_r=min_r, min_j=min_j)
-        
-        if ivort < num_vort and ocb.rec_ind < ocb.records:
-            # Use the indexed OCB to convert the AACGM grid coordinate to one
-            # related to the OCB
-            nlat, nmlt = ocb.normal_coord(vdata['CENTRE_MLAT'][ivort],
-                                          vdata['MLT'][ivort])
-            nvort = ocbscal.normal_curl_evar(vdata['VORTICITY'][ivort],
-                                             ocb.r[ocb.rec_ind], ref_r)
-
-            # Format the output line
-            #    DATE TIME (SAVE_ALL) OCB_LAT OCB_MLT NORM_VORT
-            outline = "{:} ".format(vdata['DATETIME'][ivort])
-
-            if save_all:
-                for k in vkeys:
-                    outline = "{:s}{:} ".format(outline, vdata[k][ivort])
-
-            outline = "{:s}{:.2f} {:.6f} {:.6f}\n".format(outline, nlat, nmlt,
-                                                          nvort)
-            
-            try:
-                fout.write(outline)
-            except e:
-                estr = "unable to write [{:s}] ".format(outline)
-                estr = "{:s}because of error [{:}]".format(estr, e)
-                logging.error(estr)
-                return
-
-            # Move to next line
-            ivort += 1
-
-    # Close output file
-    fout.close()
-        
-    return
+def _vorticity_block_time(vsplit):
+    """ Get the time of a vorticity date block
+
+    Parameters
+    -----------
+    vsplit : (list)
+        Split date line, containing the year, month, day, and UT hour
+
+    Returns
+    ---------
+    yy : (int)
+        Year
+    mm : (int)
+        Month
+    dd : (int)
+        Day
+    hh : (float)
+        UT hour
+    dtime : (datetime)
+        Time of the date block
+    """
+    import datetime as dt
+
+    yy = int(vsplit[0])
+    mm = int(vsplit[1])
+    dd = int(vsplit[2])
+    hh = float(vsplit[3])
+
+    # Calculate the datetime
+    dtime = (dt.datetime(yy, mm, dd) +
+             dt.timedelta(seconds=np.floor(hh * 3600.0)))
+
+    return yy, mm, dd, hh, dtime
 
 def load_vorticity_ascii_data(vortfile, save_all=False):
     """Load SuperDARN vorticity data files.
@@ -183,10 +418,10 @@ def load_vorticity_ascii_data(vortfile, save_all=False):
     Returns
     ---------
     vdata : (dict)
-        Dictionary of numpy arrays
+        Dictionary of numpy arrays, with the block times stored under
+        'DATETIME' as datetime64[us]
     """
     from ocbpy.instruments import test_file
-    import datetime as dt
 
     if not test_file(vortfile):
         return None
@@ -198,110 +433,109 @@ def load_vorticity_ascii_data(vortfile, save_all=False):
         logging.error("unable to open vorticity file [{:s}]".format(vortfile))
         return None
 
-    # Initialise the output dictionary
-    vkeys = ["YEAR", "MONTH", "DAY", "UTH", "VORTICITY", "MLT", "CENTRE_MLAT",
-             "DATETIME"]
-    if save_all:
-        vkeys.extend(["R1BM1", "R1BM2", "R2BM1", "R2BM2", "AREA", "CENTRE_GLAT",
-                      "CENTRE_GLON", "C1_GLAT", "C1_GLON", "C2_GLAT", "C2_GLON",
-                      "C3_GLAT", "C3_GLON", "C4_GLAT", "C4_GLON", "CENTRE_MLON",
-                      "C1_MLAT", "C1_MLON", "C2_MLAT", "C2_MLON", "C3_MLAT",
-                      "C3_MLON", "C4_MLAT", "C4_MLON"])
-    vdata = {k:list() for k in vkeys}
-    vkeys = set(vkeys)
-    
+    # Read the data blocks
+    vdata = _read_vorticity_blocks(fvort, save_all=save_all)
+
+    # Close file handle
+    fvort.close()
+
+    return vdata
+
+def _read_vorticity_blocks(fvort, save_all=False):
+    """Read SuperDARN vorticity data blocks from an open file
+
+    Parameters
+    -----------
+    fvort : (file)
+        Open file-like object positioned at the start of a date block
+    save_all : (bool)
+        Save all data from the file (True), or only data needed to calculate
+        the OCB coordinates and normalised vorticity (False). (default=False)
+
+    Returns
+    ---------
+    vdata : (dict or NoneType)
+        Dictionary of numpy arrays, or None if an unexpected line is found
+
+    Notes
+    ------
+    The entry lines of each date block are read together, using the number of
+    entries line, and the requested columns are converted for all blocks at
+    once.
+    """
+    import itertools
+
     # Set the data block keys
     bkeys = [["R1BM1", "R1BM2", "R2BM1", "R2BM2", "AREA", "VORTICITY", "MLT"],
              ["GFLG", "CENTRE_GLAT", "CENTRE_GLON", "C1_GLAT", "C1_GLON",
               "C2_GLAT", "C2_GLON", "C3_GLAT", "C3_GLON", "C4_GLAT", "C4_GLON"],
              ["MFLG", "CENTRE_MLAT", "CENTRE_MLON", "C1_MLAT", "C1_MLON",
               "C2_MLAT", "C2_MLON", "C3_MLAT", "C3_MLON", "C4_MLAT", "C4_MLON"]]
-    
-    # Read the lines and assign data.  Recall that blank lines in file are
-    # returned as '\n'
-    vline = fvort.readline()
-    vsplit = vline.split()
-    vinc = 0
-
-    while len(vline) > 0:
-        if vinc == 0:
-            # This is a date line
-            if len(vsplit) != 4:
-                estr = "unexpected line encountered when date line "
-                estr = "{:s}expected [{:s}]".format(estr, vline)
-                logging.error(estr)
-                fvort.close()
-                return None
-
-            # Save the data in the format desired for the output dict
-            yy = int(vsplit[0])
-            mm = int(vsplit[1])
-            dd = int(vsplit[2])
-            hh = float(vsplit.pop())
-
-            # Calculate and save the datetime
-            stime = " ".join(vsplit)
-            dtime = (dt.datetime.strptime(stime, "%Y %m %d") +
-                     dt.timedelta(seconds=np.floor(hh * 3600.0)))
-            vinc += 1
-        elif vinc == 1:
-            # This is a number of entries line
-            if len(vsplit) != 1:
-                estr = "unexpected line encountered when number of entries "
-                estr = "{:s}line expected [{:s}]".format(estr, vline)
-                logging.error(estr)
-                fvort.close()
-                return None
-
-            # Save the number of entries
-            nentries = int(vsplit[0])
-            vinc += 1
-        else:
-            # This is an entry.  For each entry there are three lines
-            ninc = 0
-            while ninc < nentries:
-                # Save the time data
-                vdata['YEAR'].append(yy)
-                vdata['MONTH'].append(mm)
-                vdata['DAY'].append(dd)
-                vdata['UTH'].append(hh)
-                vdata['DATETIME'].append(dtime)
-
-                for bklist in bkeys:
-                    # Test to see that this line has the right number of col
-                    if len(vsplit) != len(bklist):
-                        estr = "unexpected line encountered for a data block "
-                        estr = "{:s}[{:s}]".format(estr, vline)
-                        logging.error(estr)
-                        fvort.close()
-                        return None
-
-                    # Save all desired keys
-                    gkeys = list(vkeys.intersection(bklist))
-
-                    for gk in gkeys:
-                        ik = bklist.index(gk)
-                        vdata[gk].append(float(vsplit[ik]))
-
-                    # Move to next line
-                    vline = fvort.readline()
-                    vsplit = vline.split()
-                    
-                # All data lines for this entry have been processed, incriment
-                ninc += 1
-                    
-            # All entries in block have been processed, reset incriment
-            vinc = 0
-
-        # Move to next line
-        vline = fvort.readline()
+    ekeys = [bk for bklist in bkeys for bk in bklist]
+
+    # Read the date and number of entries lines, saving the entry lines for
+    # each block.  Recall that blank lines in file are returned as '\n'
+    block_dates = list()
+    block_entries = list()
+    words = list()
+
+    for vline in fvort:
+        # This is a date line
         vsplit = vline.split()
+        if len(vsplit) != 4:
+            estr = "unexpected line encountered when date line "
+            estr = "{:s}expected [{:s}]".format(estr, vline)
+            logging.error(estr)
+            return None
 
-    # Close file handle
-    fvort.close()
+        block_dates.append(vsplit)
 
-    # Recast lists as numpy arrays
-    for k in vdata.keys():
-        vdata[k] = np.array(vdata[k])
+        # This is a number of entries line
+        vline = next(fvort, "")
+        vsplit = vline.split()
+        if len(vsplit) != 1:
+            estr = "unexpected line encountered when number of entries "
+            estr = "{:s}line expected [{:s}]".format(estr, vline)
+            logging.error(estr)
+            return None
+
+        nentries = int(vsplit[0])
+        block_entries.append(nentries)
+
+        # For each entry there are three lines, then the block is followed by
+        # one line that is not used
+        elines = list(itertools.islice(fvort, 3 * nentries))
+        ewords = "".join(elines).split()
+        if(len(elines) != 3 * nentries or
+           len(ewords) != nentries * len(ekeys)):
+            # Find the line with the wrong number of columns
+            elines.extend([""] * (3 * nentries - len(elines)))
+            for i, vline in enumerate(elines):
+                if len(vline.split()) != len(bkeys[i % 3]):
+                    estr = "unexpected line encountered for a data block "
+                    estr = "{:s}[{:s}]".format(estr, vline)
+                    logging.error(estr)
+                    return None
+
+        words.extend(ewords)
+        next(fvort, "")
+
+    # Initialise the output dictionary, expanding the block times to each
+    # entry
+    vkeys = _vorticity_keys(save_all)
+    vdata = dict()
+    nentries = np.array(block_entries, dtype=int)
+    btimes = [_vorticity_block_time(vsplit) for vsplit in block_dates]
+    for i, k in enumerate(["YEAR", "MONTH", "DAY", "UTH"]):
+        vdata[k] = np.repeat(np.array([btime[i] for btime in btimes],
+                                      dtype=int if i < 3 else float), nentries)
+
+    # Cast the requested entry columns as numpy arrays
+    for k in vkeys:
+        if k == "DATETIME":
+            vdata[k] = np.repeat(np.array([btime[-1] for btime in btimes],
+                                          dtype="datetime64[us]"), nentries)
+        elif k not in vdata:
+            vdata[k] = np.array(words[ekeys.index(k)::len(ekeys)], dtype=float)
 
     return vdata
@@ -11,12 +11,23 @@ normal_evar(evar, unscaled_r, scaled_r)
 normal_curl_evar(curl_evar, unscaled_r, scaled_r)
     Normalise a variable proportional to the curl of the electric field (such
     as vorticity)
+calc_vec_pole_angle(aacgm_lat, aacgm_mlt, ocb_aacgm_lat, ocb_aacgm_mlt)
+    Calculate the vector angles of the vector-poles triangles
+calc_quadrants(aacgm_mlt, ocb_aacgm_mlt, pole_angle, aacgm_n, aacgm_e)
+    Determine the AACGM quadrants of the OCB poles and data vectors
+hav(alpha, out=None)
+    Haversine
+archav(hav, out=None)
+    Inverse haversine
 
 Classes
 -------------------------------------------------------------------------------
 VectorData(object)
     Holds vector data in AACGM N-E-Z coordinates along with location
     information.  Converts vector from AACGM to OCB coordinates.
+VectorDataArray(object)
+    Holds arrays of vector data in AACGM N-E-Z coordinates along with location
+    information.  Converts all vectors from AACGM to OCB coordinates at once.
 
 Moduleauthor
 -------------------------------------------------------------------------------
@@ -31,6 +42,10 @@ Chisham, G. (2017), A new methodology for the development of high-latitude
 import logbook as logging
 import numpy as np
 
+# Names of the AACGM north azimuth comparisons encoded by _rotation_bits
+_rotation_keys = ["pole", "pole_plus", "pole_minus", "minus_pole",
+                  "supp_pole"]
+
 def normal_evar(evar, unscaled_r, scaled_r):
     """ Normalise a variable proportional to the electric field
 
@@ -393,16 +408,18 @@ class VectorData(object):
         """
 
         # Set the AACGM coordinates of the OCB pole
+        geometry = ocb.get_pole_geometry()
         self.unscaled_r = ocb.r[self.ocb_ind]
         self.scaled_r = 90.0 - abs(ocb.boundary_lat)
-        self.ocb_aacgm_mlt = ocb.phi_cent[self.ocb_ind] / 15.0
-        self.ocb_aacgm_lat = 90.0 - ocb.r_cent[self.ocb_ind]
+        self.ocb_aacgm_mlt = geometry["ocb_aacgm_mlt"][self.ocb_ind]
+        self.ocb_aacgm_lat = geometry["ocb_aacgm_lat"][self.ocb_ind]
 
         # If the OCB vector coordinates weren't included in the initial info,
         # update them here
         if np.isnan(self.ocb_lat) or np.isnan(self.ocb_mlt):
             self.ocb_lat, self.ocb_mlt = ocb.normal_coord(self.aacgm_lat,
-                                                          self.aacgm_mlt)
+                                                          self.aacgm_mlt,
+                                                          ocb_ind=self.ocb_ind)
 
         # Get the angle at the data vector appended by the AACGM and OCB poles
         self.calc_vec_pole_angle()
@@ -460,25 +477,13 @@ class VectorData(object):
         assert(not np.isnan(self.pole_angle)), \
             logging.error("vector angle in poles-vector triangle required")
 
-        # Determine where the OCB pole is relative to the data vector
-        ocb_adj_mlt = self.ocb_aacgm_mlt - self.aacgm_mlt
-        while ocb_adj_mlt < 0.0:
-            ocb_adj_mlt += 24.0
-        if abs(ocb_adj_mlt) >= 24.0:
-            ocb_adj_mlt -= 24.0 * np.sign(ocb_adj_mlt)
-
-        if self.pole_angle < 90.0:
-            # OCB pole lies in quadrant 1 or 2
-            self.ocb_quad = 1 if ocb_adj_mlt < 12.0 else 2
-        else:
-            # OCB poles lies in quadrant 3 or 4
-            self.ocb_quad = 3 if ocb_adj_mlt < 24.0 else 4
-       
-        # Now determine which quadrant the vector is pointed into
-        if self.aacgm_n >= 0.0:
-            self.vec_quad = 1 if self.aacgm_e >= 0.0 else 2
-        else:
-            self.vec_quad = 4 if self.aacgm_e >= 0.0 else 3
+        # Determine where the OCB pole is relative to the data vector, and
+        # which quadrant the vector is pointed into
+        ocb_quad, vec_quad = calc_quadrants(self.aacgm_mlt, self.ocb_aacgm_mlt,
+                                            self.pole_angle, self.aacgm_n,
+                                            self.aacgm_e)
+        self.ocb_quad = int(ocb_quad)
+        self.vec_quad = int(vec_quad)
 
         return
         
@@ -606,37 +611,9 @@ class VectorData(object):
         assert not np.isnan(self.pole_angle), \
             logging.error("Vector angle undefined")
 
-        # Initialise the output and set the quadrant dictionary
-        ocb_naz = np.nan
-        quads = {o:{v:True if self.ocb_quad == o and self.vec_quad == v
-                    else False for v in quad_range} for o in quad_range}
-
         # Calculate OCB polar angle based on quadrants and other angles
-        if(((quads[2][4] or quads[2][2]) and self.aacgm_naz > self.pole_angle)
-           or (self.aacgm_naz > self.pole_angle and quads[1][1]) or
-           (quads[1][4] and self.aacgm_naz <= self.pole_angle + 90.0)):
-            ocb_naz = self.aacgm_naz - self.pole_angle
-        elif((self.aacgm_naz <= self.pole_angle and quads[1][1]) or
-             (self.aacgm_naz <= self.pole_angle and
-              (quads[2][4] or quads[2][2])) or
-             (self.aacgm_naz > self.pole_angle - 90.0 and
-              (quads[4][1] or quads[4][3] or quads[3][4] or quads[3][2]))):
-            ocb_naz = self.pole_angle - self.aacgm_naz
-        elif(self.aacgm_naz <= 90.0 - self.pole_angle and
-             (quads[1][2] or quads[2][1] or quads[2][3])):
-            ocb_naz = self.aacgm_naz + self.pole_angle
-        elif((self.aacgm_naz > 90.0 - self.pole_angle and
-              (quads[1][2] or quads[2][1] or quads[2][3])) or
-             ((quads[4][4] or quads[4][2] or quads[3][1] or quads[3][3] or
-               quads[1][3]) and self.aacgm_naz <= 180.0 - self.pole_angle)):
-            ocb_naz = 180.0 - self.aacgm_naz - self.pole_angle
-        elif(((quads[3][1] or quads[3][3] or quads[4][4] or quads [4][2] or
-               quads[1][3]) and self.aacgm_naz > 180.0 - self.pole_angle) or
-             (quads[1][4] and self.aacgm_naz > self.pole_angle + 90.0)):
-            ocb_naz = self.aacgm_naz - 180.0 + self.pole_angle
-        elif(self.aacgm_naz <= self.pole_angle - 90.0 and
-             (quads[3][4] or quads[3][2] or quads[4][1] or quads[4][3])):
-            ocb_naz = 180.0 - self.pole_angle + self.aacgm_naz
+        ocb_naz = _ocb_polar_angle(self.ocb_quad, self.vec_quad,
+                                   self.aacgm_naz, self.pole_angle)
 
         return ocb_naz
     
@@ -650,8 +627,8 @@ class VectorData(object):
         east : (boolian)
             Get the sign of the east component (default=False)
         quads : (dictionary)
-            Dictionary of boolian values for OCB and Vector quadrants
-            (default=dict())
+            Not used, the quadrants are taken from self.ocb_quad and
+            self.vec_quad (default=dict())
 
         Requires
         ----------
@@ -685,52 +662,16 @@ class VectorData(object):
         # Initialise output
         vsigns = {"north":0, "east":0}
 
-        # If necessary, initialise quadrant dictionary
-        if not np.all(quads.keys() == quad_range):
-            quads = {o:{v:True if self.ocb_quad == o and self.vec_quad == v
-                        else False for v in quad_range} for o in quad_range}
-
         if north:
-            pole_minus = self.pole_angle - 90.0
-            minus_pole = 90.0 - self.pole_angle
-            pole_plus = self.pole_angle + 90.0
-            
-            if(quads[1][1] or quads[2][2] or quads[3][3] or quads[4][4] or
-               (quads[1][4] and self.aacgm_naz <= pole_plus) or
-               (quads[1][2] and self.aacgm_naz > minus_pole) or
-               (quads[2][1] and self.aacgm_naz <= minus_pole) or 
-               ((quads[3][4] or quads[4][3]) and self.aacgm_naz <= pole_minus)
-               or ((quads[3][2] or quads[4][1]) and self.aacgm_naz > pole_minus)
-               or (quads[2][3] and self.aacgm_naz > minus_pole)):
-                vsigns["north"] = 1
-            elif((quads[1][2] and self.aacgm_naz > minus_pole) or
-                 (quads[1][4] and self.aacgm_naz > pole_plus) or
-                 (quads[2][1] and self.aacgm_naz > minus_pole) or
-                 ((quads[4][1] or quads[3][2]) and self.aacgm_naz <= pole_minus)
-                 or (quads[2][3] and self.aacgm_naz <= minus_pole) or
-                 ((quads[4][3] or quads[3][4]) and self.aacgm_naz > pole_minus)
-                 or quads[1][3] or quads[2][4] or quads[3][1] or quads[4][2]):
-                vsigns["north"] = -1
+            vsigns["north"] = int(_rotation_lookup("north", self.ocb_quad,
+                                                   self.vec_quad,
+                                                   self.aacgm_naz,
+                                                   self.pole_angle))
 
         if east:
-            minus_pole = 180.0 - self.pole_angle
-
-            if(quads[1][4] or quads[2][1] or quads[3][2] or quads[4][3] or
-               (quads[1][1] and self.aacgm_naz > self.pole_angle) or
-               (quads[1][3] and self.aacgm_naz > minus_pole) or
-               ((quads[4][4] or quads[3][1]) and self.aacgm_naz <= minus_pole)
-               or (quads[2][4] and self.aacgm_naz > self.pole_angle) or
-               ((quads[4][2] or quads[3][3]) and self.aacgm_naz > minus_pole)
-               or (quads[2][2] and self.aacgm_naz <= self.pole_angle)):
-                vsigns["east"] = 1
-            elif(quads[1][2] or quads[2][3] or quads[3][4] or quads[4][1] or
-                 ((quads[4][4] or quads[3][1]) and self.aacgm_naz > minus_pole)
-                 or (quads[2][2] and self.aacgm_naz > self.pole_angle) or
-                 ((quads[4][2] or quads[3][3])and self.aacgm_naz <= minus_pole)
-                 or (quads[1][3] and self.aacgm_naz <= minus_pole) or
-                 ((quads[1][1] or quads[2][4])
-                  and self.aacgm_naz <= self.pole_angle)):
-                vsigns["east"] = -1
+            vsigns["east"] = int(_rotation_lookup("east", self.ocb_quad,
+                                                  self.vec_quad, self.aacgm_naz,
+                                                  self.pole_angle))
 
         return vsigns
 
@@ -764,73 +705,897 @@ class VectorData(object):
         assert(not np.isnan(self.aacgm_lat)), \
             logging.error("AACGM latitude of Vector undefined")
 
-        # Convert the AACGM MLT of the observation and OCB pole to radians,
-        # then calculate the difference between them.
-        del_long = (self.ocb_aacgm_mlt - self.aacgm_mlt) * np.pi / 12.0
+        self.pole_angle = float(calc_vec_pole_angle(self.aacgm_lat,
+                                                    self.aacgm_mlt,
+                                                    self.ocb_aacgm_lat,
+                                                    self.ocb_aacgm_mlt))
+
+        return
+
+class VectorDataArray(object):
+    """ Object containing an array of vector data points
+
+    Parameters
+    -----------
+    dat_ind : (array-like)
+        Data indices (zero offset)
+    ocb_ind : (int or array-like)
+        OCBoundary record indices matched to the data indices (zero offset)
+    aacgm_lat : (array-like)
+        Vector AACGM latitudes (degrees)
+    aacgm_mlt : (array-like)
+        Vector AACGM MLTs (hours)
+    ocb_lat : (float or array-like)
+        Vector OCB latitudes (degrees) (default=np.nan)
+    ocb_mlt : (float or array-like)
+        Vector OCB MLTs (hours) (default=np.nan)
+    aacgm_n : (float or array-like)
+        AACGM North pointing vectors (positive towards North) (default=0.0)
+    aacgm_e : (float or array-like)
+        AACGM East pointing vectors (completes right-handed coordinate system
+        (default = 0.0)
+    aacgm_z : (float or array-like)
+        AACGM Vertical pointing vectors (positive down) (default=0.0)
+    aacgm_mag : (float or array-like)
+        Vector magnitudes (default=np.nan)
+    scale_func : (function)
+        Function for scaling AACGM magnitude with arguements:
+        [measurement values, unscaled polar cap radii (degrees),
+        scaled polar cap radius (degrees)].  Must accept array arguements.
+        (default=None)
+    dat_name : (str)
+        Data name (default=None)
+    dat_units : (str)
+        Data units (default=None)
+
+    Attributes
+    ------------
+    Same as VectorData, with numpy arrays in place of the floats and integers
+    that describe each vector.  The scaled_r, dat_name, dat_units, and
+    scale_func attributes are shared by all vectors.
+
+    Methods
+    -----------
+    set_ocb(ocb, scale_func=None)
+        Set the ocb coordinates and vector values
+    define_quadrants()
+        Define the OCB pole and vector AACGM quadrants
+    scale_vector()
+        Scale the data vectors into OCB coordinates
+    calc_ocb_polar_angle()
+        calculate the OCB north azimuth angles
+    calc_ocb_vec_sign(north=False, east=False)
+        calculate the signs of the OCB scaled vector components
+    calc_vec_pole_angle()
+        calculate the vector angles of the vector-poles triangles
+
+    Notes
+    -------
+    Calculates the same values as a VectorData object for each data point,
+    but performs the calculations for all of the data points at once.  Values
+    that cannot be calculated are set to NaN instead of raising an
+    AssertionError.
+    """
+
+    def __init__(self, dat_ind, ocb_ind, aacgm_lat, aacgm_mlt, ocb_lat=np.nan,
+                 ocb_mlt=np.nan, aacgm_n=0.0, aacgm_e=0.0, aacgm_z=0.0,
+                 aacgm_mag=np.nan, dat_name=None, dat_units=None,
+                 scale_func=None):
+        """ Initialize VectorDataArray object
+
+        Parameters
+        -----------
+        dat_ind : (array-like)
+            Data indices (zero offset)
+        ocb_ind : (int or array-like)
+            OCBoundary record indices matched to the data indices (zero offset)
+        aacgm_lat : (array-like)
+            Vector AACGM latitudes (degrees)
+        aacgm_mlt : (array-like)
+            Vector AACGM MLTs (hours)
+        ocb_lat : (float or array-like)
+            Vector OCB latitudes (degrees) (default=np.nan)
+        ocb_mlt : (float or array-like)
+            Vector OCB MLTs (hours) (default=np.nan)
+        aacgm_n : (float or array-like)
+            AACGM North pointing vectors (positive towards North) (default=0.0)
+        aacgm_e : (float or array-like)
+            AACGM East pointing vectors (completes right-handed coordinate
+            system (default = 0.0)
+        aacgm_z : (float or array-like)
+            AACGM Vertical pointing vectors (positive down) (default=0.0)
+        aacgm_mag : (float or array-like)
+            Vector magnitudes (default = np.nan)
+        dat_name : (str)
+            Data name (default=None)
+        dat_units : (str)
+            Data units (default=None)
+        scale_func : (function)
+            Function for scaling AACGM magnitude with arguements:
+            [measurement values, unscaled polar cap radii (degrees),
+            scaled polar cap radius (degrees)]
+            Not necessary if no magnitude scaling is needed. (default=None)
+
+        Returns
+        --------
+            self : Initialised VectorDataArray class object by setting AACGM
+            values
+        """
+        # Assign the vector data name and units
+        self.dat_name = dat_name
+        self.dat_units = dat_units
+
+        # Assign the data and OCB indices
+        (self.dat_ind, self.ocb_ind, self.aacgm_lat, self.aacgm_mlt,
+         self.ocb_lat, self.ocb_mlt, self.aacgm_n, self.aacgm_e, self.aacgm_z,
+         self.aacgm_mag) = [np.array(vv) for vv in np.broadcast_arrays(
+             np.asarray(dat_ind, dtype=int).reshape(-1),
+             np.asarray(ocb_ind, dtype=int), np.asarray(aacgm_lat, dtype=float),
+             np.asarray(aacgm_mlt, dtype=float),
+             np.asarray(ocb_lat, dtype=float), np.asarray(ocb_mlt, dtype=float),
+             np.asarray(aacgm_n, dtype=float), np.asarray(aacgm_e, dtype=float),
+             np.asarray(aacgm_z, dtype=float),
+             np.asarray(aacgm_mag, dtype=float))]
+
+        # Assign the AACGM vector magnitudes that weren't provided
+        inan = np.isnan(self.aacgm_mag)
+        self.aacgm_mag[inan] = np.sqrt(self.aacgm_n[inan]**2 +
+                                       self.aacgm_e[inan]**2 +
+                                       self.aacgm_z[inan]**2)
+
+        # Assign the OCB vector default values
+        self.ocb_n = np.full(self.dat_ind.shape, np.nan)
+        self.ocb_e = np.full(self.dat_ind.shape, np.nan)
+        self.ocb_z = np.full(self.dat_ind.shape, np.nan)
+        self.ocb_mag = np.full(self.dat_ind.shape, np.nan)
+
+        # Assign the default pole locations, relative angles, and quadrants
+        self.ocb_quad = np.zeros(self.dat_ind.shape, dtype=int)
+        self.vec_quad = np.zeros(self.dat_ind.shape, dtype=int)
+        self.pole_angle = np.full(self.dat_ind.shape, np.nan)
+        self.aacgm_naz = np.full(self.dat_ind.shape, np.nan)
+        self.ocb_aacgm_lat = np.full(self.dat_ind.shape, np.nan)
+        self.ocb_aacgm_mlt = np.full(self.dat_ind.shape, np.nan)
+
+        # Assign the vector scaling function
+        self.scale_func = scale_func
+
+        return
+
+    def __repr__(self):
+        """ Provide readable representation of the VectorDataArray object
+        """
+
+        out = "Vector data array:"
+        if self.dat_name is not None:
+            out = "{:s} {:s}".format(out, self.dat_name)
+        if self.dat_units is not None:
+            out = "{:s} ({:s})".format(out, self.dat_units)
+        out = "{:s}\n{:d} vectors\n".format(out, self.dat_ind.shape[0])
+        out = "{:s}{:d} with OCB values\n".format(out, np.sum(~np.isnan(
+            self.ocb_mag)))
+
+        out = "\n{:s}-------------------------------------------\n".format(out)
+        if self.scale_func is None:
+            out = "{:s}No magnitude scaling function provided\n".format(out)
+        else:
+            out = "{:s}Scaling function: ".format(out)
+            out = "{:s}{:s}\n".format(out, self.scale_func.__name__)
+
+        return out
+
+    def __str__(self):
+        """ Provide readable representation of the VectorDataArray object
+        """
+
+        out = self.__repr__()
+        return out
+
+    def set_ocb(self, ocb, scale_func=None):
+        """ Set the OCBoundary values for these data points
+
+        Parameters
+        ------------
+        ocb : (OCBoundary)
+            Open Closed Boundary class object
+        scale_func : (function)
+            Function for scaling AACGM magnitude with arguements:
+            [measurement values, unscaled polar cap radii (degrees),
+            scaled polar cap radius (degrees)]
+            Not necessary if defined earlier or no scaling is needed.
+            (default=None)
+
+        Updates
+        ---------
+        Same as VectorData.set_ocb, for all vectors
+        """
+
+        # Set the AACGM coordinates of the OCB pole, using NaN for bad indices
+        geometry = ocb.get_pole_geometry()
+        igood = (self.ocb_ind >= 0) & (self.ocb_ind < ocb.records)
+        self.unscaled_r = np.full(self.ocb_ind.shape, np.nan)
+        self.unscaled_r[igood] = ocb.r[self.ocb_ind[igood]]
+        self.scaled_r = 90.0 - abs(ocb.boundary_lat)
+        self.ocb_aacgm_mlt = np.full(self.ocb_ind.shape, np.nan)
+        self.ocb_aacgm_mlt[igood] = geometry["ocb_aacgm_mlt"][
+            self.ocb_ind[igood]]
+        self.ocb_aacgm_lat = np.full(self.ocb_ind.shape, np.nan)
+        self.ocb_aacgm_lat[igood] = geometry["ocb_aacgm_lat"][
+            self.ocb_ind[igood]]
+
+        # If the OCB vector coordinates weren't included in the initial info,
+        # update them here
+        inan = np.isnan(self.ocb_lat) | np.isnan(self.ocb_mlt)
+        if np.any(inan):
+            (self.ocb_lat[inan],
+             self.ocb_mlt[inan]) = ocb.normal_coord(self.aacgm_lat[inan],
+                                                    self.aacgm_mlt[inan],
+                                                    ocb_ind=self.ocb_ind[inan])
+
+        # Get the angle at the data vector appended by the AACGM and OCB poles
+        self.calc_vec_pole_angle()
+
+        # Set the OCB and Vector quadrants
+        if np.any(~np.isnan(self.pole_angle)):
+            self.define_quadrants()
+
+            # Set the scaling function
+            if self.scale_func is None:
+                if scale_func is None:
+                    # This is not necessarily a bad thing, if the value does not
+                    # need to be scaled.
+                    logging.info("no scaling function provided")
+                else:
+                    self.scale_func = scale_func
+
+            # Assign the OCB vector default values and location.  Will also
+            # update the AACGM north azimuth of the vector.
+            self.scale_vector()
+        return
 
-        if del_long < 0.0:
-            del_long += 2.0 * np.pi
+    def define_quadrants(self):
+        """ Determine which quadrants (in AACGM coordinates) the OCB poles
+        and data vectors lie in
 
-        if del_long == 0.0:
-            self.pole_angle = 0.0
-            return
+        Requires
+        ---------
+        self.ocb_aacgm_mlt : (numpy.ndarray)
+            OCB pole MLT in AACGM coordinates in hours
+        self.aacgm_mlt : (numpy.ndarray)
+            Vector AACGM MLT in hours
+        self.pole_angle : (numpy.ndarray)
+            vector angle in poles-vector triangle in degrees
 
-        if del_long == np.pi:
-            self.pole_angle = 180.0
-            return
+        Updates
+        --------
+        self.ocb_quad : (numpy.ndarray)
+            OCB pole quadrant, zero where undefined
+        self.vec_quad : (numpy.ndarray)
+            Vector quadrant, zero where undefined
 
+        Notes
+        ------
+        North (N) and East (E) are defined by the AACGM directions centred on
+        the data vector location, assuming vertical is positive downwards
+        Quadrants: 1 [N, E]; 2 [N, W]; 3 [S, W]; 4 [S, E]
+        """
+        self.ocb_quad, self.vec_quad = calc_quadrants(self.aacgm_mlt,
+                                                      self.ocb_aacgm_mlt,
+                                                      self.pole_angle,
+                                                      self.aacgm_n,
+                                                      self.aacgm_e)
+
+        return
+
+    def scale_vector(self):
+        """ Normalise the data vectors into OCB coordinates
+
+        Requires
+        ---------
+        self.ocb_lat : (numpy.ndarray)
+            OCB latitude in degrees
+        self.ocb_mlt : (numpy.ndarray)
+            OCB MLT in hours
+        self.ocb_aacgm_mlt : (numpy.ndarray)
+            OCB pole MLT in AACGM coordinates in hours
+        self.pole_angle : (numpy.ndarray)
+            vector angle in poles-vector triangle
+
+        Updates
+        --------
+        ocb_n : (numpy.ndarray)
+            OCB scaled north component
+        ocb_e : (numpy.ndarray)
+            OCB scaled east component
+        ocb_z : (numpy.ndarray)
+            OCB scaled vertical component
+        ocb_mag : (numpy.ndarray)
+            OCB scaled magnitude
+        """
+        igood = (~np.isnan(self.ocb_lat) & ~np.isnan(self.ocb_mlt) &
+                 ~np.isnan(self.ocb_aacgm_mlt) & ~np.isnan(self.pole_angle))
+
+        # Scale vertical component
+        self.ocb_z = np.full(igood.shape, np.nan)
+        self.ocb_z[igood] = self.aacgm_z[igood]
+        if self.scale_func is not None:
+            iscale = igood & (self.aacgm_z == 0.0)
+            self.ocb_z[iscale] = self.scale_func(self.aacgm_z[iscale],
+                                                 self.unscaled_r[iscale],
+                                                 self.scaled_r)
+
+        self.ocb_n = np.full(igood.shape, np.nan)
+        self.ocb_e = np.full(igood.shape, np.nan)
+
+        # There's no magnitude, so nothing to adjust
+        izero = igood & (self.aacgm_n == 0.0) & (self.aacgm_e == 0.0)
+        self.ocb_n[izero] = 0.0
+        self.ocb_e[izero] = 0.0
+
+        # The measurement is aligned with the AACGM and OCB poles
+        ialign = (igood & ~izero & ((self.pole_angle == 0.0) |
+                                    (self.pole_angle == 180.0)))
+        if self.scale_func is None:
+            self.ocb_n[ialign] = self.aacgm_n[ialign]
+            self.ocb_e[ialign] = self.aacgm_e[ialign]
+        else:
+            self.ocb_n[ialign] = self.scale_func(self.aacgm_n[ialign],
+                                                 self.unscaled_r[ialign],
+                                                 self.scaled_r)
+            self.ocb_e[ialign] = self.scale_func(self.aacgm_e[ialign],
+                                                 self.unscaled_r[ialign],
+                                                 self.scaled_r)
+
+        # The measurement is on or between the poles
+        iflip = (ialign & (self.pole_angle == 0.0) &
+                 (self.aacgm_lat >= self.ocb_aacgm_lat))
+        self.ocb_n[iflip] *= -1.0
+        self.ocb_e[iflip] *= -1.0
+
+        # Rotate the remaining vectors
+        irot = igood & ~izero & ~ialign
+        if np.any(irot):
+            # If not defined, get the OCB and vector quadrants
+            if np.any((self.ocb_quad[irot] == 0) | (self.vec_quad[irot] == 0)):
+                self.define_quadrants()
+
+            # Get the unscaled 2D vector magnitude
+            vmag = np.sqrt(self.aacgm_n[irot]**2 + self.aacgm_e[irot]**2)
+
+            # Calculate the AACGM north azimuth in degrees
+            self.aacgm_naz = np.full(igood.shape, np.nan)
+            self.aacgm_naz[irot] = np.degrees(np.arccos(self.aacgm_n[irot] /
+                                                        vmag))
+
+            # Get the OCB north azimuth in radians
+            ocb_angle = np.radians(self.calc_ocb_polar_angle()[irot])
+
+            # Get the sign of the North and East components
+            vsigns = self.calc_ocb_vec_sign(north=True, east=True)
+
+            # Scale the vector along the OCB north and account for
+            # any changes associated with adjusting the size of the polar cap
+            if self.scale_func is not None:
+                vmag = self.scale_func(vmag, self.unscaled_r[irot],
+                                       self.scaled_r)
+
+            self.ocb_n[irot] = vsigns['north'][irot] * vmag * np.cos(ocb_angle)
+            self.ocb_e[irot] = vsigns['east'][irot] * vmag * np.sin(ocb_angle)
+
+        # Calculate the scaled OCB vector magnitude
+        self.ocb_mag = np.sqrt(self.ocb_n**2 + self.ocb_e**2 + self.ocb_z**2)
+
+        return
+
+    def calc_ocb_polar_angle(self):
+        """ Calculate the OCB north azimuth angles
+
+        Requires
+        ---------
+        self.ocb_quad : (numpy.ndarray)
+            OCB quadrant
+        self.vec_quad : (numpy.ndarray)
+            Vector quadrant
+        self.aacgm_naz : (numpy.ndarray)
+            AACGM polar angle
+        self.pole_angle : (numpy.ndarray)
+            Vector angle between AACGM pole, vector origin, and OCB pole
+
+        Returns
+        --------
+        ocb_naz : (numpy.ndarray)
+            Angle between measurement vector and OCB pole in degrees, NaN
+            where undefined
+        """
+        # Calculate OCB polar angle based on quadrants and other angles
+        ocb_naz = _ocb_polar_angle(self.ocb_quad, self.vec_quad,
+                                   self.aacgm_naz, self.pole_angle)
+
+        return ocb_naz
+
+    def calc_ocb_vec_sign(self, north=False, east=False):
+        """ Get the sign of the North and East components
+
+        Parameters
+        ------------
+        north : (boolian)
+            Get the sign of the north component (default=False)
+        east : (boolian)
+            Get the sign of the east component (default=False)
+
+        Requires
+        ----------
+        self.ocb_quad : (numpy.ndarray)
+            OCB pole quadrant
+        self.vec_quad : (numpy.ndarray)
+            Vector quadrant
+        self.aacgm_naz : (numpy.ndarray)
+            AACGM polar angle in degrees
+        self.pole_angle : (numpy.ndarray)
+            Vector angle in degrees
+
+        Returns
+        ---------
+        vsigns : (dict)
+            Dictionary with keys 'north' and 'east' containing arrays of the
+            desired signs, zero where undefined
+        """
+        # Test input
+        assert north or east, logging.warning("must set at least one direction")
+
+        # Initialise output
+        vsigns = {"north":np.zeros(self.aacgm_naz.shape, dtype=int),
+                  "east":np.zeros(self.aacgm_naz.shape, dtype=int)}
+
+        if north:
+            vsigns["north"] = _rotation_lookup("north", self.ocb_quad,
+                                               self.vec_quad, self.aacgm_naz,
+                                               self.pole_angle)
+
+        if east:
+            vsigns["east"] = _rotation_lookup("east", self.ocb_quad,
+                                              self.vec_quad, self.aacgm_naz,
+                                              self.pole_angle)
+
+        return vsigns
+
+    def calc_vec_pole_angle(self):
+        """calculates the angles between the AACGM pole, the measurements, and
+        the OCB poles using spherical triginometry
+
+        Requires
+        ---------
+        self.aacgm_mlt : (numpy.ndarray)
+            AACGM MLT of vector origin in hours
+        self.aacgm_lat : (numpy.ndarray)
+            AACGM latitude of vector origin in degrees
+        self.ocb_aacgm_mlt : (numpy.ndarray)
+            AACGM MLT of the OCB pole in hours
+        self.ocb_aacgm_lat : (numpy.ndarray)
+            AACGM latitude of the OCB pole in degrees
+
+        Updates
+        --------
+        self.pole_angle : (numpy.ndarray)
+            Angle in degrees between AACGM north, a measurement, and OCB north,
+            NaN where undefined
+        """
+        self.pole_angle = calc_vec_pole_angle(self.aacgm_lat, self.aacgm_mlt,
+                                              self.ocb_aacgm_lat,
+                                              self.ocb_aacgm_mlt)
+
+        return
+
+def calc_vec_pole_angle(aacgm_lat, aacgm_mlt, ocb_aacgm_lat, ocb_aacgm_mlt):
+    """calculates the angle between the AACGM pole, measurements, and the
+    OCB poles using spherical triginometry
+
+    Parameters
+    -----------
+    aacgm_lat : (float or array-like)
+        AACGM latitude of vector origin in degrees
+    aacgm_mlt : (float or array-like)
+        AACGM MLT of vector origin in hours
+    ocb_aacgm_lat : (float or array-like)
+        AACGM latitude of the OCB pole in degrees
+    ocb_aacgm_mlt : (float or array-like)
+        AACGM MLT of the OCB pole in hours
+
+    Returns
+    --------
+    pole_angle : (float or numpy.ndarray)
+        Angle in degrees between AACGM north, a measurement, and OCB north,
+        NaN where undefined
+
+    Notes
+    ------
+    Array inputs are broadcast against each other
+    """
+    shape = np.broadcast(aacgm_lat, aacgm_mlt, ocb_aacgm_lat,
+                         ocb_aacgm_mlt).shape
+    aacgm_lat, aacgm_mlt, ocb_aacgm_lat, ocb_aacgm_mlt = [
+        np.broadcast_to(np.asarray(vv, dtype=float), shape).reshape(-1)
+        for vv in [aacgm_lat, aacgm_mlt, ocb_aacgm_lat, ocb_aacgm_mlt]]
+
+    # Convert the AACGM MLT of the observation and OCB pole to radians,
+    # then calculate the difference between them.
+    del_long = ocb_aacgm_mlt - aacgm_mlt
+    del_long *= np.pi
+    del_long /= 12.0
+    del_long[del_long < 0.0] += 2.0 * np.pi
+
+    # Identify the measurements aligned with the poles
+    izero = del_long == 0.0
+    ipi = del_long == np.pi
+    inan = np.isnan(aacgm_lat) | np.isnan(ocb_aacgm_lat)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
         # Find the distance in radians between the two poles
-        hemisphere = np.sign(self.ocb_aacgm_lat)
+        hemisphere = np.sign(ocb_aacgm_lat)
         rad_pole = hemisphere * np.pi * 0.5
-        del_pole = hemisphere * (rad_pole - np.radians(self.ocb_aacgm_lat))
+        del_pole = hemisphere * (rad_pole - np.radians(ocb_aacgm_lat))
 
         # Get the distance in radians between the AACGM pole and the data point
-        del_vect = hemisphere * (rad_pole - np.radians(self.aacgm_lat))
+        del_vect = np.radians(aacgm_lat, out=rad_pole.copy())
+        np.subtract(rad_pole, del_vect, out=del_vect)
+        del_vect *= hemisphere
 
         # Use the law of haversines, which goes to the spherical trigonometric
         # cosine rule for sides at large angles, but is more robust at small
-        # angles, to find the length of the last side of the spherical triangle.
-        del_ocb = archav(hav(del_pole - del_vect) +
-                         np.sin(del_pole) * np.sin(del_vect) * hav(del_long))
+        # angles, to find the length of the last side of the spherical
+        # triangle.
+        sin_vect = np.sin(del_vect)
+        buff = np.sin(del_pole)
+        buff *= sin_vect
+        buff *= hav(del_long, out=del_long)
+        del_ocb = hav(np.subtract(del_pole, del_vect, out=rad_pole),
+                      out=rad_pole)
+        del_ocb += buff
+        archav(del_ocb, out=del_ocb)
 
         # Again use law of haversines, this time to find the polar angle
-        hav_pole_angle = (hav(del_pole) - hav(del_vect - del_ocb)) \
-                         / (np.sin(del_vect) * np.sin(del_ocb))
+        pole_angle = hav(del_pole, out=del_pole)
+        pole_angle -= hav(np.subtract(del_vect, del_ocb, out=buff), out=buff)
+        np.sin(del_ocb, out=del_ocb)
+        sin_vect *= del_ocb
+        pole_angle /= sin_vect
 
-        self.pole_angle = np.degrees(archav(hav_pole_angle))
+        archav(pole_angle, out=pole_angle)
+        np.degrees(pole_angle, out=pole_angle)
 
-        return
+    # Set the angles for measurements aligned with the poles
+    pole_angle[izero] = 0.0
+    pole_angle[ipi] = 180.0
+    pole_angle[inan] = np.nan
+
+    return pole_angle.reshape(shape)[()]
+
+def calc_quadrants(aacgm_mlt, ocb_aacgm_mlt, pole_angle, aacgm_n, aacgm_e):
+    """ Determine which quadrants (in AACGM coordinates) the OCB poles
+    and data vectors lie in
 
-def hav(alpha):
+    Parameters
+    -----------
+    aacgm_mlt : (float or array-like)
+        Vector AACGM MLT in hours
+    ocb_aacgm_mlt : (float or array-like)
+        OCB pole MLT in AACGM coordinates in hours
+    pole_angle : (float or array-like)
+        vector angle in poles-vector triangle in degrees
+    aacgm_n : (float or array-like)
+        AACGM north component of data vector
+    aacgm_e : (float or array-like)
+        AACGM east component of data vector
+
+    Returns
+    --------
+    ocb_quad : (int or numpy.ndarray)
+        OCB pole quadrant, zero where undefined
+    vec_quad : (int or numpy.ndarray)
+        Vector quadrant, zero where undefined
+
+    Notes
+    ------
+    North (N) and East (E) are defined by the AACGM directions centred on
+    the data vector location, assuming vertical is positive downwards
+    Quadrants: 1 [N, E]; 2 [N, W]; 3 [S, W]; 4 [S, E]
+    Array inputs are broadcast against each other
+    """
+    shape = np.broadcast(aacgm_mlt, ocb_aacgm_mlt, pole_angle, aacgm_n,
+                         aacgm_e).shape
+    aacgm_mlt, ocb_aacgm_mlt, pole_angle, aacgm_n, aacgm_e = [
+        np.broadcast_to(np.asarray(vv, dtype=float), shape).reshape(-1)
+        for vv in [aacgm_mlt, ocb_aacgm_mlt, pole_angle, aacgm_n, aacgm_e]]
+    igood = (~np.isnan(ocb_aacgm_mlt) & ~np.isnan(aacgm_mlt) &
+             ~np.isnan(pole_angle))
+
+    # Determine where the OCB pole is relative to the data vector
+    with np.errstate(invalid="ignore"):
+        ocb_adj_mlt = np.mod(ocb_aacgm_mlt - aacgm_mlt, 24.0)
+    ocb_adj_mlt[ocb_adj_mlt >= 24.0] -= 24.0
+
+    # OCB pole lies in quadrant 1 or 2 if the angle is acute, and in quadrant
+    # 3 or 4 otherwise
+    ocb_quad = np.where(pole_angle < 90.0, np.where(ocb_adj_mlt < 12.0, 1, 2),
+                        np.where(ocb_adj_mlt < 24.0, 3, 4))
+    ocb_quad[~igood] = 0
+
+    # Now determine which quadrant the vector is pointed into
+    vec_quad = np.where(aacgm_n >= 0.0, np.where(aacgm_e >= 0.0, 1, 2),
+                        np.where(aacgm_e >= 0.0, 4, 3))
+    vec_quad[~igood] = 0
+
+    return ocb_quad.reshape(shape)[()], vec_quad.reshape(shape)[()]
+
+def hav(alpha, out=None):
     """ Formula for haversine
 
     Parameters
     ----------
-    alpha : (float)
+    alpha : (float or array-like)
         Angle in radians
+    out : (numpy.ndarray or NoneType)
+        Array to hold the output, may be alpha (default=None)
 
     Returns
     --------
-    hav_alpha : (float)
+    hav_alpha : (float or numpy.ndarray)
         Haversine of alpha, equal to the square of the sine of half-alpha
     """
-    hav_alpha = np.sin(alpha * 0.5)**2
+    if out is None:
+        hav_alpha = np.sin(alpha * 0.5)**2
+    else:
+        hav_alpha = np.multiply(alpha, 0.5, out=out)
+        np.sin(hav_alpha, out=hav_alpha)
+        np.square(hav_alpha, out=hav_alpha)
 
     return hav_alpha
 
-def archav(hav):
+def archav(hav, out=None):
     """ Formula for the inverse haversine
 
     Parameters
     -----------
-    hav : (float)
+    hav : (float or array-like)
         Haversine of an angle
+    out : (numpy.ndarray or NoneType)
+        Array to hold the output, may be hav (default=None)
 
     Returns
     ---------
-    alpha : (float)
+    alpha : (float or numpy.ndarray)
         Angle in radians
     """
-    alpha = 2.0 * np.arcsin(np.sqrt(hav))
+    if out is None:
+        alpha = 2.0 * np.arcsin(np.sqrt(hav))
+    else:
+        alpha = np.sqrt(hav, out=out)
+        np.arcsin(alpha, out=alpha)
+        np.multiply(alpha, 2.0, out=alpha)
 
     return alpha
+
+def _ocb_polar_angle_rule(quads, gt):
+    """ Select the formula for the OCB north azimuth angle
+
+    Parameters
+    -----------
+    quads : (dict)
+        Dictionary of boolian values for OCB and Vector quadrants
+    gt : (dict)
+        Dictionary of boolian values, True if the AACGM north azimuth is
+        greater than the key angle (see _rotation_bits)
+
+    Returns
+    --------
+    iform : (int)
+        Index of the formula in _ocb_polar_angle_forms (zero if undefined)
+    """
+    if(((quads[2][4] or quads[2][2]) and gt["pole"]) or
+       (gt["pole"] and quads[1][1]) or (quads[1][4] and not gt["pole_plus"])):
+        return 1
+    elif((not gt["pole"] and quads[1][1]) or
+         (not gt["pole"] and (quads[2][4] or quads[2][2])) or
+         (gt["pole_minus"] and
+          (quads[4][1] or quads[4][3] or quads[3][4] or quads[3][2]))):
+        return 2
+    elif(not gt["minus_pole"] and (quads[1][2] or quads[2][1] or quads[2][3])):
+        return 3
+    elif((gt["minus_pole"] and (quads[1][2] or quads[2][1] or quads[2][3])) or
+         ((quads[4][4] or quads[4][2] or quads[3][1] or quads[3][3] or
+           quads[1][3]) and not gt["supp_pole"])):
+        return 4
+    elif(((quads[3][1] or quads[3][3] or quads[4][4] or quads [4][2] or
+           quads[1][3]) and gt["supp_pole"]) or
+         (quads[1][4] and gt["pole_plus"])):
+        return 5
+    elif(not gt["pole_minus"] and
+         (quads[3][4] or quads[3][2] or quads[4][1] or quads[4][3])):
+        return 6
+
+    return 0
+
+def _ocb_north_sign_rule(quads, gt):
+    """ Select the sign of the OCB north component
+
+    Parameters
+    -----------
+    quads : (dict)
+        Dictionary of boolian values for OCB and Vector quadrants
+    gt : (dict)
+        Dictionary of boolian values, True if the AACGM north azimuth is
+        greater than the key angle (see _rotation_bits)
+
+    Returns
+    --------
+    vsign : (int)
+        Sign of the north component (zero if undefined)
+    """
+    if(quads[1][1] or quads[2][2] or quads[3][3] or quads[4][4] or
+       (quads[1][4] and not gt["pole_plus"]) or
+       (quads[1][2] and gt["minus_pole"]) or
+       (quads[2][1] and not gt["minus_pole"]) or
+       ((quads[3][4] or quads[4][3]) and not gt["pole_minus"]) or
+       ((quads[3][2] or quads[4][1]) and gt["pole_minus"]) or
+       (quads[2][3] and gt["minus_pole"])):
+        return 1
+    elif((quads[1][2] and gt["minus_pole"]) or
+         (quads[1][4] and gt["pole_plus"]) or
+         (quads[2][1] and gt["minus_pole"]) or
+         ((quads[4][1] or quads[3][2]) and not gt["pole_minus"]) or
+         (quads[2][3] and not gt["minus_pole"]) or
+         ((quads[4][3] or quads[3][4]) and gt["pole_minus"]) or
+         quads[1][3] or quads[2][4] or quads[3][1] or quads[4][2]):
+        return -1
+
+    return 0
+
+def _ocb_east_sign_rule(quads, gt):
+    """ Select the sign of the OCB east component
+
+    Parameters
+    -----------
+    quads : (dict)
+        Dictionary of boolian values for OCB and Vector quadrants
+    gt : (dict)
+        Dictionary of boolian values, True if the AACGM north azimuth is
+        greater than the key angle (see _rotation_bits)
+
+    Returns
+    --------
+    vsign : (int)
+        Sign of the east component (zero if undefined)
+    """
+    if(quads[1][4] or quads[2][1] or quads[3][2] or quads[4][3] or
+       (quads[1][1] and gt["pole"]) or
+       (quads[1][3] and gt["supp_pole"]) or
+       ((quads[4][4] or quads[3][1]) and not gt["supp_pole"]) or
+       (quads[2][4] and gt["pole"]) or
+       ((quads[4][2] or quads[3][3]) and gt["supp_pole"]) or
+       (quads[2][2] and not gt["pole"])):
+        return 1
+    elif(quads[1][2] or quads[2][3] or quads[3][4] or quads[4][1] or
+         ((quads[4][4] or quads[3][1]) and gt["supp_pole"]) or
+         (quads[2][2] and gt["pole"]) or
+         ((quads[4][2] or quads[3][3]) and not gt["supp_pole"]) or
+         (quads[1][3] and not gt["supp_pole"]) or
+         ((quads[1][1] or quads[2][4]) and not gt["pole"])):
+        return -1
+
+    return 0
+
+def _build_rotation_tables():
+    """ Evaluate the vector rotation rules for all quadrant and angle
+    comparison combinations
+
+    Returns
+    --------
+    tables : (dict)
+        Dictionary of integer arrays indexed by [OCB quadrant, vector quadrant,
+        angle comparison bits], with keys 'naz' (formula index), 'north' and
+        'east' (component signs).  Quadrant zero (undefined) gives zero.
+    """
+    nbits = 2**len(_rotation_keys)
+    tables = {kk:np.zeros(shape=(5, 5, nbits), dtype=int)
+              for kk in ["naz", "north", "east"]}
+
+    for o in range(1, 5):
+        for v in range(1, 5):
+            quads = {oo:{vv:(oo == o and vv == v) for vv in range(1, 5)}
+                     for oo in range(1, 5)}
+            for ibit in range(nbits):
+                gt = {kk:bool(ibit & (1 << i))
+                      for i, kk in enumerate(_rotation_keys)}
+                tables["naz"][o, v, ibit] = _ocb_polar_angle_rule(quads, gt)
+                tables["north"][o, v, ibit] = _ocb_north_sign_rule(quads, gt)
+                tables["east"][o, v, ibit] = _ocb_east_sign_rule(quads, gt)
+
+    return tables
+
+def _rotation_bits(aacgm_naz, pole_angle):
+    """ Encode the comparisons between the AACGM north azimuth and the
+    pole angle used by the vector rotation rules
+
+    Parameters
+    -----------
+    aacgm_naz : (float or numpy.ndarray)
+        AACGM north azimuth in degrees
+    pole_angle : (float or numpy.ndarray)
+        Vector angle in the poles-vector triangle in degrees
+
+    Returns
+    --------
+    ibit : (int or numpy.ndarray)
+        Comparison bits, ordered as _rotation_keys
+    """
+    ibit = ((aacgm_naz > pole_angle) * 1 +
+            (aacgm_naz > pole_angle + 90.0) * 2 +
+            (aacgm_naz > pole_angle - 90.0) * 4 +
+            (aacgm_naz > 90.0 - pole_angle) * 8 +
+            (aacgm_naz > 180.0 - pole_angle) * 16)
+
+    return ibit
+
+def _rotation_lookup(table, ocb_quad, vec_quad, aacgm_naz, pole_angle):
+    """ Look up the vector rotation rules
+
+    Parameters
+    -----------
+    table : (str)
+        Rotation table key, one of 'naz', 'north', or 'east'
+    ocb_quad : (int or numpy.ndarray)
+        OCB pole quadrant
+    vec_quad : (int or numpy.ndarray)
+        Vector quadrant
+    aacgm_naz : (float or numpy.ndarray)
+        AACGM north azimuth in degrees
+    pole_angle : (float or numpy.ndarray)
+        Vector angle in the poles-vector triangle in degrees
+
+    Returns
+    --------
+    rule : (int or numpy.ndarray)
+        Rule value, zero if the quadrants or angles are undefined
+    """
+    ocb_quad = np.asarray(ocb_quad, dtype=int)
+    vec_quad = np.asarray(vec_quad, dtype=int)
+    igood = ((ocb_quad >= 1) & (ocb_quad <= 4) & (vec_quad >= 1) &
+             (vec_quad <= 4) & ~np.isnan(aacgm_naz) & ~np.isnan(pole_angle))
+
+    rule = _rotation_tables[table][np.where(igood, ocb_quad, 0),
+                                   np.where(igood, vec_quad, 0),
+                                   _rotation_bits(aacgm_naz, pole_angle)]
+
+    return rule
+
+def _ocb_polar_angle(ocb_quad, vec_quad, aacgm_naz, pole_angle):
+    """ Calculate the OCB north azimuth angle using the rotation tables
+
+    Parameters
+    -----------
+    ocb_quad : (int or numpy.ndarray)
+        OCB pole quadrant
+    vec_quad : (int or numpy.ndarray)
+        Vector quadrant
+    aacgm_naz : (float or numpy.ndarray)
+        AACGM north azimuth in degrees
+    pole_angle : (float or numpy.ndarray)
+        Vector angle in the poles-vector triangle in degrees
+
+    Returns
+    --------
+    ocb_naz : (float or numpy.ndarray)
+        Angle between measurement vector and OCB pole in degrees, NaN where
+        undefined
+    """
+    iform = _rotation_lookup("naz", ocb_quad, vec_quad, aacgm_naz, pole_angle)
+    ocb_naz = np.choose(iform, [np.nan, aacgm_naz - pole_angle,
+                                pole_angle - aacgm_naz, aacgm_naz + pole_angle,
+                                180.0 - aacgm_naz - pole_angle,
+                                aacgm_naz - 180.0 + pole_angle,
+                                180.0 - pole_angle + aacgm_naz])
+
+    return ocb_naz[()]
+
+# Vector rotation rules for every quadrant and angle comparison combination
+_rotation_tables = _build_rotation_tables()
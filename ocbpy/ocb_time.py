@@ -13,6 +13,14 @@ yyddd_to_date(yyddd)
     Converts from years since 1900 and day of year to datetime
 convert_time(kwargs)
     Convert to datetime from multiple time formats
+year_soy_to_datetime64(yyyy, soy)
+    Converts arrays of years and seconds of year to datetime64
+yyddd_to_datetime64(yyddd)
+    Converts arrays of years since 1900 and day of year to datetime64
+sod_to_timedelta64(sod)
+    Converts arrays of seconds of day to timedelta64
+convert_time_array(kwargs)
+    Convert arrays of times in multiple formats to datetime64
 
 Moduleauthor
 -------------------------------------------------------------------------------
@@ -22,6 +30,12 @@ Angeline G. Burrell (AGB), 15 April 2017, University of Texas, Dallas (UTDallas)
 import logbook as logging
 import datetime as dt
 
+# Character widths of the strptime directives that may be decoded by slicing
+_fixed_widths = {"Y":4, "y":2, "m":2, "d":2, "j":3, "H":2, "M":2, "S":2}
+
+# Compiled convert_time formats, keyed by format and the time inputs used
+_time_parsers = dict()
+
 def year_soy_to_datetime(yyyy, soy):
     """Converts year and soy to datetime
 
@@ -118,52 +132,497 @@ def convert_time(year=None, soy=None, yyddd=None, sod=None, date=None, tod=None,
     """
     import numpy as np
 
+    if year is not None and soy is not None:
+        return year_soy_to_datetime(year, soy)
+
+    # Get the parser for this format and combination of inputs
+    parser = _compile_time_format(datetime_fmt, use_yyddd=yyddd is not None,
+                                  use_tod=tod is not None)
+
+    if yyddd is not None:
+        ddate = yyddd_to_date(yyddd)
+        date = ddate.strftime("%Y-%m-%d")
+
+    if tod is None:
+        str_time = "{:}".format(date)
+    else:
+        str_time = "{:s} {:s}".format(date, tod)
+
+    dtime = _parse_time_string(str_time, parser)
+
+    if sod is not None:
+        # Add the seconds of day to dtime
+        microsec, sec = np.modf(sod)
+        dtime += dt.timedelta(seconds=int(sec))
+
+        if microsec > 0.0:
+            # Add the microseconds to dtime
+            microsec = np.ceil(microsec * 1.0e6)
+            dtime += dt.timedelta(microseconds=int(microsec))
+
+    return dtime
+
+def year_soy_to_datetime64(yyyy, soy):
+    """Converts arrays of year and soy to datetime64
+
+    Parameters
+    -----------
+    yyyy : (int or array-like)
+        4 digit year(s)
+    soy : (float or array-like)
+        seconds of year
+
+    Returns
+    ---------
+    dtime : (numpy.ndarray)
+        Array of datetime64[us] values.  Seconds of year are rounded to the
+        nearest second, as done by year_soy_to_datetime.
+    """
+    import numpy as np
+
+    yyyy = np.asarray(yyyy, dtype=np.int64)
+    soy = np.rint(np.asarray(soy, dtype=np.float64)).astype(np.int64)
+
+    # Find the start of each year and add the seconds of year
+    dtime = (yyyy - 1970).astype("datetime64[Y]").astype("datetime64[us]")
+    dtime = dtime + soy.astype("timedelta64[s]")
+
+    return dtime
+
+def yyddd_to_datetime64(yyddd):
+    """ Convert arrays of years since 1900 and day of year to datetime64
+
+    Parameters
+    -----------
+    yyddd : (str, int, or array-like)
+        Strings or numbers containing years since 1900 and day of year
+        (e.g. 100126 = 2000-05-5).
+
+    Returns
+    -------
+    ddate : (numpy.ndarray)
+        Array of datetime64[D] values
+
+    Raises
+    -------
+    ValueError
+        If a day of year is not within its year
+    """
+    import numpy as np
+
+    # Remove any decimal data
+    yyddd = np.char.partition(np.asarray(yyddd).astype(str), ".")[...,0]
+    yyddd = yyddd.astype(np.int64)
+
+    # Find the start of each year and add the day of year
+    year_start = (yyddd // 1000 + 1900 - 1970).astype("datetime64[Y]")
+    doy = yyddd % 1000
+    ddate = year_start.astype("datetime64[D]") + \
+        (doy - 1).astype("timedelta64[D]")
+
+    if np.any(doy < 1) or np.any(ddate.astype("datetime64[Y]") != year_start):
+        raise ValueError("day of year out of range in YYDDD")
+
+    return ddate
+
+def sod_to_timedelta64(sod):
+    """ Convert arrays of seconds of day to timedelta64
+
+    Parameters
+    -----------
+    sod : (int, float, or array-like)
+        Seconds of day
+
+    Returns
+    -------
+    tdelta : (numpy.ndarray)
+        Array of timedelta64[us] values.  Fractional seconds are rounded up to
+        the next microsecond, as done by convert_time.
+    """
+    import numpy as np
+
+    microsec, sec = np.modf(np.asarray(sod, dtype=np.float64))
+    microsec = np.where(microsec > 0.0, np.ceil(microsec * 1.0e6), 0.0)
+
+    tdelta = sec.astype(np.int64).astype("timedelta64[s]") + \
+        microsec.astype(np.int64).astype("timedelta64[us]")
+
+    return tdelta
+
+def convert_time_array(year=None, soy=None, yyddd=None, sod=None, date=None,
+                       tod=None, datetime_fmt="%Y-%m-%d %H:%M:%S"):
+    """ Convert arrays of times to datetime64 from multiple time formats
+
+    Parameters
+    ----------
+    year : (array-like or NoneType)
+        Years or None if not in year-soy format (default=None)
+    soy : (array-like or NoneType)
+        Seconds of year or None if not in year-soy format (default=None)
+    yyddd : (array-like or NoneType)
+        Strings containing years since 1900 and 3-digit day of year
+        (default=None)
+    sod : (array-like or NoneType)
+        Seconds of day or None if the time of day is not in this format
+        (default=None)
+    date : (array-like or NoneType)
+        Strings containing date information or None if not in date-time
+        format (default=None)
+    tod : (array-like or NoneType)
+        Strings containing time of day information or None if not in
+        date-time format (default=None)
+    datetime_fmt : (str)
+        String with the date-time or date format.  (default='%Y-%m-%d %H:%M:%S')
+
+    Returns
+    --------
+    dtime : (numpy.ndarray)
+        Array of datetime64[us] values
+
+    Notes
+    ------
+    Date-time formats made up of fixed width numeric fields (e.g. AMPERE's
+    '%Y%m%d %H:%M') are decoded by slicing all strings at once.  Other formats
+    fall back to convert_time for each element.
+    """
+    import numpy as np
+
+    if year is not None and soy is not None:
+        return year_soy_to_datetime64(year, soy)
+
+    if yyddd is not None:
+        ddate = yyddd_to_datetime64(yyddd)
+
+        if tod is None:
+            # The time of day is only given by the seconds of day
+            dtime = ddate.astype("datetime64[us]")
+            if sod is not None:
+                dtime = dtime + sod_to_timedelta64(sod)
+            return dtime
+
+        date = np.datetime_as_string(ddate, unit="D")
+
+    # Get the date-time format for this combination of inputs
+    datetime_fmt = _compile_time_format(datetime_fmt,
+                                        use_yyddd=yyddd is not None,
+                                        use_tod=tod is not None)["datetime_fmt"]
+
+    date = np.asarray(date)
+    if tod is None:
+        str_time = date
+    else:
+        str_time = np.char.add(np.char.add(date.astype(str), " "),
+                               np.asarray(tod).astype(str))
+
+    dtime = _fixed_width_to_datetime64(str_time, datetime_fmt)
+
+    if dtime is None:
+        # Decode each element separately for formats that are not supported
+        tod = [None for dd in date] if tod is None else tod
+        dt_list = [convert_time(date=dd, tod=tt, datetime_fmt=datetime_fmt)
+                   for dd, tt in zip(date, tod)]
+        dtime = np.array(dt_list, dtype="datetime64[us]")
+
+    if sod is not None:
+        # Add the seconds of day
+        dtime = dtime + sod_to_timedelta64(sod)
+
+    return dtime
+
+def _compile_time_format(datetime_fmt, use_yyddd=False, use_tod=True):
+    """ Analyse a convert_time format once, saving the result for later calls
+
+    Parameters
+    ----------
+    datetime_fmt : (str)
+        String with the date-time or date format
+    use_yyddd : (bool)
+        The date is given as years since 1900 and day of year (default=False)
+    use_tod : (bool)
+        The time of day is given as a string (default=True)
+
+    Returns
+    --------
+    parser : (dict)
+        Dict with the strptime format for the date-time string (key
+        'datetime_fmt') and the fixed width layout of that format (keys
+        'fields', 'literals', and 'width'; 'fields' is None if the format
+        can't be decoded by slicing)
+    """
+    parser_key = (datetime_fmt, use_yyddd, use_tod)
+    parser = _time_parsers.get(parser_key)
+
+    if parser is None:
+        if use_yyddd:
+            # Ensure that the datetime format contains current date format
+            if datetime_fmt.find("%Y-%m-%d") < 0:
+                ifmt = datetime_fmt.upper().find("YYDDD")
+                if ifmt >= 0:
+                    old_fmt = datetime_fmt[ifmt:ifmt+5]
+                    datetime_fmt = datetime_fmt.replace(old_fmt, "%Y-%m-%d")
+                else:
+                    datetime_fmt = "%Y-%m-%d {:s}".format(datetime_fmt)
+
+        if not use_tod:
+            # Ensure that the datetime format does not contain time
+            for time_fmt in [" %H:%M:%S", " SOD"]:
+                time_loc = datetime_fmt.upper().find(time_fmt)
+                if time_loc > 0:
+                    datetime_fmt = datetime_fmt[:time_loc]
+
+        fields, literals, width = _fixed_width_layout(datetime_fmt)
+        parser = {"datetime_fmt":datetime_fmt, "fields":fields,
+                  "literals":literals, "width":width}
+        _time_parsers[parser_key] = parser
+
+    return parser
+
+def _parse_time_string(str_time, parser):
+    """ Convert a date-time string to datetime using a compiled format
+
+    Parameters
+    ----------
+    str_time : (str)
+        Date-time string
+    parser : (dict)
+        Compiled format from _compile_time_format
+
+    Returns
+    --------
+    dtime : (datetime)
+        Datetime object
+
+    Notes
+    ------
+    Strings that can't be decoded by slicing are passed to strptime, ignoring
+    any unconverted data at the end of the string
+    """
+    dtime = _fixed_width_to_datetime(str_time, parser)
+
+    if dtime is None:
+        datetime_fmt = parser["datetime_fmt"]
+        try:
+            dtime = dt.datetime.strptime(str_time, datetime_fmt)
+        except ValueError as v:
+            if(len(v.args) > 0 and
+               v.args[0].startswith('unconverted data remains: ')):
+                vsplit = v.args[0].split(" ")
+                dtime = dt.datetime.strptime(str_time[:-(len(vsplit[-1]))],
+                                             datetime_fmt)
+            else:
+                raise v
+
+    return dtime
+
+def _fixed_width_to_datetime(str_time, parser):
+    """ Decode a fixed width date-time string without strptime
+
+    Parameters
+    ----------
+    str_time : (str)
+        Date-time string
+    parser : (dict)
+        Compiled format from _compile_time_format
+
+    Returns
+    --------
+    dtime : (datetime or NoneType)
+        Datetime object or None if the string could not be decoded by slicing
+    """
+    fields = parser["fields"]
+
+    if fields is None or len(str_time) != parser["width"]:
+        return None
+
+    # Literal characters must match the format
+    for pos, lit in parser["literals"]:
+        if str_time[pos] != lit:
+            return None
+
+    # Get the integer value of each field
+    vals = dict()
+    for code in fields.keys():
+        start, nchar = fields[code]
+        digits = str_time[start:start+nchar]
+
+        if len(digits.strip("0123456789")) > 0:
+            return None
+
+        vals[code] = int(digits)
+
+    # Set the defaults used by strptime for missing fields
+    if "Y" in vals:
+        year = vals["Y"]
+    elif "y" in vals:
+        year = vals["y"] + (2000 if vals["y"] < 69 else 1900)
+    else:
+        year = 1900
+
+    # Let strptime raise errors for out-of-range values
     try:
-        if year is not None and soy is not None:
-            dtime = year_soy_to_datetime(year, soy)
+        if "j" in vals:
+            if vals["j"] < 1:
+                return None
+            dtime = dt.datetime(year, 1, 1) + dt.timedelta(days=vals["j"] - 1)
+            if dtime.year != year:
+                return None
+            dtime = dtime.replace(hour=vals.get("H", 0),
+                                  minute=vals.get("M", 0),
+                                  second=vals.get("S", 0))
         else:
-            if yyddd is not None:
-                ddate = yyddd_to_date(yyddd)
-                date = ddate.strftime("%Y-%m-%d")
-
-                # Ensure that the datetime format contains current date format
-                if datetime_fmt.find("%Y-%m-%d") < 0:
-                    ifmt = datetime_fmt.upper().find("YYDDD")
-                    if ifmt >= 0:
-                        old_fmt = datetime_fmt[ifmt:ifmt+5]
-                        datetime_fmt = datetime_fmt.replace(old_fmt, "%Y-%m-%d")
-                    else:
-                        datetime_fmt = "%Y-%m-%d {:s}".format(datetime_fmt)
-            if tod is None:
-                str_time = "{:}".format(date)
-
-                # Ensure that the datetime format does not contain time
-                for time_fmt in [" %H:%M:%S", " SOD"]:
-                    time_loc = datetime_fmt.upper().find(time_fmt)
-                    if time_loc > 0:
-                        datetime_fmt = datetime_fmt[:time_loc]
-            else:
-                str_time = "{:s} {:s}".format(date, tod)
-                
-            dtime = dt.datetime.strptime(str_time, datetime_fmt)
+            dtime = dt.datetime(year, vals.get("m", 1), vals.get("d", 1),
+                                vals.get("H", 0), vals.get("M", 0),
+                                vals.get("S", 0))
+    except ValueError:
+        return None
 
-            if sod is not None:
-                # Add the seconds of day to dtime
-                microsec, sec = np.modf(sod)
-                dtime += dt.timedelta(seconds=int(sec))
-
-                if microsec > 0.0:
-                    # Add the microseconds to dtime
-                    microsec = np.ceil(microsec * 1.0e6)
-                    dtime += dt.timedelta(microseconds=int(microsec))
-                
-    except ValueError as v:
-        if(len(v.args) > 0 and
-           v.args[0].startswith('unconverted data remains: ')):
-            vsplit = v.args[0].split(" ")
-            dtime = dt.datetime.strptime(str_time[:-(len(vsplit[-1]))],
-                                         datetime_fmt)
+    return dtime
+
+def _fixed_width_layout(datetime_fmt):
+    """ Determine the character offsets of the fields in a datetime format
+
+    Parameters
+    ----------
+    datetime_fmt : (str)
+        String with the date-time or date format
+
+    Returns
+    --------
+    fields : (dict or NoneType)
+        Dict with the directive characters as keys and (start, width) tuples
+        as values, or None if the format contains unsupported directives
+    literals : (list)
+        List of (position, character) tuples for the literal characters
+    width : (int)
+        Total number of characters in a string with this format
+    """
+    fields = dict()
+    literals = list()
+    width = 0
+    i = 0
+
+    while i < len(datetime_fmt):
+        if datetime_fmt[i] == "%":
+            code = datetime_fmt[i+1:i+2]
+
+            if code == "%":
+                literals.append((width, code))
+                width += 1
+            elif code in _fixed_widths and code not in fields:
+                fields[code] = (width, _fixed_widths[code])
+                width += _fixed_widths[code]
+            else:
+                return None, literals, width
+            i += 2
         else:
-            raise v
+            literals.append((width, datetime_fmt[i]))
+            width += 1
+            i += 1
+
+    # Day of year may not be combined with month and day of month
+    if "j" in fields and ("m" in fields or "d" in fields):
+        return None, literals, width
+
+    return fields, literals, width
+
+def _fixed_width_to_datetime64(str_time, datetime_fmt):
+    """ Decode an array of fixed width date-time strings without strptime
+
+    Parameters
+    ----------
+    str_time : (numpy.ndarray)
+        Array of date-time strings
+    datetime_fmt : (str)
+        String with the date-time format
+
+    Returns
+    --------
+    dtime : (numpy.ndarray or NoneType)
+        Array of datetime64[us] values or None if the strings could not be
+        decoded by slicing
+    """
+    import numpy as np
+
+    parser = _compile_time_format(datetime_fmt)
+    fields = parser["fields"]
+    literals = parser["literals"]
+    width = parser["width"]
+
+    if fields is None:
+        return None
+
+    str_time = np.asarray(str_time).ravel()
+    if str_time.shape[0] == 0:
+        return np.array([], dtype="datetime64[us]")
+
+    # All strings must have exactly the expected width
+    if np.any(np.char.str_len(str_time.astype(str)) != width):
+        return None
+
+    try:
+        str_time = str_time.astype("S{:d}".format(width))
+    except UnicodeEncodeError:
+        return None
+
+    chars = np.frombuffer(str_time.tobytes(), dtype=np.uint8)
+    chars = chars.reshape(str_time.shape[0], width)
+
+    # Literal characters must match the format
+    for pos, lit in literals:
+        if np.any(chars[:,pos] != ord(lit)):
+            return None
+
+    # Build the integer value of each field from its digits
+    vals = dict()
+    for code in fields.keys():
+        start, nchar = fields[code]
+        digits = chars[:,start:start+nchar].astype(np.int64) - ord("0")
+
+        if np.any(digits < 0) or np.any(digits > 9):
+            return None
+
+        vals[code] = np.zeros(shape=str_time.shape, dtype=np.int64)
+        for ichar in range(nchar):
+            vals[code] = vals[code] * 10 + digits[:,ichar]
+
+    # Set the defaults used by strptime for missing fields
+    nvals = np.ones(shape=str_time.shape, dtype=np.int64)
+    if "Y" in vals:
+        year = vals["Y"]
+    elif "y" in vals:
+        year = vals["y"] + np.where(vals["y"] < 69, 2000, 1900)
+    else:
+        year = 1900 * nvals
+    month = vals["m"] if "m" in vals else nvals
+    day = vals["d"] if "d" in vals else nvals
+    hour = vals["H"] if "H" in vals else 0 * nvals
+    minute = vals["M"] if "M" in vals else 0 * nvals
+    sec = vals["S"] if "S" in vals else 0 * nvals
+
+    # Let the element-wise decoding raise errors for out-of-range values
+    if(np.any(month < 1) or np.any(month > 12) or np.any(day < 1) or
+       np.any(hour > 23) or np.any(minute > 59) or np.any(sec > 59)):
+        return None
+
+    # Calculate the date using integer calendar arithmetic
+    year_start = (year - 1970).astype("datetime64[Y]")
+    if "j" in vals:
+        if np.any(vals["j"] < 1):
+            return None
+        ddate = year_start.astype("datetime64[D]") + \
+            (vals["j"] - 1).astype("timedelta64[D]")
+        if np.any(ddate.astype("datetime64[Y]") != year_start):
+            return None
+    else:
+        month_start = year_start.astype("datetime64[M]") + \
+            (month - 1).astype("timedelta64[M]")
+        ddate = month_start.astype("datetime64[D]") + \
+            (day - 1).astype("timedelta64[D]")
+        if np.any(ddate.astype("datetime64[M]") != month_start):
+            return None
+
+    # Add the time of day
+    dtime = ddate.astype("datetime64[us]") + \
+        (hour * 3600 + minute * 60 + sec).astype("timedelta64[s]")
 
     return dtime
@@ -9,6 +9,8 @@ Functions
 -------------------------------------------------------------------------------
 match_data_ocb(ocb, dat_dtime, kwargs)
     Match data with open-closed field line boundaries
+match_data_ocb_array(ocb, dat_dtime, kwargs)
+    Match all data records with open-closed field line boundaries at once
 
 Classes
 -------------------------------------------------------------------------------
@@ -29,6 +31,16 @@ Chisham, G. (2017), A new methodology for the development of high-latitude
 import logbook as logging
 import numpy as np
 
+# Number of records in each bucket of the sparse OCB file time index
+_index_stride = 1000
+
+# Number of lines read at a time from ASCII OCB files
+_read_chunk_size = 100000
+
+# Approximate peak memory in bytes for each point converted by revert_coord,
+# including the output and temporary float64 arrays
+_revert_point_bytes = 128
+
 class OCBoundary(object):
     """ Object containing open-closed field-line boundary (OCB) data
 
@@ -49,6 +61,19 @@ class OCBoundary(object):
         First time to load data or beginning of file (default=None)
     etime : (datetime or NoneType)
         Last time to load data or ending of file (default=None)
+    use_cache : (bool)
+        Load the data from a binary column cache, writing the cache if it does
+        not exist or is out of date (default=False)
+    cache_dir : (str or NoneType)
+        Directory for the binary column cache, or None to place the cache
+        alongside the OCB file (default=None)
+    use_mmap : (bool)
+        Store the data columns as read-only views of the memory-mapped binary
+        column cache.  Sets use_cache to True.  (default=False)
+    use_index : (bool)
+        Use a sparse time index, saved in cache_dir, to only read the part of
+        the OCB file between stime and etime.  Not used if use_cache is True.
+        (default=False)
 
     Returns
     ---------
@@ -67,8 +92,17 @@ class OCBoundary(object):
         Number of OCB records (default=0)
     rec_ind : (int)
         Current OCB record index (default=0; initialised=-1)
+    use_cache : (bool)
+        Load the data using a binary column cache (default=False)
+    cache_dir : (str or NoneType)
+        Directory for the binary column cache (default=None)
+    use_mmap : (bool)
+        Data columns are read-only views of the memory-mapped binary column
+        cache (default=False)
+    use_index : (bool)
+        Read time ranges using a sparse time index (default=False)
     dtime : (numpy.ndarray or NoneType)
-        Numpy array of OCB datetimes (default=None)
+        Numpy array of OCB times, as datetime64[us] (default=None)
     phi_cent : (numpy.ndarray or NoneType)
         Numpy array of floats that give the angle from AACGM midnight
         of the OCB pole in degrees (default=None)
@@ -93,14 +127,37 @@ class OCBoundary(object):
     get_next_good_ocb_ind(min_sectors=7, rcent_dev=8.0, max_r=23.0, min_r=10.0,
                           min_j=0.15)
         Cycle to the next good OCB index
-    normal_coord(aacgm_lat, aacgm_mlt)
-        Calculate the OCB coordinates of an AACGM location
-    revert_coord(ocb_lat, ocb_mlt)
+    find_next_good_ocb_ind(rec_ind=-1, min_sectors=7, rcent_dev=8.0,
+                           max_r=23.0, min_r=10.0, min_j=0.15)
+        Find the next good OCB index without changing rec_ind
+    get_good_ocb_mask(min_sectors=7, rcent_dev=8.0, max_r=23.0, min_r=10.0,
+                      min_j=0.15)
+        Evaluate the quality of all OCB records
+    get_good_ocb_ind(min_sectors=7, rcent_dev=8.0, max_r=23.0, min_r=10.0,
+                     min_j=0.15)
+        Get the indices of all good OCB records
+    get_pole_geometry()
+        Get the OCB pole geometry for all records
+    normal_coord(aacgm_lat, aacgm_mlt, ocb_ind=None)
+        Calculate the OCB coordinates of AACGM locations
+    revert_coord(ocb_lat, ocb_mlt, ocb_ind=None)
         Calculate the AACGM location of OCB coordinates for this OCB
+    iter_revert_grid(ocb_lat, ocb_mlt, ocb_ind=None, max_size=1.0e8)
+        Calculate the AACGM location of an OCB grid for blocks of OCB records
+    clear_cache()
+        Remove the binary column caches and time indices for the OCB file
+
+    Notes
+    ---------
+    rec_ind is a cursor used by get_next_good_ocb_ind and match_data_ocb.  To
+    share one OCBoundary object between threads, use find_next_good_ocb_ind,
+    match_data_ocb_array, and the ocb_ind keyword of the coordinate methods,
+    which do not change the object.
     """
 
     def __init__(self, filename="default", instrument="image", hemisphere=1,
-                 boundary_lat=None, stime=None, etime=None):
+                 boundary_lat=None, stime=None, etime=None, use_cache=False,
+                 cache_dir=None, use_mmap=False, use_index=False):
         """Object containing OCB data
 
         Parameters
@@ -120,6 +177,19 @@ class OCBoundary(object):
             First time to load data or beginning of file (default=None)
         etime : (datetime or NoneType)
             Last time to load data or ending of file (default=None)
+        use_cache : (bool)
+            Load the data from a binary column cache, writing the cache if it
+            does not exist or is out of date (default=False)
+        cache_dir : (str or NoneType)
+            Directory for the binary column cache, or None to place the cache
+            alongside the OCB file (default=None)
+        use_mmap : (bool)
+            Store the data columns as read-only views of the memory-mapped
+            binary column cache.  Sets use_cache to True.  (default=False)
+        use_index : (bool)
+            Use a sparse time index, saved in cache_dir, to only read the part
+            of the OCB file between stime and etime.  Not used if use_cache is
+            True.  (default=False)
         """
         import ocbpy
 
@@ -141,13 +211,14 @@ class OCBoundary(object):
                     ocb_dir = ocbpy.__file__.split("/")
                     self.filename = "{:s}/{:s}".format("/".join(ocb_dir[:-1]),
                                                        ocbpy.__default_file__)
-                    if not ocbpy.instruments.test_file(self.filename):
+                    if not ocbpy.instruments.test_file(self.filename,
+                                                       max_size=None):
                         logging.warning("problem with default OC Boundary file")
                         self.filename = None
                 else:
                     logging.warning("default OC Boundary file uses IMAGE data")
                     self.filename = None
-            elif not ocbpy.instruments.test_file(filename):
+            elif not ocbpy.instruments.test_file(filename, max_size=None):
                 logging.warning("cannot open OCB file [{:s}]".format(filename))
                 self.filename = None
             else:
@@ -156,6 +227,12 @@ class OCBoundary(object):
         self.hemisphere = hemisphere
         self.records = 0
         self.rec_ind = 0
+        self.use_cache = use_cache or use_mmap
+        self.cache_dir = cache_dir
+        self.use_mmap = use_mmap
+        self.use_index = use_index
+        self._good_cache = (None, dict())
+        self._geometry = (None, None)
         self.dtime = None
         self.phi_cent = None
         self.r_cent = None
@@ -180,7 +257,8 @@ class OCBoundary(object):
     def __repr__(self):
         """ Provide readable representation of the OCBoundary object
         """
-    
+        import datetime as dt
+
         if self.filename is None:
             out = "No Open-Closed Boundary file specified\n"
         else:
@@ -193,9 +271,10 @@ class OCBoundary(object):
             if self.records == 0:
                 out = "{:s}No data loaded\n".format(out)
             else:
-                out = "{:s}{:d} records from {:}".format(out, self.records,
-                                                         self.dtime[0])
-                out = "{:s} to {:}\n\n".format(out, self.dtime[-1])
+                out = "{:s}{:d} records from {:}".format(
+                    out, self.records, self.dtime[0].astype(dt.datetime))
+                out = "{:s} to {:}\n\n".format(
+                    out, self.dtime[-1].astype(dt.datetime))
 
                 irep = sorted(set([0, 1, self.records - 2, self.records - 1]))
                 while irep[0] < 0:
@@ -204,8 +283,9 @@ class OCBoundary(object):
                 head = "YYYY-MM-DD HH:MM:SS Phi_Centre R_Centre R"
                 out = "{:s}{:s}\n{:-<77s}\n".format(out, head, "")
                 for i in irep:
-                    out = "{:s}{:} {:.2f}".format(out, self.dtime[i],
-                                                  self.phi_cent[i])
+                    out = "{:s}{:} {:.2f}".format(
+                        out, self.dtime[i].astype(dt.datetime),
+                        self.phi_cent[i])
                     out = "{:s} {:.2f} {:.2f}\n".format(out, self.r_cent[i],
                                                         self.r[i])
 
@@ -279,9 +359,8 @@ class OCBoundary(object):
         --------
         self
         """
-        import datetime as dt
-        import ocbpy.ocb_time as ocbt
-        
+        import ocbpy.instruments.general as general
+
         cols = ocb_cols.split()
         dflag = -1
         ldtype = [(k,float) if k != "num_sectors" else (k,int) for k in cols]
@@ -298,64 +377,332 @@ class OCBoundary(object):
             logging.error("missing time columns in [{:s}]".format(ocb_cols))
             return
         
-        # Read the OCB data
-        odata = np.rec.array(np.genfromtxt(self.filename, skip_header=hlines,
-                                           dtype=ldtype))
-        oname = list(odata.dtype.names)
+        # Read the OCB data from the binary cache, if possible
+        odata = None
+        if self.use_cache:
+            cache_path = general.column_cache_path(self.filename,
+                                                   cache_dir=self.cache_dir,
+                                                   key_args=[hlines, ocb_cols,
+                                                             datetime_fmt])
+            odata = general.load_column_cache(cache_path)
+
+        if odata is None and self.use_cache:
+            # Read the entire file and write the cache
+            odata = self._read_ocb_file(hlines, ldtype, dflag, datetime_fmt)
+
+            if(general.write_column_cache(cache_path, odata) and
+               self.use_mmap):
+                mdata = general.load_column_cache(cache_path)
+                if mdata is not None:
+                    odata = mdata
+        elif odata is None:
+            # Only read the part of the file in the desired time range
+            if self.use_index and (stime is not None or etime is not None):
+                odata = self._read_ocb_range(hlines, ocb_cols, ldtype, dflag,
+                                             datetime_fmt, stime, etime)
+
+            if odata is None:
+                odata = self._read_ocb_file(hlines, ldtype, dflag,
+                                            datetime_fmt, stime=stime,
+                                            etime=etime)
 
         # Load the data into the OCBoundary object
         #
-        # Start by getting the time and location in the desired format
+        # Start by selecting the times within the desired range.  The OCB
+        # file is sorted by time, so this is a slice
         self.rec_ind = -1
 
-        dt_list = list()
-        if stime is None and etime is None:
-            itime = np.arange(0, odata.shape[0], 1)
+        dtime = odata["dtime"]
+        if np.any(dtime[1:] < dtime[:-1]):
+            logging.warning("OCB file is not sorted by time")
+            itime = np.ones(shape=dtime.shape, dtype=bool)
+            if stime is not None:
+                itime &= dtime >= np.datetime64(stime, 'us')
+            if etime is not None:
+                itime &= dtime <= np.datetime64(etime, 'us')
+        else:
+            istart = 0 if stime is None else \
+                np.searchsorted(dtime, np.datetime64(stime, 'us'), side='left')
+            iend = dtime.shape[0] if etime is None else \
+                np.searchsorted(dtime, np.datetime64(etime, 'us'), side='right')
+            itime = slice(istart, max(istart, iend))
+
+        # Load the required information in the desired format
+        self._good_cache = (None, dict())
+        self._geometry = (None, None)
+
+        # Load the attributes saved in odata.  Unless the memory-mapped cache
+        # is being used, copy the selected records so the file data is freed
+        for nn in odata.keys():
+            if self.use_mmap and isinstance(odata[nn], np.memmap):
+                setattr(self, nn, odata[nn][itime])
+            else:
+                setattr(self, nn, np.array(odata[nn][itime]))
+
+        self.records = self.dtime.shape[0]
+
+        return
+
+    def _read_ocb_file(self, hlines, ldtype, dflag, datetime_fmt, stime=None,
+                       etime=None):
+        """ Read and decode the columns of the ASCII OCB file in chunks, so
+        that memory use is limited by the selected data rather than file size
+
+        Parameters
+        -----------
+        hlines : (int)
+            Number of header lines preceeding data in the OCB file
+        ldtype : (list)
+            List of (name, type) tuples for each column
+        dflag : (int)
+            Time format flag, 0 for 'year soy' and 1 for 'date time'
+        datetime_fmt : (str)
+            A string used to read in 'date time' data
+        stime : (datetime or NoneType)
+            Time to start keeping data or None to start at beginning of file.
+            (default=None)
+        etime : (datetime or NoneType)
+            Time to stop reading data or None to end at the end of the file.
+            (default=None)
+
+        Returns
+        --------
+        odata : (dict of numpy.arrays)
+            File columns, with OCB pole location in polar coordinates and
+            times as datetime64 under the key 'dtime'
+        """
+        import ocbpy.instruments.general as general
+
+        chunks = list()
+        for lines in general.iter_line_chunks(self.filename, hlines=hlines,
+                                              chunk_size=_read_chunk_size):
+            cdata = self._decode_ocb_lines(lines, ldtype, dflag, datetime_fmt)
+
+            # Only keep the records in the desired time range.  The file is
+            # sorted by time, so stop reading once etime has been passed.
+            cdtime = cdata["dtime"]
+            itime = np.ones(shape=cdtime.shape, dtype=bool)
+            if stime is not None:
+                itime &= cdtime >= np.datetime64(stime, 'us')
+            if etime is not None:
+                itime &= cdtime <= np.datetime64(etime, 'us')
+
+            if not np.all(itime):
+                cdata = {nn:cdata[nn][itime] for nn in cdata.keys()}
+            chunks.append(cdata)
+
+            if(etime is not None and cdtime.shape[0] > 0 and
+               cdtime[-1] > np.datetime64(etime, 'us')):
+                break
+
+        if len(chunks) == 0:
+            return self._decode_ocb_lines(list(), ldtype, dflag, datetime_fmt)
+        elif len(chunks) == 1:
+            return chunks[0]
+
+        odata = {nn:np.concatenate([cdata[nn] for cdata in chunks])
+                 for nn in chunks[0].keys()}
+
+        return odata
+
+    def _decode_ocb_lines(self, fdata, ldtype, dflag, datetime_fmt):
+        """ Decode the columns of lines from an ASCII OCB file
+
+        Parameters
+        -----------
+        fdata : (list)
+            List of data lines from the OCB file
+        ldtype : (list)
+            List of (name, type) tuples for each column
+        dflag : (int)
+            Time format flag, 0 for 'year soy' and 1 for 'date time'
+        datetime_fmt : (str)
+            A string used to read in 'date time' data
+
+        Returns
+        --------
+        odata : (dict of numpy.arrays)
+            File columns, with OCB pole location in polar coordinates and
+            times as datetime64 under the key 'dtime'
+        """
+        import ocbpy.ocb_time as ocbt
+
+        if any(len(line.strip()) > 0 for line in fdata):
+            rdata = np.atleast_1d(np.genfromtxt(fdata, dtype=ldtype))
         else:
-            itime = list()
-
-        for i in range(odata.shape[0]):
-            year = odata.year[i] if dflag == 0 else None
-            soy = odata.soy[i] if dflag == 0 else None
-            date = None if dflag == 0 else odata.date[i]
-            tod = None if dflag == 0 else odata.time[i]
-                
-            dtime = ocbt.convert_time(year=year, soy=soy, date=date, tod=tod,
-                                      datetime_fmt=datetime_fmt)
-
-            if stime is None and etime is None:
-                dt_list.append(dtime)
-            elif((stime is None or stime <= dtime) and
-                 (etime is None or etime >= dtime)):
-                dt_list.append(dtime)
-                itime.append(i)
-
-        if hasattr(odata, 'x') and hasattr(odata, 'y'):
+            rdata = np.zeros(shape=(0,), dtype=ldtype)
+        odata = {nn:rdata[nn] for nn in rdata.dtype.names}
+
+        # Get the time in the desired format
+        if dflag == 0:
+            odata["dtime"] = ocbt.year_soy_to_datetime64(odata["year"],
+                                                         odata["soy"])
+        else:
+            odata["dtime"] = ocbt.convert_time_array(date=odata["date"],
+                                                     tod=odata["time"],
+                                                     datetime_fmt=datetime_fmt)
+
+        if "x" in odata.keys() and "y" in odata.keys():
             # Location is given by x-y coordinates where the origin lies
             # on the magnetic pole, the x-axis follows the dusk-dawn
             # meridian (positive towards dawn), and the y-axis follows the
             # midnight-noon meridian (positive towards noon)
 
             # Calculate the polar coordinates from the x-y coordinates
-            odata.r_cent = np.sqrt(odata.x**2 + odata.y**2)
-            oname.append("r_cent")
+            odata["r_cent"] = np.sqrt(odata["x"]**2 + odata["y"]**2)
 
             # phi_cent is zero at magnetic midnight rather than dawn, so we
             # need to add 90.0 degrees from the arctangent.  Then convert all
             # degrees to their positive angles.
-            odata.phi_cent = np.degrees(np.arctan2(odata.y, odata.x)) + 90.0
-            odata.phi_cent[odata.phi_cent < 0.0] += 360.0
-            oname.append("phi_cent")
+            odata["phi_cent"] = np.degrees(np.arctan2(odata["y"],
+                                                      odata["x"])) + 90.0
+            odata["phi_cent"][odata["phi_cent"] < 0.0] += 360.0
 
-        # Load the required information not contained in odata
-        self.records = len(dt_list)
-        self.dtime = np.array(dt_list)
+        return odata
 
-        # Load the attributes saved in odata
-        for nn in oname:
-            setattr(self, nn, getattr(odata, nn)[itime])
+    def _read_ocb_range(self, hlines, ocb_cols, ldtype, dflag, datetime_fmt,
+                        stime, etime):
+        """ Read the part of the ASCII OCB file between two times, using a
+        sparse time index to find the range of lines that must be read
 
-        return
+        Parameters
+        -----------
+        hlines : (int)
+            Number of header lines preceeding data in the OCB file
+        ocb_cols : (str)
+            String specifying format of OCB file
+        ldtype : (list)
+            List of (name, type) tuples for each column
+        dflag : (int)
+            Time format flag, 0 for 'year soy' and 1 for 'date time'
+        datetime_fmt : (str)
+            A string used to read in 'date time' data
+        stime : (datetime or NoneType)
+            Time to start loading data or None to start at beginning of file.
+        etime : (datetime or NoneType)
+            Time to stop loading data or None to end at the end of the file.
+
+        Returns
+        --------
+        odata : (dict of numpy.arrays or NoneType)
+            File columns for the index buckets that span stime to etime, or
+            None if the time index could not be used
+        """
+        import ocbpy.instruments.general as general
+
+        # Load the time index, building it if necessary
+        index_path = general.column_cache_path(self.filename,
+                                               cache_dir=self.cache_dir,
+                                               key_args=["time_index",
+                                                         _index_stride, hlines,
+                                                         ocb_cols,
+                                                         datetime_fmt])
+        index = general.load_column_cache(index_path, mmap_mode=None)
+
+        if index is None:
+            index = self._build_time_index(hlines, ldtype, dflag, datetime_fmt)
+            if index is None:
+                return None
+
+            general.write_column_cache(index_path, index)
+
+        # Find the byte range of the buckets that may hold the desired times.
+        # Each bucket holds the records from its offset until the next offset.
+        istart = 0 if stime is None else \
+            np.searchsorted(index["dtime"], np.datetime64(stime, 'us'),
+                            side='left') - 1
+        iend = index["dtime"].shape[0] if etime is None else \
+            np.searchsorted(index["dtime"], np.datetime64(etime, 'us'),
+                            side='right')
+
+        if iend <= max(istart, 0):
+            fdata = list()
+        else:
+            start_byte = index["offset"][max(istart, 0)]
+
+            with open(self.filename, "rb") as fin:
+                fin.seek(start_byte)
+                if iend < index["offset"].shape[0]:
+                    bdata = fin.read(index["offset"][iend] - start_byte)
+                else:
+                    bdata = fin.read()
+
+            fdata = bdata.decode("utf-8").splitlines(True)
+
+        return self._decode_ocb_lines(fdata, ldtype, dflag, datetime_fmt)
+
+    def _build_time_index(self, hlines, ldtype, dflag, datetime_fmt):
+        """ Build a sparse time index for the ASCII OCB file
+
+        Parameters
+        -----------
+        hlines : (int)
+            Number of header lines preceeding data in the OCB file
+        ldtype : (list)
+            List of (name, type) tuples for each column
+        dflag : (int)
+            Time format flag, 0 for 'year soy' and 1 for 'date time'
+        datetime_fmt : (str)
+            A string used to read in 'date time' data
+
+        Returns
+        --------
+        index : (dict of numpy.arrays or NoneType)
+            Dict with the time of the first record in each bucket of
+            _index_stride records (key 'dtime') and the byte offset of that
+            record (key 'offset'), or None if the index could not be built
+        """
+        offsets = list()
+        sample_lines = list()
+
+        with open(self.filename, "rb") as fin:
+            for i in range(hlines):
+                fin.readline()
+
+            offset = fin.tell()
+            nline = 0
+            for line in fin:
+                # Only data lines are counted, blank and comment lines are
+                # skipped when reading the file
+                sline = line.strip()
+                if len(sline) > 0 and not sline.startswith(b"#"):
+                    if nline % _index_stride == 0:
+                        offsets.append(offset)
+                        sample_lines.append(line.decode("utf-8"))
+                    nline += 1
+
+                offset += len(line)
+
+        index = {"offset":np.array(offsets, dtype=np.int64)}
+        try:
+            index["dtime"] = self._decode_ocb_lines(sample_lines, ldtype,
+                                                    dflag,
+                                                    datetime_fmt)["dtime"]
+        except ValueError as verr:
+            logging.warning("unable to build time index [{:}]".format(verr))
+            return None
+
+        if index["dtime"].shape != index["offset"].shape:
+            logging.warning("unable to build time index for OCB file")
+            return None
+
+        return index
+
+    def clear_cache(self):
+        """ Remove the binary column caches and time indices for the OCB file
+
+        Returns
+        --------
+        num_removed : (int)
+            Number of caches removed
+        """
+        import ocbpy.instruments.general as general
+
+        if self.filename is None:
+            return 0
+
+        return general.clear_column_cache(self.filename,
+                                          cache_dir=self.cache_dir)
 
     def get_next_good_ocb_ind(self, min_sectors=7, rcent_dev=8.0, max_r=23.0,
                               min_r=10.0, min_j=0.15):
@@ -393,128 +740,467 @@ class OCBoundary(object):
         - that the OCB 'radius' is greater than 10 and less than 23 degrees
         """
 
+        self.rec_ind = self.find_next_good_ocb_ind(self.rec_ind,
+                                                   min_sectors=min_sectors,
+                                                   rcent_dev=rcent_dev,
+                                                   max_r=max_r, min_r=min_r,
+                                                   min_j=min_j)
+
+        return
+
+    def find_next_good_ocb_ind(self, rec_ind=-1, min_sectors=7, rcent_dev=8.0,
+                               max_r=23.0, min_r=10.0, min_j=0.15):
+        """ Find the next usable OCB record after a given record, without
+        changing self.rec_ind
+
+        Parameters
+        -----------
+        rec_ind : (int)
+            Starting record index, the search begins at the following record
+            (default=-1)
+        min_sectors : (int)
+            Minimum number of MLT sectors required for good OCB. (default=7)
+        rcent_dev : (float)
+            Maximum number of degrees between the new centre and the AACGM pole
+            (default=8.0)
+        max_r : (float)
+            Maximum radius for open-closed field line boundary in degrees.
+            (default=23.0)
+        min_r : (float)
+            Minimum radius for open-closed field line boundary in degrees
+            (default=10.0)
+        min_j : (float)
+            Minimum unitless current magnitude scale difference (default=0.15)
+
+        Returns
+        ---------
+        next_ind : (int)
+            Index of the next good OCB record or a value greater than or equal
+            to self.records if there aren't any more good records available
+            after the starting point
+        """
+
         # Incriment forward from previous boundary
-        self.rec_ind += 1
-        
-        while self.rec_ind < self.records:
-            # Evaluate the current boundary for quality, using optional
-            # parameters
-            good = True
-            if(hasattr(self, "num_sectors") and
-               self.num_sectors[self.rec_ind] < min_sectors):
-                good = False
-            elif hasattr(self, "j_mag") and self.j_mag[self.rec_ind] < min_j:
-                good = False
-
-            # Evaluate the current boundary for quality, using non-optional
+        next_ind = int(rec_ind) + 1
+
+        if next_ind < self.records:
+            # Cycle to the next good boundary, using the precomputed table
+            good_info = self._good_ocb_info(min_sectors=min_sectors,
+                                            rcent_dev=rcent_dev, max_r=max_r,
+                                            min_r=min_r, min_j=min_j)
+            next_ind = int(good_info["next"][max(next_ind, 0)])
+
+        return next_ind
+
+    def get_good_ocb_mask(self, min_sectors=7, rcent_dev=8.0, max_r=23.0,
+                          min_r=10.0, min_j=0.15):
+        """ Evaluate the quality of all OCB records.  Only uses the available
+        parameters.
+
+        Parameters
+        -----------
+        min_sectors : (int)
+            Minimum number of MLT sectors required for good OCB. (default=7)
+        rcent_dev : (float)
+            Maximum number of degrees between the new centre and the AACGM pole
+            (default=8.0)
+        max_r : (float)
+            Maximum radius for open-closed field line boundary in degrees.
+            (default=23.0)
+        min_r : (float)
+            Minimum radius for open-closed field line boundary in degrees
+            (default=10.0)
+        min_j : (float)
+            Minimum unitless current magnitude scale difference (default=0.15)
+
+        Returns
+        ---------
+        good_mask : (numpy.ndarray)
+            Boolean array, True for good OCB records
+        """
+
+        good_info = self._good_ocb_info(min_sectors=min_sectors,
+                                        rcent_dev=rcent_dev, max_r=max_r,
+                                        min_r=min_r, min_j=min_j)
+        return good_info["mask"]
+
+    def get_good_ocb_ind(self, min_sectors=7, rcent_dev=8.0, max_r=23.0,
+                         min_r=10.0, min_j=0.15):
+        """ Get the indices of all good OCB records.  Only uses the available
+        parameters.
+
+        Parameters
+        -----------
+        min_sectors : (int)
+            Minimum number of MLT sectors required for good OCB. (default=7)
+        rcent_dev : (float)
+            Maximum number of degrees between the new centre and the AACGM pole
+            (default=8.0)
+        max_r : (float)
+            Maximum radius for open-closed field line boundary in degrees.
+            (default=23.0)
+        min_r : (float)
+            Minimum radius for open-closed field line boundary in degrees
+            (default=10.0)
+        min_j : (float)
+            Minimum unitless current magnitude scale difference (default=0.15)
+
+        Returns
+        ---------
+        good_ind : (numpy.ndarray)
+            Sorted array of good OCB record indices
+        """
+
+        good_info = self._good_ocb_info(min_sectors=min_sectors,
+                                        rcent_dev=rcent_dev, max_r=max_r,
+                                        min_r=min_r, min_j=min_j)
+        return good_info["ind"]
+
+    def _good_ocb_info(self, min_sectors=7, rcent_dev=8.0, max_r=23.0,
+                       min_r=10.0, min_j=0.15):
+        """ Evaluate the quality of all OCB records, saving the results for
+        each set of quality criteria
+
+        Parameters
+        -----------
+        min_sectors : (int)
+            Minimum number of MLT sectors required for good OCB. (default=7)
+        rcent_dev : (float)
+            Maximum number of degrees between the new centre and the AACGM pole
+            (default=8.0)
+        max_r : (float)
+            Maximum radius for open-closed field line boundary in degrees.
+            (default=23.0)
+        min_r : (float)
+            Minimum radius for open-closed field line boundary in degrees
+            (default=10.0)
+        min_j : (float)
+            Minimum unitless current magnitude scale difference (default=0.15)
+
+        Returns
+        ---------
+        good_info : (dict)
+            Dict with the boolean quality mask (key 'mask'), the good record
+            indices (key 'ind'), and the index of the next good record at or
+            after each record (key 'next', with self.records for none)
+        """
+
+        good_key = (min_sectors, rcent_dev, max_r, min_r, min_j)
+
+        # Remove the saved results if the data columns have changed.  The
+        # references and results are replaced together, so that threads
+        # sharing this object never see a partial update
+        good_refs = self._column_refs(["num_sectors", "j_mag", "r_cent", "r"])
+        old_refs, good_cache = self._good_cache
+        if not self._same_refs(good_refs, old_refs):
+            good_cache = dict()
+            self._good_cache = (good_refs, good_cache)
+
+        good_info = good_cache.get(good_key)
+        if good_info is None:
+            # Evaluate the boundaries for quality, using optional parameters
+            good_mask = np.ones(shape=(self.records,), dtype=bool)
+            if hasattr(self, "num_sectors"):
+                good_mask &= ~(self.num_sectors[:self.records] < min_sectors)
+            if hasattr(self, "j_mag"):
+                good_mask &= ~(self.j_mag[:self.records] < min_j)
+
+            # Evaluate the boundaries for quality, using non-optional
             # parameters
-            if(good and self.r_cent[self.rec_ind] <= rcent_dev and
-               self.r[self.rec_ind] >= min_r and self.r[self.rec_ind] <= max_r):
-                return
+            if self.records > 0:
+                good_mask &= ((self.r_cent <= rcent_dev) & (self.r >= min_r) &
+                              (self.r <= max_r))
 
-            # Cycle to next boundary
-            self.rec_ind += 1
+            # Find the next good record at or after each record
+            good_ind = np.where(good_mask)[0]
+            next_ind = np.full(self.records + 1, self.records, dtype=np.int64)
+            next_ind[good_ind] = good_ind
+            next_ind = np.minimum.accumulate(next_ind[::-1])[::-1]
 
-        return
+            good_info = {"mask":good_mask, "ind":good_ind, "next":next_ind}
+            good_cache[good_key] = good_info
+
+        return good_info
+
+    def get_pole_geometry(self):
+        """ Get the OCB pole geometry for all records, calculating it only
+        if the data columns have changed
 
-    def normal_coord(self, aacgm_lat, aacgm_mlt):
+        Returns
+        ---------
+        geometry : (dict)
+            Dict of numpy arrays with one value per record.  The keys are:
+            'xc' and 'yc', the cartesian location of the OCB pole in degrees;
+            'scale_normal', the ratio of the OCB reference radius to the OCB
+            radius; 'scale_revert', the ratio of the OCB radius to the OCB
+            reference radius; 'ocb_aacgm_lat', the AACGM latitude of the OCB
+            pole in degrees; and 'ocb_aacgm_mlt', the AACGM MLT of the OCB
+            pole in hours.
+
+        Notes
+        -------
+        Changes are detected when a data column or the boundary latitude are
+        replaced, not when a data column is changed in place
+        """
+
+        geo_refs = self._column_refs(["phi_cent", "r_cent", "r",
+                                      "boundary_lat", "hemisphere"])
+
+        old_refs, geometry = self._geometry
+
+        if geometry is None or not self._same_refs(geo_refs, old_refs):
+            if self.records > 0:
+                phi_cent_rad = np.radians(self.phi_cent)
+                geometry = {"xc":self.r_cent * np.cos(phi_cent_rad),
+                            "yc":self.r_cent * np.sin(phi_cent_rad),
+                            "scale_normal":(90.0 - abs(self.boundary_lat))
+                            / self.r,
+                            "scale_revert":self.r / (90.0 - self.hemisphere *
+                                                     self.boundary_lat),
+                            "ocb_aacgm_lat":90.0 - self.r_cent,
+                            "ocb_aacgm_mlt":self.phi_cent / 15.0}
+            else:
+                geometry = {kk:np.zeros(shape=(0,)) for kk in
+                            ["xc", "yc", "scale_normal", "scale_revert",
+                             "ocb_aacgm_lat", "ocb_aacgm_mlt"]}
+
+            self._geometry = (geo_refs, geometry)
+
+        return geometry
+
+    def _column_refs(self, columns):
+        """ Get references to the data columns that saved results depend on
+
+        Parameters
+        -----------
+        columns : (list)
+            List of attribute names
+
+        Returns
+        ---------
+        refs : (tuple)
+            Attribute values (None if missing), followed by the number of
+            records
+        """
+        refs = tuple([getattr(self, cc, None) for cc in columns] +
+                     [self.records])
+
+        return refs
+
+    @staticmethod
+    def _same_refs(refs, old_refs):
+        """ Test to see if two sets of data column references are the same
+
+        Parameters
+        -----------
+        refs : (tuple)
+            Current data column references
+        old_refs : (tuple or NoneType)
+            Data column references used to calculate saved results
+
+        Returns
+        ---------
+        same : (bool)
+            True if all references are to the same objects
+        """
+        if old_refs is None or len(refs) != len(old_refs):
+            return False
+
+        return all([rr is oo for rr, oo in zip(refs, old_refs)])
+
+    def normal_coord(self, aacgm_lat, aacgm_mlt, ocb_ind=None):
         """converts the position of a measurement in AACGM co-ordinates to
         normalised co-ordinates relative to the OCB
 
         Parameters
         -----------
-        aacgm_lat : (float)
+        aacgm_lat : (float or array-like)
             Input magnetic latitude (degrees)
-        aacgm_mlt : (float)
+        aacgm_mlt : (float or array-like)
             Input magnetic local time (hours)
+        ocb_ind : (int, array-like, or NoneType)
+            OCB record index for each point, or None to use the current record
+            index (default=None)
 
         Returns
         --------
-        ocb_lat : (float)
+        ocb_lat : (float or numpy.ndarray)
             Magnetic latitude relative to OCB (degrees)
-        ocb_mlt : (float)
+        ocb_mlt : (float or numpy.ndarray)
             Magnetic local time relative to OCB (hours)
  
         Comments
         ---------
         Approximation - Conversion assumes a planar surface
+        Array inputs are broadcast against each other.  Points with an invalid
+        OCB record index or in the wrong hemisphere are returned as NaN.
         """
-        if self.rec_ind < 0 or self.rec_ind >= self.records:
-            return np.nan, np.nan
+        aacgm_lat, aacgm_mlt, ocb_ind, good = self._coord_inputs(aacgm_lat,
+                                                                 aacgm_mlt,
+                                                                 ocb_ind)
+        ocb_lat = np.full(shape=aacgm_lat.shape, fill_value=np.nan)
+        ocb_mlt = np.full(shape=aacgm_lat.shape, fill_value=np.nan)
+
+        if np.any(good):
+            ocb_ind = ocb_ind[good]
+            geometry = self.get_pole_geometry()
+            xc = geometry["xc"][ocb_ind]
+            yc = geometry["yc"][ocb_ind]
+
+            scalep = 90.0 - self.hemisphere * aacgm_lat[good]
+            xp = scalep * np.cos(np.radians(aacgm_mlt[good] * 15.0))
+            yp = scalep * np.sin(np.radians(aacgm_mlt[good] * 15.0))
+
+            scalen = geometry["scale_normal"][ocb_ind]
+            xn = (xp - xc) * scalen
+            yn = (yp - yc) * scalen
 
-        if np.sign(aacgm_lat) != self.hemisphere:
-            return np.nan, np.nan
+            ocb_lat[good] = self.hemisphere * (90.0 - np.sqrt(xn**2 + yn**2))
+            ocb_mlt[good] = np.degrees(np.arctan2(yn, xn)) / 15.0
+            ocb_mlt[ocb_mlt < 0.0] += 24.0
 
-        phi_cent_rad = np.radians(self.phi_cent[self.rec_ind])
-        xc = self.r_cent[self.rec_ind] * np.cos(phi_cent_rad)
-        yc = self.r_cent[self.rec_ind] * np.sin(phi_cent_rad)
+        return ocb_lat[()], ocb_mlt[()]
 
-        scalep = 90.0 - self.hemisphere * aacgm_lat
-        xp = scalep * np.cos(np.radians(aacgm_mlt * 15.0))
-        yp = scalep * np.sin(np.radians(aacgm_mlt * 15.0))
+    def _coord_inputs(self, lat, mlt, ocb_ind=None):
+        """ Prepare the inputs for a coordinate transformation
 
-        scalen = (90.0 - abs(self.boundary_lat)) / self.r[self.rec_ind]
-        xn = (xp - xc) * scalen
-        yn = (yp - yc) * scalen
+        Parameters
+        -----------
+        lat : (float or array-like)
+            Input latitude (degrees)
+        mlt : (float or array-like)
+            Input local time (hours)
+        ocb_ind : (int, array-like, or NoneType)
+            OCB record index for each point, or None to use the current record
+            index (default=None)
 
-        ocb_lat = self.hemisphere * (90.0 - np.sqrt(xn**2 + yn**2))
-        ocb_mlt = np.degrees(np.arctan2(yn, xn)) / 15.0
+        Returns
+        --------
+        lat : (numpy.ndarray)
+            Broadcast latitude array (degrees)
+        mlt : (numpy.ndarray)
+            Broadcast local time array (hours)
+        ocb_ind : (numpy.ndarray)
+            Broadcast OCB record index array
+        good : (numpy.ndarray)
+            Boolean array, True for points with a valid OCB record index that
+            lie in the OCB hemisphere
+        """
+        if ocb_ind is None:
+            ocb_ind = self.rec_ind
 
-        if ocb_mlt < 0.0:
-            ocb_mlt += 24.0
+        lat, mlt, ocb_ind = np.broadcast_arrays(np.asarray(lat, dtype=float),
+                                                np.asarray(mlt, dtype=float),
+                                                np.asarray(ocb_ind, dtype=int))
+        good = ((ocb_ind >= 0) & (ocb_ind < self.records) &
+                (np.sign(lat) == self.hemisphere))
 
-        return ocb_lat, ocb_mlt
+        return lat, mlt, ocb_ind, good
 
-    def revert_coord(self, ocb_lat, ocb_mlt):
+    def revert_coord(self, ocb_lat, ocb_mlt, ocb_ind=None):
         """Converts the position of a measurement in normalised co-ordinates
         relative to the OCB into AACGM co-ordinates
 
         Parameters
         -----------
-        ocb_lat : (float)
+        ocb_lat : (float or array-like)
             Input OCB latitude (degrees)
-        ocb_mlt : (float)
+        ocb_mlt : (float or array-like)
             Input OCB local time (hours)
+        ocb_ind : (int, array-like, or NoneType)
+            OCB record index for each point, or None to use the current record
+            index (default=None)
 
         Returns
         --------
-        aacgm_lat : (float)
+        aacgm_lat : (float or numpy.ndarray)
             AACGM latitude (degrees)
-        aacgm_mlt : (float)
+        aacgm_mlt : (float or numpy.ndarray)
             AACGM magnetic local time (hours)
  
         Comments
         ---------
         Approximation - Conversion assumes a planar surface
+        Array inputs are broadcast against each other.  Points with an invalid
+        OCB record index or in the wrong hemisphere are returned as NaN.
         """
-        if self.rec_ind < 0 or self.rec_ind >= self.records:
-            return np.nan, np.nan
+        ocb_lat, ocb_mlt, ocb_ind, good = self._coord_inputs(ocb_lat, ocb_mlt,
+                                                             ocb_ind)
+        aacgm_lat = np.full(shape=ocb_lat.shape, fill_value=np.nan)
+        aacgm_mlt = np.full(shape=ocb_lat.shape, fill_value=np.nan)
 
-        if np.sign(ocb_lat) != self.hemisphere:
-            return np.nan, np.nan
+        if np.any(good):
+            ocb_ind = ocb_ind[good]
+            geometry = self.get_pole_geometry()
+            xc = geometry["xc"][ocb_ind]
+            yc = geometry["yc"][ocb_ind]
 
-        phi_cent_rad = np.radians(self.phi_cent[self.rec_ind])
-        xc = self.r_cent[self.rec_ind] * np.cos(phi_cent_rad)
-        yc = self.r_cent[self.rec_ind] * np.sin(phi_cent_rad)
+            rn = 90.0 - self.hemisphere * ocb_lat[good]
 
-        rn = 90.0 - self.hemisphere * ocb_lat
+            thetan = ocb_mlt[good] * np.pi / 12.0
+            xn = rn * np.cos(thetan)
+            yn = rn * np.sin(thetan)
 
-        thetan = ocb_mlt * np.pi / 12.0
-        xn = rn * np.cos(thetan)
-        yn = rn * np.sin(thetan)
+            scale_ocb = geometry["scale_revert"][ocb_ind]
+            xp = xn * scale_ocb + xc
+            yp = yn * scale_ocb + yc
 
-        scale_ocb = self.r[self.rec_ind] / (90.0 - self.hemisphere *
-                                            self.boundary_lat)
-        xp = xn * scale_ocb + xc
-        yp = yn * scale_ocb + yc
+            aacgm_lat[good] = self.hemisphere * (90.0 - np.sqrt(xp**2 + yp**2))
+            aacgm_mlt[good] = np.degrees(np.arctan2(yp, xp)) / 15.0
+            aacgm_mlt[aacgm_mlt < 0.0] += 24.0
 
-        aacgm_lat = self.hemisphere * (90.0 - np.sqrt(xp**2 + yp**2))
-        aacgm_mlt = np.degrees(np.arctan2(yp, xp)) / 15.0
+        return aacgm_lat[()], aacgm_mlt[()]
 
-        if aacgm_mlt < 0.0:
-            aacgm_mlt += 24.0
+    def iter_revert_grid(self, ocb_lat, ocb_mlt, ocb_ind=None, max_size=1.0e8):
+        """Converts a grid of normalised co-ordinates relative to the OCB into
+        AACGM co-ordinates for many OCB records, a block of records at a time
 
-        return aacgm_lat, aacgm_mlt
+        Parameters
+        -----------
+        ocb_lat : (array-like)
+            OCB latitude of each grid point (degrees)
+        ocb_mlt : (array-like)
+            OCB local time of each grid point (hours)
+        ocb_ind : (array-like or NoneType)
+            OCB record indices, or None to use all records (default=None)
+        max_size : (float)
+            Approximate maximum memory in bytes used to convert each block of
+            records, including the AACGM output arrays and the temporary arrays
+            made by revert_coord.  At least one record is always yielded.
+            (default=1.0e8)
+
+        Yields
+        --------
+        block_ind : (numpy.ndarray)
+            OCB record indices for this block
+        aacgm_lat : (numpy.ndarray)
+            AACGM latitude (degrees) with shape (records, grid points)
+        aacgm_mlt : (numpy.ndarray)
+            AACGM magnetic local time (hours) with shape (records, grid points)
+
+        Comments
+        ---------
+        The grid is flattened before the conversion is performed
+        """
+        ocb_lat, ocb_mlt = np.broadcast_arrays(np.asarray(ocb_lat, dtype=float),
+                                               np.asarray(ocb_mlt, dtype=float))
+        ocb_lat = ocb_lat.reshape(1, -1)
+        ocb_mlt = ocb_mlt.reshape(1, -1)
+
+        if ocb_ind is None:
+            ocb_ind = np.arange(self.records)
+        ocb_ind = np.asarray(ocb_ind, dtype=int).reshape(-1)
+
+        # Besides the two float64 output arrays, revert_coord makes about a
+        # dozen temporary arrays the size of each block
+        block_size = max(1, int(max_size // (_revert_point_bytes *
+                                             max(1, ocb_lat.shape[1]))))
+
+        for istart in range(0, ocb_ind.shape[0], block_size):
+            block_ind = ocb_ind[istart:istart+block_size]
+            aacgm_lat, aacgm_mlt = self.revert_coord(ocb_lat, ocb_mlt,
+                                                     ocb_ind=block_ind[:,None])
+            yield block_ind, aacgm_lat, aacgm_mlt
 
 def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
                    rcent_dev=8.0, max_r=23.0, min_r=10.0, min_j=0.15):
@@ -525,7 +1211,7 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
     ----------
     ocb : (OCBoundary)
         Class containing the open-close field line boundary data
-    dat_dtime : (list or numpy array of datetime objects)
+    dat_dtime : (list or numpy array of datetime or datetime64 objects)
         Times where data exists
     idat : (int)
         Current data index (default=0)
@@ -553,10 +1239,10 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
     Notes
     --------
     Updates OCBoundary.rec_ind for matched value.  None if all of the
-    boundaries have been searched.
+    boundaries have been searched.  Use match_data_ocb_array to match data
+    without changing the OCBoundary object.
     """
     import ocbpy.ocboundary as ocboundary
-    import datetime as dt
 
     dat_records = len(dat_dtime)
 
@@ -581,8 +1267,8 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
             logging.info(estr)
 
         # Cycle past data occuring before the specified OC boundary point
-        first_ocb = ocb.dtime[ocb.rec_ind] - dt.timedelta(seconds=max_tol)
-        while dat_dtime[idat] < first_ocb:
+        while _seconds_between(ocb.dtime[ocb.rec_ind],
+                               dat_dtime[idat]) > max_tol:
             idat += 1
 
             if idat >= dat_records:
@@ -590,13 +1276,13 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
                 return None
 
     # If the times match, return
-    if ocb.dtime[ocb.rec_ind] == dat_dtime[idat]:
+    if _seconds_between(ocb.dtime[ocb.rec_ind], dat_dtime[idat]) == 0.0:
         return idat
 
     # If the times don't match, cycle through both datasets until they do
     while idat < dat_records and ocb.rec_ind < ocb.records:
         # Increase the OCB index until one lies within the desired boundary
-        sdiff = (ocb.dtime[ocb.rec_ind] - dat_dtime[idat]).total_seconds()
+        sdiff = _seconds_between(ocb.dtime[ocb.rec_ind], dat_dtime[idat])
 
         if sdiff < -max_tol:
             # Cycle to the next OCB value since the lowest vorticity value
@@ -621,8 +1307,8 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
                                       min_r=min_r, min_j=min_j)
 
             if ocb.rec_ind < ocb.records:
-                sdiff = (ocb.dtime[ocb.rec_ind] -
-                         dat_dtime[idat]).total_seconds()
+                sdiff = _seconds_between(ocb.dtime[ocb.rec_ind],
+                                         dat_dtime[idat])
 
                 while abs(sdiff) < abs(last_sdiff):
                     last_sdiff = sdiff
@@ -631,8 +1317,8 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
                                               rcent_dev=rcent_dev, max_r=max_r,
                                               min_r=min_r, min_j=min_j)
                     if ocb.rec_ind < ocb.records:
-                        sdiff = (ocb.dtime[ocb.rec_ind] -
-                                 dat_dtime[idat]).total_seconds()
+                        sdiff = _seconds_between(ocb.dtime[ocb.rec_ind],
+                                                 dat_dtime[idat])
 
             sdiff = last_sdiff
             ocb.rec_ind = last_iocb
@@ -642,3 +1328,106 @@ def match_data_ocb(ocb, dat_dtime, idat=0, max_tol=600, min_sectors=7,
 
     # Return from the last loop
     return idat
+
+def match_data_ocb_array(ocb, dat_dtime, max_tol=600, min_sectors=7,
+                         rcent_dev=8.0, max_r=23.0, min_r=10.0, min_j=0.15):
+    """Matches all data records with OCB records, locating the closest good
+    boundary within a specified tolerance of each data record
+
+    Parameters
+    ----------
+    ocb : (OCBoundary)
+        Class containing the open-close field line boundary data
+    dat_dtime : (list or numpy array of datetime or datetime64 objects)
+        Times where data exists
+    max_tol : (int)
+        maximum seconds between OCB and data record in sec (default=600)
+    min_sectors : (int)
+        Minimum number of MLT sectors required for good OCB. (default=7)
+    rcent_dev : (float)
+        Maximum number of degrees between the new centre and the AACGM pole
+        (default=8.0)
+    max_r : (float)
+        Maximum radius for open-closed field line boundary in degrees.
+        (default=23.0)
+    min_r : (float)
+        Minimum radius for open-closed field line boundary in degrees
+        (default=10.0)
+    min_j : (float)
+        Minimum unitless current magnitude scale difference (default=0.15)
+
+    Returns
+    ---------
+    idat : (numpy.ndarray)
+        Indices of the matched data records, in increasing order
+    iocb : (numpy.ndarray)
+        Indices of the OCB record matched to each data record
+    sdiff : (numpy.ndarray)
+        Seconds between the matched OCB and data records (OCB - data)
+
+    Notes
+    --------
+    The OCB records must be sorted by time, the data records need not be.
+    When two good OCB records are equally close to a data record, the earlier
+    one is used, as in match_data_ocb.  Does not use or update
+    OCBoundary.rec_ind.
+    """
+
+    # Get the times of the good OCB records
+    good_ind = ocb.get_good_ocb_ind(min_sectors=min_sectors,
+                                    rcent_dev=rcent_dev, max_r=max_r,
+                                    min_r=min_r, min_j=min_j)
+    dat_time = np.asarray(dat_dtime, dtype="datetime64[us]").reshape(-1)
+
+    if good_ind.shape[0] == 0 or dat_time.shape[0] == 0:
+        if good_ind.shape[0] == 0 and ocb.records > 0:
+            estr = "unable to find a good OCB record in "
+            estr = "{:s}{:}".format(estr, ocb.filename)
+            logging.error(estr)
+        return (np.zeros(shape=(0,), dtype=int),
+                np.zeros(shape=(0,), dtype=int), np.zeros(shape=(0,)))
+
+    ocb_time = np.asarray(ocb.dtime, dtype="datetime64[us]")[good_ind]
+
+    # Find the good OCB records on either side of each data record
+    iright = np.searchsorted(ocb_time, dat_time, side="left")
+    ileft = np.clip(iright - 1, 0, good_ind.shape[0] - 1)
+    iright = np.clip(iright, 0, good_ind.shape[0] - 1)
+
+    one_sec = np.timedelta64(1, "s")
+    left_sdiff = (ocb_time[ileft] - dat_time) / one_sec
+    right_sdiff = (ocb_time[iright] - dat_time) / one_sec
+
+    # Keep the closest record, using the earlier record for ties
+    use_right = abs(right_sdiff) < abs(left_sdiff)
+    iclose = np.where(use_right, iright, ileft)
+    sdiff = np.where(use_right, right_sdiff, left_sdiff)
+
+    # Remove the data without a boundary close enough to grid it
+    idat = np.where(abs(sdiff) <= max_tol)[0]
+
+    if idat.shape[0] < dat_time.shape[0]:
+        estr = "no OCB data available within [{:} s] of ".format(max_tol)
+        estr = "{:s}{:d} input measurements".format(estr, dat_time.shape[0] -
+                                                    idat.shape[0])
+        logging.info(estr)
+
+    return idat, good_ind[iclose[idat]], sdiff[idat]
+
+def _seconds_between(ocb_time, dat_time):
+    """Seconds from a data time to an OCB time (OCB - data)
+
+    Parameters
+    ----------
+    ocb_time : (datetime or numpy.datetime64)
+        OCB record time
+    dat_time : (datetime or numpy.datetime64)
+        Data record time
+
+    Returns
+    ---------
+    sdiff : (float)
+        Seconds between the two times, at microsecond resolution
+    """
+    return ((np.datetime64(ocb_time, "us") - np.datetime64(dat_time, "us")) /
+            np.timedelta64(1, "s"))
@@ -64,6 +64,57 @@ class TestGeneralMethods(unittest.TestCase):
         self.assertTrue(self.log_handler.formatted_records[0].find('empty file')
                         > 0)
 
+    def test_file_test_max_size(self):
+        """ Test the general file testing routine with a size limit
+        """
+        self.assertFalse(ocb_igen.test_file(self.test_file, max_size=10))
+        self.assertTrue(ocb_igen.test_file(self.test_file, max_size=None))
+
+        self.assertEqual(len(self.log_handler.formatted_records), 1)
+        self.assertTrue(self.log_handler.formatted_records[0].find( \
+                                                        'File size') > 0)
+
+    def test_iter_line_chunks(self):
+        """ Test the routine that reads a file in chunks of lines
+        """
+        chunks = list(ocb_igen.iter_line_chunks(self.test_file, hlines=1,
+                                                chunk_size=10))
+
+        self.assertEqual(len(chunks), 8)
+        self.assertListEqual([len(ll) for ll in chunks], [10] * 7 + [4])
+        del chunks
+
+    def test_iter_ascii_data(self):
+        """ Test the general routine to load ASCII data in chunks
+        """
+        hh = ["YEAR SOY NB PHICENT RCENT R A RERR"]
+        header, data = ocb_igen.load_ascii_data(self.test_file, 0,
+                                                datetime_cols=[0,1],
+                                                datetime_fmt="YEAR SOY",
+                                                header=hh)
+
+        nchunk = 0
+        nline = 0
+        for cheader, cdata in ocb_igen.iter_ascii_data(self.test_file, 0,
+                                                       chunk_size=10,
+                                                       datetime_cols=[0,1],
+                                                       datetime_fmt="YEAR SOY",
+                                                       header=hh):
+            self.assertListEqual(cheader, hh)
+            self.assertListEqual(sorted(cdata.keys()), sorted(data.keys()))
+
+            for kk in data.keys():
+                self.assertListEqual(list(cdata[kk]),
+                                     list(data[kk][nline:nline+10]))
+
+            nline += cdata['A'].shape[0]
+            nchunk += 1
+
+        self.assertEqual(nchunk, 8)
+        self.assertEqual(nline, 75)
+
+        del hh, header, data, cheader, cdata
+
     def test_load_ascii_data_badfile(self):
         """ Test the general loading routine for ASCII data with bad input
         """
@@ -209,6 +260,87 @@ class TestGeneralMethods(unittest.TestCase):
 
         del hh, header, data, ktest, test_vals
 
+    def test_load_ascii_data_w_datetime_str(self):
+        """ Test the general routine to load ASCII data with date and time
+        strings
+        """
+        import datetime as dt
+
+        with open(self.temp_output, "w") as fout:
+            fout.write("DATE TIME VAL STID\n")
+            fout.write("2000-05-05 11:35:27 1.5 ABC\n")
+            fout.write("2000-05-09 01:02:03 2.5 DE\n")
+
+        header, data = ocb_igen.load_ascii_data(self.temp_output, 1,
+                                                datetime_cols=[0,1],
+                                                datetime_fmt="%Y-%m-%d %H:%M:%S",
+                                                str_cols=[3])
+
+        self.assertListEqual(sorted(list(data.keys())),
+                             ["DATE", "STID", "TIME", "VAL", "datetime"])
+        self.assertListEqual(list(data['datetime']),
+                             [dt.datetime(2000,5,5,11,35,27),
+                              dt.datetime(2000,5,9,1,2,3)])
+        self.assertEqual(data['datetime'].dtype, np.dtype('datetime64[us]'))
+        self.assertListEqual(list(data['VAL']), [1.5, 2.5])
+        self.assertListEqual(list(data['STID']), ["ABC", "DE"])
+        self.assertEqual(data['STID'].dtype, np.dtype('<U3'))
+
+        del header, data
+
+    def test_format_output_lines(self):
+        """ Test the formatting of columns as a block of output lines
+        """
+        dtimes = np.array(["2000-05-05T11:35:27", "2000-05-09T01:02:03"],
+                          dtype="datetime64[us]")
+        block = ocb_igen.format_output_lines("{:} {:d} {:s} {:.2f}\n",
+                                             [dtimes, np.array([1, 2]),
+                                              np.array(["ABC", "DE"]),
+                                              np.array([1.5, 2.125])])
+
+        self.assertEqual(block, "".join(["2000-05-05 11:35:27 1 ABC 1.50\n",
+                                         "2000-05-09 01:02:03 2 DE 2.12\n"]))
+
+    def test_write_binary_output(self):
+        """ Test writing and loading binary output in blocks
+        """
+        import shutil
+        import tempfile
+
+        temp_dir = tempfile.mkdtemp()
+        out_dir = "{:s}/out_npy".format(temp_dir)
+        dtimes = np.array(["2000-05-05T11:35:27", "2000-05-09T01:02:03"],
+                          dtype="datetime64[us]")
+        blocks = [{"DATETIME":dtimes, "STID":np.array(["AB", "C"]),
+                   "VAL":np.array([1.5, 2.125])},
+                  {"DATETIME":dtimes[:1], "STID":np.array(["DEF"]),
+                   "VAL":np.array([np.pi])}]
+
+        self.assertTrue(ocb_igen.write_binary_output(out_dir, blocks,
+                                                     ["DATETIME", "STID",
+                                                      "VAL"],
+                                                     {"instrument":"test"}))
+        schema, data = ocb_igen.load_binary_output(out_dir)
+
+        self.assertEqual(schema["records"], 3)
+        self.assertDictEqual(schema["attrs"], {"instrument":"test"})
+        self.assertListEqual(list(data.keys()), ["DATETIME", "STID", "VAL"])
+        self.assertIsInstance(data['VAL'], np.memmap)
+        self.assertListEqual(list(data['DATETIME']),
+                             [dtimes[0], dtimes[1], dtimes[0]])
+        self.assertListEqual(list(data['STID']), ["AB", "C", "DEF"])
+        self.assertListEqual(list(data['VAL']), [1.5, 2.125, np.pi])
+
+        # A block that could not be made stops the output
+        del schema, data
+        self.assertFalse(ocb_igen.write_binary_output(out_dir, [None],
+                                                      ["VAL"]))
+        schema, data = ocb_igen.load_binary_output(out_dir)
+        self.assertEqual(schema["records"], 3)
+
+        shutil.rmtree(temp_dir)
+        del schema, data, blocks
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -58,6 +58,57 @@ class TestOCBScalingMethods(unittest.TestCase):
         self.assertEqual(ocbpy.ocb_scaling.archav(0.0), 0.0)
         self.assertEqual(ocbpy.ocb_scaling.archav(1.0), np.pi)
         
+    def test_haversine_out(self):
+        """ Test the haversine and inverse haversine with output buffers
+        """
+        alpha = np.array([0.0, 0.5 * np.pi, np.pi, -np.pi])
+        out = np.zeros(shape=alpha.shape)
+
+        hav_alpha = ocbpy.ocb_scaling.hav(alpha, out=out)
+        self.assertIs(hav_alpha, out)
+        self.assertTrue(np.all(hav_alpha == ocbpy.ocb_scaling.hav(alpha)))
+
+        # The output buffer may also be the input
+        ocbpy.ocb_scaling.archav(out, out=out)
+        self.assertTrue(np.allclose(out, abs(alpha)))
+        del alpha, out, hav_alpha
+
+    def test_calc_pole_angle_array(self):
+        """ Test the pole angle and quadrant calculations for arrays
+        """
+        ocb_mlt = self.ocb.phi_cent[27] / 15.0
+        ocb_lat = 90.0 - self.ocb.r_cent[27]
+        aacgm_lat = np.array([75.0, 80.0, ocb_lat, 70.0, 70.0, np.nan])
+        aacgm_mlt = np.array([22.0, 3.0, 0.0, ocb_mlt, ocb_mlt + 12.0, 1.0])
+
+        pole_angle = ocbpy.ocb_scaling.calc_vec_pole_angle(aacgm_lat,
+                                                           aacgm_mlt, ocb_lat,
+                                                           ocb_mlt)
+        self.assertEqual(pole_angle.shape, aacgm_lat.shape)
+        self.assertEqual(pole_angle[3], 0.0)
+        self.assertEqual(pole_angle[4], 180.0)
+        self.assertTrue(np.isnan(pole_angle[5]))
+        self.assertAlmostEqual(pole_angle[2], 46.2932179019)
+
+        ocb_quad, vec_quad = ocbpy.ocb_scaling.calc_quadrants(
+            aacgm_mlt, ocb_mlt, pole_angle, [50.0, -1.0, -1.0, 1.0, 1.0, 1.0],
+            [86.5, 1.0, -1.0, -1.0, 1.0, 1.0])
+        self.assertListEqual(list(vec_quad), [1, 4, 3, 2, 1, 0])
+        self.assertEqual(ocb_quad[0], 1)
+        self.assertEqual(ocb_quad[5], 0)
+
+        # The scalar calculations give the same values
+        for i in range(aacgm_lat.shape[0]):
+            sval = ocbpy.ocb_scaling.calc_vec_pole_angle(aacgm_lat[i],
+                                                         aacgm_mlt[i], ocb_lat,
+                                                         ocb_mlt)
+            if np.isnan(sval):
+                self.assertTrue(np.isnan(pole_angle[i]))
+            else:
+                self.assertEqual(sval, pole_angle[i])
+
+        del aacgm_lat, aacgm_mlt, pole_angle, ocb_quad, vec_quad
+
     def test_calc_large_pole_angle(self):
         """ Test to see that the OCB polar angle calculation is performed
         properly when the angle is greater than 90 degrees
@@ -224,7 +275,120 @@ class TestOCBScalingMethods(unittest.TestCase):
         self.vdata.set_ocb(self.ocb, None)
         self.assertEqual(self.vdata.unscaled_r, 14.09)
 
-        
+    def test_vector_array_set_ocb(self):
+        """ Test that the VectorDataArray values match the VectorData values
+        """
+        # Build vectors at many locations, including locations aligned with
+        # the AACGM and OCB poles, pointing in all directions
+        pole_mlt = [self.ocb.phi_cent[i] / 15.0 for i in [27, 31]]
+        aacgm_lat = list()
+        aacgm_mlt = list()
+        aacgm_n = list()
+        aacgm_e = list()
+        ocb_ind = list()
+        for i, iocb in enumerate([27, 31]):
+            for mlt in [0.0, 3.5, 6.0, 10.2, 13.7, 18.0, 22.0, pole_mlt[i],
+                        pole_mlt[i] - 12.0]:
+                for lat in [65.0, 74.3, 82.0, 87.2]:
+                    for vn, ve in [(50.0, 86.5), (-50.0, 86.5), (50.0, -86.5),
+                                   (-50.0, -86.5), (0.0, 10.0), (0.0, 0.0),
+                                   (-10.0, 0.0)]:
+                        aacgm_lat.append(lat)
+                        aacgm_mlt.append(mlt)
+                        aacgm_n.append(vn)
+                        aacgm_e.append(ve)
+                        ocb_ind.append(iocb)
+
+        for sfunc in [None, ocbpy.ocb_scaling.normal_curl_evar]:
+            varray = ocbpy.ocb_scaling.VectorDataArray(
+                np.arange(len(aacgm_lat)), ocb_ind, aacgm_lat, aacgm_mlt,
+                aacgm_n=aacgm_n, aacgm_e=aacgm_e, aacgm_z=5.0,
+                scale_func=sfunc)
+            varray.set_ocb(self.ocb)
+
+            for i in range(len(aacgm_lat)):
+                self.ocb.rec_ind = ocb_ind[i]
+                vdata = ocbpy.ocb_scaling.VectorData(i, ocb_ind[i],
+                                                     aacgm_lat[i],
+                                                     aacgm_mlt[i],
+                                                     aacgm_n=aacgm_n[i],
+                                                     aacgm_e=aacgm_e[i],
+                                                     aacgm_z=5.0,
+                                                     scale_func=sfunc)
+                vdata.set_ocb(self.ocb)
+
+                for attr in ["ocb_lat", "ocb_mlt", "pole_angle", "ocb_quad",
+                             "vec_quad", "aacgm_naz", "ocb_n", "ocb_e",
+                             "ocb_z", "ocb_mag", "aacgm_mag"]:
+                    aval = getattr(varray, attr)[i]
+                    sval = getattr(vdata, attr)
+                    if np.isnan(sval):
+                        self.assertTrue(np.isnan(aval))
+                    else:
+                        self.assertEqual(aval, sval)
+
+        del varray, vdata
+
+    def test_vector_array_rotation(self):
+        """ Test that the VectorDataArray OCB polar angles and vector signs
+        match the VectorData values for all quadrants
+        """
+        pole = 47.3
+        naz = np.array([0.0, 20.0, pole, 60.0, 90.0 - pole, 120.0, pole + 90.0,
+                        150.0, 180.0 - pole, 179.0])
+        quads = [(o, v) for o in range(1, 5) for v in range(1, 5)]
+        ocb_quad = np.repeat([qq[0] for qq in quads], naz.shape[0])
+        vec_quad = np.repeat([qq[1] for qq in quads], naz.shape[0])
+
+        varray = ocbpy.ocb_scaling.VectorDataArray(np.arange(ocb_quad.shape[0]),
+                                                   27, 75.0, 22.0)
+        varray.ocb_quad = ocb_quad
+        varray.vec_quad = vec_quad
+        varray.aacgm_naz = np.tile(naz, len(quads))
+        varray.pole_angle = np.full(ocb_quad.shape, pole)
+        ocb_naz = varray.calc_ocb_polar_angle()
+        vsigns = varray.calc_ocb_vec_sign(north=True, east=True)
+
+        for i in range(ocb_quad.shape[0]):
+            self.vdata.ocb_quad = ocb_quad[i]
+            self.vdata.vec_quad = vec_quad[i]
+            self.vdata.aacgm_naz = varray.aacgm_naz[i]
+            self.vdata.pole_angle = pole
+
+            sval = self.vdata.calc_ocb_polar_angle()
+            if np.isnan(sval):
+                self.assertTrue(np.isnan(ocb_naz[i]))
+            else:
+                self.assertEqual(ocb_naz[i], sval)
+
+            ssigns = self.vdata.calc_ocb_vec_sign(north=True, east=True)
+            self.assertEqual(vsigns['north'][i], ssigns['north'])
+            self.assertEqual(vsigns['east'][i], ssigns['east'])
+
+        # Undefined quadrants give undefined angles and signs
+        varray.ocb_quad[:] = 0
+        self.assertTrue(np.all(np.isnan(varray.calc_ocb_polar_angle())))
+        vsigns = varray.calc_ocb_vec_sign(north=True, east=True)
+        self.assertTrue(np.all(vsigns['north'] == 0))
+        self.assertTrue(np.all(vsigns['east'] == 0))
+
+        del varray, ocb_naz, vsigns
+
+    def test_vector_array_bad_ocb_ind(self):
+        """ Test that VectorDataArray values are NaN for bad OCB indices
+        """
+        varray = ocbpy.ocb_scaling.VectorDataArray([0, 1], [27, -1],
+                                                   [75.0, 75.0], [22.0, 22.0],
+                                                   aacgm_n=50.0, aacgm_e=86.5,
+                                                   aacgm_z=5.0)
+        varray.set_ocb(self.ocb)
+        self.assertAlmostEqual(varray.ocb_mag[0], varray.aacgm_mag[0])
+        self.assertTrue(np.isnan(varray.ocb_mag[1]))
+        self.assertTrue(np.isnan(varray.ocb_lat[1]))
+        self.assertEqual(varray.ocb_quad[1], 0)
+        del varray
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -83,5 +83,130 @@ class TestOCBTimeMethods(unittest.TestCase):
         self.assertEqual(ocbpy.ocb_time.yyddd_to_date(yyddd="01001"),
                          dt.datetime(1901,1,1))
 
+    def test_year_soy_to_datetime64(self):
+        """ Test to see that the array seconds of year conversion works
+        """
+        import numpy as np
+
+        dtime = ocbpy.ocb_time.year_soy_to_datetime64([2001, 2000],
+                                                      [0.0, 11187202.4])
+        self.assertEqual(dtime.dtype, np.dtype("datetime64[us]"))
+        self.assertListEqual(list(dtime.astype(dt.datetime)),
+                             [dt.datetime(2001,1,1),
+                              ocbpy.ocb_time.year_soy_to_datetime(2000,
+                                                                  11187202.4)])
+        del dtime
+
+    def test_convert_time_array_date_tod(self):
+        """ Test to see that the array datetime construction works for fixed
+        width formats
+        """
+        dtime = ocbpy.ocb_time.convert_time_array(date=["20100101",
+                                                        "20121231"],
+                                                  tod=["00:02", "23:59"],
+                                                  datetime_fmt="%Y%m%d %H:%M")
+        self.assertListEqual(list(dtime.astype(dt.datetime)),
+                             [dt.datetime(2010,1,1,0,2),
+                              dt.datetime(2012,12,31,23,59)])
+        del dtime
+
+    def test_convert_time_array_fallback(self):
+        """ Test to see that the array datetime construction works for formats
+        that require strptime
+        """
+        dtime = ocbpy.ocb_time.convert_time_array(date=["2001 Jan 1"],
+                                                  datetime_fmt="%Y %b %d")
+        self.assertEqual(dtime[0].astype(dt.datetime), dt.datetime(2001,1,1))
+        del dtime
+
+    def test_convert_time_array_bad_date(self):
+        """ Test to see that the array datetime construction raises the same
+        errors as strptime
+        """
+        with self.assertRaises(ValueError):
+            ocbpy.ocb_time.convert_time_array(date=["2001-02-29"],
+                                              datetime_fmt="%Y-%m-%d")
+
+    def test_yyddd_to_datetime64(self):
+        """ Test to see that the array years since 1900 and day of year
+        conversion works
+        """
+        import numpy as np
+
+        ddate = ocbpy.ocb_time.yyddd_to_datetime64(["101001", "01001",
+                                                    "100126.5"])
+        self.assertEqual(ddate.dtype, np.dtype("datetime64[D]"))
+        self.assertListEqual(list(ddate.astype(dt.date)),
+                             [dt.date(2001,1,1), dt.date(1901,1,1),
+                              dt.date(2000,5,5)])
+
+        with self.assertRaises(ValueError):
+            ocbpy.ocb_time.yyddd_to_datetime64(["101366"])
+        del ddate
+
+    def test_sod_to_timedelta64(self):
+        """ Test to see that the array seconds of day conversion rounds up
+        to the next microsecond, as done by convert_time
+        """
+        sod = [0.0, 3661.0, 86399.0000004]
+        tdelta = ocbpy.ocb_time.sod_to_timedelta64(sod)
+
+        for i, ss in enumerate(sod):
+            self.assertEqual(dt.datetime(2001,1,1) +
+                             tdelta[i].astype(dt.timedelta),
+                             ocbpy.ocb_time.convert_time(yyddd="101001",
+                                                         sod=ss))
+        del sod, tdelta
+
+    def test_convert_time_array_yyddd(self):
+        """ Test to see that the array datetime construction works for years
+        since 1900 and day of year
+        """
+        dtime = ocbpy.ocb_time.convert_time_array(yyddd=["101001", "100126"],
+                                                  sod=[0.0, 3601.5],
+                                                  datetime_fmt="YYDDD SOD")
+        self.assertListEqual(list(dtime.astype(dt.datetime)),
+                             [dt.datetime(2001,1,1),
+                              dt.datetime(2000,5,5,1,0,1,500000)])
+
+        dtime = ocbpy.ocb_time.convert_time_array(yyddd=["101001", "100126"],
+                                                  tod=["00:00:00", "13:01:02"],
+                                                  datetime_fmt="YYDDD %H:%M:%S")
+        self.assertListEqual(list(dtime.astype(dt.datetime)),
+                             [dt.datetime(2001,1,1),
+                              dt.datetime(2000,5,5,13,1,2)])
+        del dtime
+
+    def test_convert_time_compiled_format(self):
+        """ Test to see that each datetime format is only analysed once and
+        that the fixed width and strptime conversions agree
+        """
+        fmt = "%Y%m%d %H:%M"
+        self.assertEqual(ocbpy.ocb_time.convert_time(date="20100101",
+                                                     tod="00:02",
+                                                     datetime_fmt=fmt),
+                         dt.datetime(2010,1,1,0,2))
+
+        parser = ocbpy.ocb_time._compile_time_format(fmt)
+        self.assertIs(ocbpy.ocb_time._compile_time_format(fmt), parser)
+        self.assertEqual(parser["width"], 14)
+
+        # Strings that are not fixed width are passed to strptime
+        self.assertEqual(ocbpy.ocb_time.convert_time(date="2010101",
+                                                     tod="0:02",
+                                                     datetime_fmt=fmt),
+                         dt.datetime(2010,10,1,0,2))
+
+        # Extra data at the end of the string is ignored
+        self.assertEqual(ocbpy.ocb_time.convert_time(date="2001-01-01",
+                                                     tod="00:00:00.5"),
+                         dt.datetime(2001,1,1))
+
+        # Out of range values raise strptime errors
+        with self.assertRaises(ValueError):
+            ocbpy.ocb_time.convert_time(date="20010229", tod="00:00",
+                                        datetime_fmt=fmt)
+        del fmt, parser
+
 if __name__ == '__main__':
     unittest.main()
@@ -8,6 +8,7 @@
 
 import ocbpy
 import unittest
+import numpy as np
 
 class TestOCBoundaryMethods(unittest.TestCase):
 
@@ -59,6 +60,7 @@ class TestOCBoundaryMethods(unittest.TestCase):
         """
         self.assertGreater(self.ocb.records, 0)
         self.assertEqual(self.ocb.boundary_lat, 74.0)
+        self.assertEqual(self.ocb.dtime.dtype, np.dtype('datetime64[us]'))
 
         self.assertGreater(self.ocb_south.records, 0)
         self.assertEqual(self.ocb_south.boundary_lat, -72.0)
@@ -80,6 +82,176 @@ class TestOCBoundaryMethods(unittest.TestCase):
         self.assertEqual(part_ocb.boundary_lat, 75.0)
         del part_ocb
 
+    def test_partial_load_ampere(self):
+        """ Ensure limited sections of a date-time file can be loaded
+        """
+        import datetime as dt
+
+        stime = self.ocb_south.dtime[0] + dt.timedelta(seconds=1)
+
+        # Load all but the first record
+        part_ocb = ocbpy.ocboundary.OCBoundary(filename=self.ocb_south.filename,
+                                               instrument="Ampere",
+                                               hemisphere=-1, stime=stime)
+
+        self.assertEqual(self.ocb_south.records, part_ocb.records + 1)
+        self.assertEqual(part_ocb.dtime[0], self.ocb_south.dtime[1])
+        self.assertEqual(part_ocb.r[0], self.ocb_south.r[1])
+        del part_ocb
+
+    def test_cache_load(self):
+        """ Ensure the binary column cache is written and gives the same data
+        """
+        import numpy as np
+        import os
+        import shutil
+        import tempfile
+
+        cache_dir = tempfile.mkdtemp()
+        try:
+            # The first load writes the cache
+            cache_ocb = ocbpy.ocboundary.OCBoundary(filename=self.ocb.filename,
+                                                    use_cache=True,
+                                                    cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # The second load reads from the cache
+            cache_ocb = ocbpy.ocboundary.OCBoundary(filename=self.ocb.filename,
+                                                    use_cache=True,
+                                                    cache_dir=cache_dir)
+            self.assertEqual(cache_ocb.records, self.ocb.records)
+            self.assertListEqual(list(cache_ocb.dtime), list(self.ocb.dtime))
+            for nn in ["phi_cent", "r_cent", "r", "num_sectors"]:
+                self.assertTrue(np.all(getattr(cache_ocb, nn) ==
+                                       getattr(self.ocb, nn)))
+
+            # Without memory-mapping, the columns are copied from the cache
+            for nn in ["dtime", "phi_cent", "r_cent", "r", "num_sectors"]:
+                self.assertNotIsInstance(getattr(cache_ocb, nn), np.memmap)
+                self.assertTrue(getattr(cache_ocb, nn).flags.writeable)
+
+            # Clear the cache
+            self.assertEqual(cache_ocb.clear_cache(), 1)
+            self.assertEqual(len(os.listdir(cache_dir)), 0)
+        finally:
+            shutil.rmtree(cache_dir)
+
+        del cache_ocb
+
+    def test_cache_partial_load(self):
+        """ Ensure limited sections of a file can be loaded from the cache
+        """
+        import datetime as dt
+        import shutil
+        import tempfile
+
+        cache_dir = tempfile.mkdtemp()
+        stime = self.ocb_south.dtime[0] + dt.timedelta(seconds=1)
+        try:
+            for i in range(2):
+                part_ocb = ocbpy.ocboundary.OCBoundary(
+                    filename=self.ocb_south.filename, instrument="Ampere",
+                    hemisphere=-1, stime=stime, use_cache=True,
+                    cache_dir=cache_dir)
+
+                self.assertEqual(self.ocb_south.records, part_ocb.records + 1)
+                self.assertEqual(part_ocb.dtime[0], self.ocb_south.dtime[1])
+                self.assertEqual(part_ocb.phi_cent[0],
+                                 self.ocb_south.phi_cent[1])
+        finally:
+            shutil.rmtree(cache_dir)
+
+        del part_ocb
+
+    def test_mmap_load(self):
+        """ Ensure the memory-mapped storage mode gives read-only views
+        """
+        import datetime as dt
+        import numpy as np
+        import shutil
+        import tempfile
+
+        cache_dir = tempfile.mkdtemp()
+        stime = self.ocb.dtime[0] + dt.timedelta(seconds=1)
+        try:
+            mmap_ocb = ocbpy.ocboundary.OCBoundary(filename=self.ocb.filename,
+                                                   use_mmap=True, stime=stime,
+                                                   cache_dir=cache_dir)
+            self.assertTrue(mmap_ocb.use_cache)
+            self.assertEqual(mmap_ocb.records, self.ocb.records - 1)
+
+            for nn in ["phi_cent", "r_cent", "r", "num_sectors"]:
+                self.assertIsInstance(getattr(mmap_ocb, nn), np.memmap)
+                self.assertFalse(getattr(mmap_ocb, nn).flags.writeable)
+                self.assertTrue(np.all(getattr(mmap_ocb, nn) ==
+                                       getattr(self.ocb, nn)[1:]))
+            del mmap_ocb
+        finally:
+            shutil.rmtree(cache_dir)
+
+    def test_index_partial_load(self):
+        """ Ensure limited sections of a file can be loaded using the time index
+        """
+        import datetime as dt
+        import numpy as np
+        import os
+        import shutil
+        import tempfile
+
+        cache_dir = tempfile.mkdtemp()
+        stride = ocbpy.ocboundary._index_stride
+        ocbpy.ocboundary._index_stride = 7
+        stime = self.ocb.dtime[20]
+        etime = self.ocb.dtime[50] - dt.timedelta(seconds=1)
+        try:
+            # The first load builds the index, the second uses it
+            for i in range(2):
+                part_ocb = ocbpy.ocboundary.OCBoundary(
+                    filename=self.ocb.filename, stime=stime, etime=etime,
+                    use_index=True, cache_dir=cache_dir)
+                self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+                self.assertEqual(part_ocb.records, 30)
+                self.assertListEqual(list(part_ocb.dtime),
+                                     list(self.ocb.dtime[20:50]))
+                self.assertTrue(np.all(part_ocb.r == self.ocb.r[20:50]))
+
+            # Load a range with no records
+            part_ocb = ocbpy.ocboundary.OCBoundary(
+                filename=self.ocb.filename, use_index=True, cache_dir=cache_dir,
+                etime=self.ocb.dtime[0] - dt.timedelta(seconds=1))
+            self.assertEqual(part_ocb.records, 0)
+        finally:
+            ocbpy.ocboundary._index_stride = stride
+            shutil.rmtree(cache_dir)
+
+        del part_ocb
+
+    def test_chunked_load(self):
+        """ Ensure files read in chunks give the same data
+        """
+        import datetime as dt
+        import numpy as np
+
+        chunk_size = ocbpy.ocboundary._read_chunk_size
+        ocbpy.ocboundary._read_chunk_size = 10
+        try:
+            chunk_ocb = ocbpy.ocboundary.OCBoundary(filename=self.ocb.filename)
+            self.assertListEqual(list(chunk_ocb.dtime), list(self.ocb.dtime))
+            self.assertTrue(np.all(chunk_ocb.r == self.ocb.r))
+
+            # Load a range within the file
+            chunk_ocb = ocbpy.ocboundary.OCBoundary(
+                filename=self.ocb.filename, stime=self.ocb.dtime[15],
+                etime=self.ocb.dtime[34] + dt.timedelta(seconds=1))
+            self.assertListEqual(list(chunk_ocb.dtime),
+                                 list(self.ocb.dtime[15:35]))
+            self.assertTrue(np.all(chunk_ocb.r == self.ocb.r[15:35]))
+        finally:
+            ocbpy.ocboundary._read_chunk_size = chunk_size
+
+        del chunk_ocb
+
     def test_first_good(self):
         """ Test to see that we can find the first good point
         """
@@ -95,6 +267,110 @@ class TestOCBoundaryMethods(unittest.TestCase):
         self.assertGreater(self.ocb_south.rec_ind, -1)
         self.assertLess(self.ocb_south.rec_ind, self.ocb_south.records)
 
+    def test_good_ocb_ind(self):
+        """ Test to see that the good record indices match a record-by-record
+        quality evaluation
+        """
+        import numpy as np
+
+        good_ind = list()
+        self.ocb.rec_ind = -1
+        self.ocb.get_next_good_ocb_ind()
+        while self.ocb.rec_ind < self.ocb.records:
+            good_ind.append(self.ocb.rec_ind)
+            self.ocb.get_next_good_ocb_ind()
+
+        self.assertEqual(self.ocb.rec_ind, self.ocb.records)
+        self.assertGreater(len(good_ind), 0)
+        self.assertListEqual(list(self.ocb.get_good_ocb_ind()), good_ind)
+
+        good_mask = self.ocb.get_good_ocb_mask()
+        self.assertEqual(good_mask.shape, (self.ocb.records,))
+        self.assertListEqual(list(np.where(good_mask)[0]), good_ind)
+
+        # Stricter criteria should give a subset of the good records
+        strict_ind = self.ocb.get_good_ocb_ind(max_r=15.0)
+        self.assertTrue(set(strict_ind).issubset(set(good_ind)))
+        self.assertTrue(np.all(self.ocb.r[strict_ind] <= 15.0))
+
+    def test_find_next_good(self):
+        """ Test to see that the next good record is found without changing
+        the record index
+        """
+        self.ocb.rec_ind = 5
+        self.assertEqual(self.ocb.find_next_good_ocb_ind(), 27)
+        self.assertEqual(self.ocb.find_next_good_ocb_ind(27), 31)
+        self.assertEqual(self.ocb.rec_ind, 5)
+
+        self.assertGreaterEqual(self.ocb.find_next_good_ocb_ind(
+            self.ocb.records - 1), self.ocb.records)
+
+    def test_shared_threads(self):
+        """ Test to see that one OCBoundary object gives the same results when
+        shared between threads
+        """
+        import numpy as np
+        from concurrent.futures import ThreadPoolExecutor
+
+        good_ind = self.ocb.get_good_ocb_ind()
+        aacgm_lat = np.linspace(60.0, 89.0, 30)
+        aacgm_mlt = np.linspace(0.0, 23.0, 30)
+
+        def convert(irec):
+            return self.ocb.normal_coord(aacgm_lat, aacgm_mlt, ocb_ind=irec)
+
+        # Remove the saved pole geometry, so that it is set by the threads
+        self.ocb.r = self.ocb.r.copy()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            thread_out = list(pool.map(convert, good_ind))
+
+        for irec, (ocb_lat, ocb_mlt) in zip(good_ind, thread_out):
+            lat, mlt = convert(irec)
+            self.assertTrue(np.array_equal(ocb_lat, lat))
+            self.assertTrue(np.array_equal(ocb_mlt, mlt))
+        del good_ind, aacgm_lat, aacgm_mlt, thread_out
+
+    def test_pole_geometry(self):
+        """ Test to see that the OCB pole geometry is calculated for all
+        records and only recalculated when the data columns change
+        """
+        import numpy as np
+
+        geometry = self.ocb.get_pole_geometry()
+        for gkey in geometry.keys():
+            self.assertEqual(geometry[gkey].shape, (self.ocb.records,))
+
+        self.assertAlmostEqual(geometry["ocb_aacgm_lat"][27],
+                               90.0 - self.ocb.r_cent[27])
+        self.assertAlmostEqual(geometry["ocb_aacgm_mlt"][27],
+                               self.ocb.phi_cent[27] / 15.0)
+        self.assertAlmostEqual(geometry["xc"][27], self.ocb.r_cent[27] *
+                               np.cos(np.radians(self.ocb.phi_cent[27])))
+        self.assertAlmostEqual(geometry["scale_normal"][27] *
+                               geometry["scale_revert"][27], 1.0)
+
+        # The saved geometry is reused
+        self.assertIs(self.ocb.get_pole_geometry(), geometry)
+
+        # Replacing a data column updates the geometry
+        self.ocb.r = self.ocb.r * 2.0
+        new_geometry = self.ocb.get_pole_geometry()
+        self.assertIsNot(new_geometry, geometry)
+        self.assertAlmostEqual(new_geometry["scale_normal"][27],
+                               0.5 * geometry["scale_normal"][27])
+        del geometry, new_geometry
+
+    def test_good_ocb_ind_update(self):
+        """ Test to see that the good record indices are updated when the data
+        columns change
+        """
+        good_ind = self.ocb.get_good_ocb_ind()
+        self.assertIs(self.ocb.get_good_ocb_ind(), good_ind)
+
+        self.ocb.r = self.ocb.r + 100.0
+        self.assertEqual(len(self.ocb.get_good_ocb_ind()), 0)
+        del good_ind
+
     def test_normal_coord_north(self):
         """ Test to see that the normalisation is performed properly in the
         northern hemisphere
@@ -106,6 +382,41 @@ class TestOCBoundaryMethods(unittest.TestCase):
         self.assertAlmostEqual(ocb_mlt, 17.832)
         del ocb_lat, ocb_mlt
 
+    def test_normal_coord_array(self):
+        """ Test to see that the normalisation is performed properly for arrays
+        of locations and OCB records
+        """
+        import numpy as np
+
+        aacgm_lat = np.array([90.0, 80.0, 75.0, -80.0, 85.0])
+        aacgm_mlt = np.array([0.0, 6.0, 12.0, 0.0, 18.0])
+        ocb_ind = np.array([27, 31, 27, 27, self.ocb.records])
+
+        ocb_lat, ocb_mlt = self.ocb.normal_coord(aacgm_lat, aacgm_mlt,
+                                                 ocb_ind=ocb_ind)
+        self.assertEqual(ocb_lat.shape, aacgm_lat.shape)
+        self.assertAlmostEqual(ocb_lat[0], 86.8658623137)
+        self.assertAlmostEqual(ocb_mlt[0], 17.832)
+
+        # The wrong hemisphere and a bad record index give NaN
+        self.assertTrue(np.all(np.isnan(ocb_lat[3:])))
+        self.assertTrue(np.all(np.isnan(ocb_mlt[3:])))
+
+        # The good values match the single location results
+        for i in range(3):
+            self.ocb.rec_ind = ocb_ind[i]
+            lat, mlt = self.ocb.normal_coord(aacgm_lat[i], aacgm_mlt[i])
+            self.assertEqual(ocb_lat[i], lat)
+            self.assertEqual(ocb_mlt[i], mlt)
+
+        # A single record may be used for all locations
+        ocb_lat, ocb_mlt = self.ocb.normal_coord(aacgm_lat, aacgm_mlt,
+                                                 ocb_ind=27)
+        self.assertAlmostEqual(ocb_mlt[0], 17.832)
+        self.assertTrue(np.isnan(ocb_lat[3]))
+        self.assertFalse(np.isnan(ocb_lat[4]))
+        del aacgm_lat, aacgm_mlt, ocb_ind, ocb_lat, ocb_mlt
+
     def test_revert_coord_north(self):
 
         """ Test to see that the reversion to AACGM coordinates is performed
@@ -119,6 +430,61 @@ class TestOCBoundaryMethods(unittest.TestCase):
         self.assertAlmostEqual(aacgm_mlt, 0.0)
         del ocb_lat, ocb_mlt, aacgm_lat, aacgm_mlt
 
+    def test_revert_coord_array(self):
+        """ Test to see that the reversion to AACGM coordinates is performed
+        properly for arrays of locations and OCB records
+        """
+        import numpy as np
+
+        ocb_ind = np.array([27, 31, 27, -1])
+        ocb_lat, ocb_mlt = self.ocb.normal_coord([80.0, 75.0, 85.0, 80.0],
+                                                 [0.0, 6.0, 12.0, 0.0],
+                                                 ocb_ind=ocb_ind)
+        aacgm_lat, aacgm_mlt = self.ocb.revert_coord(ocb_lat, ocb_mlt,
+                                                     ocb_ind=ocb_ind)
+        for i, lat in enumerate([80.0, 75.0, 85.0]):
+            self.assertAlmostEqual(aacgm_lat[i], lat)
+        for i, mlt in enumerate([0.0, 6.0, 12.0]):
+            self.assertAlmostEqual(aacgm_mlt[i], mlt)
+        self.assertTrue(np.isnan(aacgm_lat[3]))
+        self.assertTrue(np.isnan(aacgm_mlt[3]))
+
+        # The wrong hemisphere gives NaN
+        aacgm_lat, aacgm_mlt = self.ocb.revert_coord(-74.0, 6.0, ocb_ind=27)
+        self.assertTrue(np.isnan(aacgm_lat))
+        self.assertTrue(np.isnan(aacgm_mlt))
+        del ocb_ind, ocb_lat, ocb_mlt, aacgm_lat, aacgm_mlt
+
+    def test_iter_revert_grid(self):
+        """ Test to see that an OCB grid is reverted in blocks of records
+        """
+        import numpy as np
+
+        grid_lat, grid_mlt = np.meshgrid([74.0, 82.0], np.arange(0.0, 24.0,
+                                                                 6.0))
+        ocb_ind = self.ocb.get_good_ocb_ind()
+
+        # Limit the output to three records per block
+        block_ind = list()
+        for rind, alat, amlt in self.ocb.iter_revert_grid(
+                grid_lat, grid_mlt, ocb_ind=ocb_ind,
+                max_size=ocbpy.ocboundary._revert_point_bytes * 8 * 3.5):
+            self.assertLessEqual(len(rind), 3)
+            self.assertEqual(alat.shape, (len(rind), grid_lat.size))
+            self.assertEqual(amlt.shape, (len(rind), grid_lat.size))
+            block_ind.extend(list(rind))
+
+            for i, irec in enumerate(rind):
+                self.ocb.rec_ind = irec
+                for j, (olat, omlt) in enumerate(zip(grid_lat.flatten(),
+                                                     grid_mlt.flatten())):
+                    lat, mlt = self.ocb.revert_coord(olat, omlt)
+                    self.assertEqual(alat[i, j], lat)
+                    self.assertEqual(amlt[i, j], mlt)
+
+        self.assertListEqual(block_ind, list(ocb_ind))
+        del grid_lat, grid_mlt, ocb_ind, block_ind
+
     def test_normal_coord_south(self):
         """ Test to see that the normalisation is performed properly in the
         southern hemisphere
@@ -157,5 +523,54 @@ class TestOCBoundaryMethods(unittest.TestCase):
                         600.0)
         del test_times, idat
 
+    def test_match_array(self):
+        """ Test to see that the batch data matching agrees with the
+        record-by-record data matching
+        """
+        import numpy as np
+        import datetime as dt
+
+        # Build a array of times for a test dataset
+        test_times = np.arange(self.ocb.dtime[0] - dt.timedelta(seconds=900),
+                               self.ocb.dtime[-1],
+                               dt.timedelta(seconds=420)).astype(dt.datetime)
+
+        # Match the data one record at a time
+        seq_dat = list()
+        seq_ocb = list()
+        idat = 0
+        self.ocb.rec_ind = -1
+        while idat < len(test_times) and self.ocb.rec_ind < self.ocb.records:
+            idat = ocbpy.ocboundary.match_data_ocb(self.ocb, test_times,
+                                                   idat=idat)
+            if idat < len(test_times) and self.ocb.rec_ind < self.ocb.records:
+                seq_dat.append(idat)
+                seq_ocb.append(self.ocb.rec_ind)
+                idat += 1
+
+        # Match all of the data at once
+        idat, iocb, sdiff = ocbpy.ocboundary.match_data_ocb_array(self.ocb,
+                                                                  test_times)
+        self.assertGreater(len(seq_dat), 0)
+        self.assertListEqual(list(idat), seq_dat)
+        self.assertListEqual(list(iocb), seq_ocb)
+        self.assertTrue(np.all(abs(sdiff) <= 600.0))
+        self.assertAlmostEqual(sdiff[0], (self.ocb.dtime[iocb[0]] -
+                                          test_times[idat[0]]).total_seconds())
+        del test_times, idat, iocb, sdiff
+
+    def test_match_array_none(self):
+        """ Test the batch data matching with no data close to the boundaries
+        """
+        import datetime as dt
+
+        test_times = [self.ocb.dtime[0] - dt.timedelta(days=1)]
+        idat, iocb, sdiff = ocbpy.ocboundary.match_data_ocb_array(self.ocb,
+                                                                  test_times)
+        self.assertEqual(idat.shape, (0,))
+        self.assertEqual(iocb.shape, (0,))
+        self.assertEqual(sdiff.shape, (0,))
+        del test_times, idat, iocb, sdiff
+
 if __name__ == '__main__':
     unittest.main()
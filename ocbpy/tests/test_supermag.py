@@ -31,9 +31,12 @@ class TestSuperMAGMethods(unittest.TestCase):
 
     def tearDown(self):
         import os
+        import shutil
 
         if os.path.isfile(self.temp_output):
             os.remove(self.temp_output)
+        elif os.path.isdir(self.temp_output):
+            shutil.rmtree(self.temp_output)
 
         del self.test_file, self.test_output, self.test_ocb, self.temp_output
 
@@ -64,6 +67,91 @@ class TestSuperMAGMethods(unittest.TestCase):
 
         del header, data, ktest, test_vals
 
+    def test_iter_supermag_ascii_data(self):
+        """ Test the routine to read the SuperMAG data in batches
+        """
+        header, data = ocb_ismag.load_supermag_ascii_data(self.test_file)
+
+        # Batches contain whole records, even when they are too large
+        batches = list(ocb_ismag.iter_supermag_ascii_data(self.test_file,
+                                                          batch_size=1))
+        self.assertEqual(len(batches), 1)
+        self.assertListEqual(sorted(batches[0].keys()),
+                             sorted(list(data.keys())))
+
+        for kk in data.keys():
+            self.assertListEqual(list(batches[0][kk]), list(data[kk]))
+
+        # Bad files yield no data
+        self.assertListEqual(list(ocb_ismag.iter_supermag_ascii_data(
+            "fake_file")), list())
+        del header, data, batches
+
+    def test_stream_no_size_limit(self):
+        """ Test that the streaming routines test the file without a size
+        limit, while the in-memory loader keeps the default limit
+        """
+        from unittest import mock
+        import ocbpy
+
+        with mock.patch("ocbpy.instruments.test_file",
+                        wraps=ocbpy.instruments.test_file) as test_file:
+            list(ocb_ismag.iter_supermag_ascii_data(self.test_file))
+            test_file.assert_called_once_with(self.test_file, max_size=None)
+
+            test_file.reset_mock()
+            ocb_ismag.supermag2ascii_ocb(self.test_file, self.temp_output,
+                                         ocbfile=self.test_ocb)
+            smag_calls = [cc for cc in test_file.call_args_list
+                          if cc[0][0] == self.test_file]
+            self.assertGreater(len(smag_calls), 0)
+            for cc in smag_calls:
+                self.assertDictEqual(cc[1], {"max_size":None})
+
+            test_file.reset_mock()
+            ocb_ismag.load_supermag_ascii_data(self.test_file)
+            test_file.assert_called_once_with(self.test_file)
+
+    def test_last_supermag_time(self):
+        """ Test the routine to find the last SuperMAG record time
+        """
+        import datetime as dt
+
+        for block_size in [16, 65536]:
+            self.assertEqual(ocb_ismag._last_supermag_time(
+                self.test_file, block_size=block_size),
+                             dt.datetime(2000, 5, 5, 13, 40, 30))
+
+        # Files without date lines have no last time
+        self.assertIsNone(ocb_ismag._last_supermag_time(self.test_ocb))
+
+    def test_load_fill_values(self):
+        """ Test that SuperMAG fill values are replaced and that station lines
+        with extra columns are read
+        """
+        import os
+
+        with open(self.test_file, "r") as fin:
+            lines = fin.readlines()
+
+        # Set a fill value for the THL north component and add a column to
+        # the ALE station line
+        lines[-1] = lines[-1].replace("-23.6", "999999")
+        lines[-2] = "{:s}\t0.0\n".format(lines[-2].rstrip())
+        fill_file = "{:s}_fill".format(self.temp_output)
+        with open(fill_file, "w") as fout:
+            fout.write("".join(lines))
+
+        header, data = ocb_ismag.load_supermag_ascii_data(fill_file)
+        os.remove(fill_file)
+
+        self.assertListEqual(list(data['STID']), ["ALE", "THL"])
+        self.assertEqual(data['BN'][0], 113.7)
+        self.assertTrue(np.isnan(data['BN'][1]))
+        self.assertEqual(data['SZA'][0], 71.53)
+        self.assertEqual(data['MLAT'][1], 77.22)
+        del lines, fill_file, header, data
+
     def test_load_failure(self):
         """ Test the routine to load the SuperMAG data
         """
@@ -120,6 +208,81 @@ class TestSuperMAGMethods(unittest.TestCase):
             self.assertTrue(filecmp.cmp(self.test_output, self.temp_output,
                                         shallow=False))
 
+    def test_supermag2ascii_ocb_workers(self):
+        """ Test that the parallel conversion of SuperMAG data gives the same
+        output as the serial conversion
+        """
+        import filecmp
+
+        ocb_ismag.supermag2ascii_ocb(self.test_file, self.temp_output,
+                                     ocbfile=self.test_ocb, workers=2)
+
+        self.assertTrue(filecmp.cmp(self.test_output, self.temp_output,
+                                    shallow=False))
+
+    def test_supermag2ascii_ocb_npy(self):
+        """ Test the conversion of SuperMAG data into binary output
+        """
+        from ocbpy.instruments.general import load_binary_output
+
+        ocb_ismag.supermag2ascii_ocb(self.test_file, self.temp_output,
+                                     ocbfile=self.test_ocb,
+                                     output_format="npy")
+        schema, data = load_binary_output(self.temp_output)
+
+        # Compare the binary output to the ASCII output
+        with open(self.test_output, "r") as fin:
+            test_keys = fin.readline()[1:].split()[2:]
+            test_lines = [line.split() for line in fin]
+
+        self.assertEqual(schema["attrs"]["instrument"], "supermag")
+        self.assertEqual(schema["records"], len(test_lines))
+        self.assertListEqual(list(data.keys()), ["DATETIME"] + test_keys)
+        self.assertEqual(data['DATETIME'].dtype, np.dtype('datetime64[us]'))
+        for i, test_line in enumerate(test_lines):
+            self.assertEqual(str(data['DATETIME'][i].astype(object)),
+                             " ".join(test_line[:2]))
+            self.assertEqual(data['STID'][i], test_line[3])
+            for j, k in enumerate(test_keys):
+                if k not in ["NST", "STID", "SML", "SMU"]:
+                    self.assertEqual("{:.2f}".format(data[k][i]),
+                                     test_line[j+2])
+
+        del schema, data
+
+    def test_supermag2ascii_ocb_workers_batches(self):
+        """ Test that the parallel conversion of SuperMAG data read in several
+        batches gives the same output as the serial conversion
+        """
+        import filecmp
+        import os
+
+        # Build a SuperMAG file with several records
+        with open(self.test_file, "r") as fin:
+            header, record = fin.read().split("2000\t05\t05\t13\t40\t30")
+
+        record_file = "{:s}_records".format(self.temp_output)
+        with open(record_file, "w") as fout:
+            fout.write(header)
+            for mm in range(36, 46, 2):
+                fout.write("2000\t05\t05\t13\t{:02d}\t30".format(mm))
+                fout.write("{:s}\n".format(record.rstrip()))
+
+        serial_output = "{:s}_serial".format(self.temp_output)
+        ocb_ismag.supermag2ascii_ocb(record_file, serial_output,
+                                     ocbfile=self.test_ocb)
+        ocb_ismag.supermag2ascii_ocb(record_file, self.temp_output,
+                                     ocbfile=self.test_ocb, workers=2,
+                                     batch_size=2)
+
+        self.assertGreater(len(open(serial_output).readlines()), 5)
+        self.assertTrue(filecmp.cmp(serial_output, self.temp_output,
+                                    shallow=False))
+
+        os.remove(record_file)
+        os.remove(serial_output)
+        del header, record, record_file, serial_output
+
     def test_supermag2ascii_ocb_bad_output(self):
         """ Test the conversion of SuperMAG data from AACGM coordinates into
         OCB coordinates
@@ -168,5 +331,31 @@ class TestSuperMAGMethods(unittest.TestCase):
         self.assertFalse(test_file("fake_out"))
         
 
+    def test_supermag2ascii_ocb_write_failure(self):
+        """ Test that the output file is closed and removed when the output
+        cannot be written
+        """
+        import os
+        import ocbpy.instruments.general as ocb_igen
+
+        # Replace the block writer with one that fails
+        write_blocks = ocb_igen.write_output_blocks
+        fout_list = list()
+
+        def fail_blocks(fout, blocks):
+            fout_list.append(fout)
+            return False
+
+        ocb_igen.write_output_blocks = fail_blocks
+        try:
+            ocb_ismag.supermag2ascii_ocb(self.test_file, self.temp_output,
+                                         ocbfile=self.test_ocb)
+        finally:
+            ocb_igen.write_output_blocks = write_blocks
+
+        self.assertEqual(len(fout_list), 1)
+        self.assertTrue(fout_list[0].closed)
+        self.assertFalse(os.path.isfile(self.temp_output))
+
 if __name__ == '__main__':
     unittest.main()
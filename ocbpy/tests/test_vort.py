@@ -35,9 +35,12 @@ class TestVortMethods(unittest.TestCase):
 
     def tearDown(self):
         import os
+        import shutil
 
         if os.path.isfile(self.temp_output):
             os.remove(self.temp_output)
+        elif os.path.isdir(self.temp_output):
+            shutil.rmtree(self.temp_output)
 
         del self.test_file, self.test_output, self.test_ocb, self.temp_output
 
@@ -78,6 +81,25 @@ class TestVortMethods(unittest.TestCase):
         self.assertIsNone(data)
         del bad_file, data
 
+    def test_load_bad_block(self):
+        """ Test the routine to load the SuperDARN vorticity data when a data
+        block has an unexpected line
+        """
+        import os
+
+        with open(self.test_file, "r") as fin:
+            lines = fin.readlines()
+
+        bad_file = "{:s}_bad".format(self.temp_output)
+        with open(bad_file, "w") as fout:
+            fout.write("".join(lines[:5] + ["1 2 3\n"] + lines[6:]))
+
+        data = ocb_ivort.load_vorticity_ascii_data(bad_file)
+        os.remove(bad_file)
+
+        self.assertIsNone(data)
+        del lines, bad_file, data
+
     def test_load_all_vort_data(self):
         """ Test the routine to load the SuperDARN vorticity data, loading
         all of the possible data values
@@ -127,6 +149,76 @@ class TestVortMethods(unittest.TestCase):
             self.assertTrue(filecmp.cmp(self.test_output, self.temp_output,
                                         shallow=False))
 
+    def test_vort2ascii_ocb_workers(self):
+        """ Test that the parallel conversion of vorticity data gives the same
+        output as the serial conversion
+        """
+        import filecmp
+        import os
+
+        # Build a vorticity file with several date blocks
+        with open(self.test_file, "r") as fin:
+            block = fin.read().split("\n")
+
+        block_file = "{:s}_blocks".format(self.temp_output)
+        with open(block_file, "w") as fout:
+            for uth in ["13.550", "13.600", "13.650", "13.700"]:
+                fout.write("2000 5 5 {:s}\n".format(uth))
+                fout.write("\n".join(block[1:]))
+                fout.write("\n\n")
+
+        serial_output = "{:s}_serial".format(self.temp_output)
+        ocb_ivort.vort2ascii_ocb(block_file, serial_output,
+                                 ocbfile=self.test_ocb)
+        ocb_ivort.vort2ascii_ocb(block_file, self.temp_output,
+                                 ocbfile=self.test_ocb, workers=3)
+
+        self.assertGreater(len(open(serial_output).readlines()), 10)
+        self.assertTrue(filecmp.cmp(serial_output, self.temp_output,
+                                    shallow=False))
+
+        os.remove(block_file)
+        os.remove(serial_output)
+        del block, block_file, serial_output
+
+    def test_vort2ascii_ocb_npy(self):
+        """ Test the conversion of vorticity data into binary output
+        """
+        from ocbpy.instruments.general import load_binary_output
+
+        ocb_ivort.vort2ascii_ocb(self.test_file, self.temp_output,
+                                 ocbfile=self.test_ocb, output_format="npy")
+        schema, data = load_binary_output(self.temp_output)
+
+        # Compare the binary output to the ASCII output
+        test_out = np.genfromtxt(self.test_output, skip_header=1,
+                                 dtype=['|U50' if i < 2 else float
+                                        for i in range(5)])
+
+        self.assertEqual(schema["attrs"]["instrument"], "vort")
+        self.assertListEqual(list(data.keys()),
+                             ["DATETIME", "OCB_LAT", "OCB_MLT", "NORM_VORT"])
+        self.assertEqual(data['DATETIME'].shape, test_out.shape)
+        for i, test_row in enumerate(test_out):
+            self.assertEqual(str(data['DATETIME'][i].astype(dt.datetime)),
+                             " ".join(test_row.tolist()[:2]))
+            self.assertAlmostEqual(data['OCB_LAT'][i], test_row[2], places=2)
+            self.assertAlmostEqual(data['OCB_MLT'][i], test_row[3], places=6)
+            self.assertAlmostEqual(data['NORM_VORT'][i], test_row[4], places=6)
+
+        del schema, data, test_out
+
+    def test_vort2ascii_ocb_workers_one_block(self):
+        """ Test the parallel conversion of a file with one date block
+        """
+        import filecmp
+
+        ocb_ivort.vort2ascii_ocb(self.test_file, self.temp_output,
+                                 ocbfile=self.test_ocb, workers=2)
+
+        self.assertTrue(filecmp.cmp(self.test_output, self.temp_output,
+                                    shallow=False))
+
     def test_vort2ascii_ocb_load_failure(self):
         """ Test the conversion of vorticity data from AACGM coordinates into
         OCB coordinates with a bad vorticity file
@@ -172,5 +264,31 @@ class TestVortMethods(unittest.TestCase):
         log_handler.pop_thread()
         del log_rec, log_handler
 
+    def test_vort2ascii_ocb_write_failure(self):
+        """ Test that the output file is closed and removed when the output
+        cannot be written
+        """
+        import os
+        import ocbpy.instruments.general as ocb_igen
+
+        # Replace the block writer with one that fails
+        write_blocks = ocb_igen.write_output_blocks
+        fout_list = list()
+
+        def fail_blocks(fout, blocks):
+            fout_list.append(fout)
+            return False
+
+        ocb_igen.write_output_blocks = fail_blocks
+        try:
+            ocb_ivort.vort2ascii_ocb(self.test_file, self.temp_output,
+                                     ocbfile=self.test_ocb)
+        finally:
+            ocb_igen.write_output_blocks = write_blocks
+
+        self.assertEqual(len(fout_list), 1)
+        self.assertTrue(fout_list[0].closed)
+        self.assertFalse(os.path.isfile(self.temp_output))
+
 if __name__ == '__main__':
     unittest.main()